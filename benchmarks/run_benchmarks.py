@@ -0,0 +1,326 @@
+"""
+Benchmark Runner - Offline performance benchmarks for the generation pipeline
+Runs PPTGenerator against simulated providers and compares with stored baselines
+
+Run:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --scenario batch --save-baseline
+    python -m benchmarks.run_benchmarks --tolerance 0.3 --json bench.json
+
+Metrics per scenario:
+    wall_time_s             Total time for all decks
+    stage_*_s               Cumulative time per stage (plan, images, assemble);
+                            images counts only the wait after planning, since
+                            slides start generating while the plan streams in
+    first_image_s           Time from start to the first successful image
+    throughput_slides_per_s Successful slides per second of wall time
+    p50_slide_s/p99_slide_s Slide latency: first provider attempt to success
+    peak_memory_mb          Peak traced Python allocation (tracemalloc)
+
+Exit code is 1 when any metric regresses beyond the tolerance.
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from benchmarks.simulated_clients import SimulatedImageClient, SimulatedGLMClient
+from core.tracing import current_tracer
+from generators.ppt_generator import PPTGenerator
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# Scenario definitions; provider entries are SimulatedImageClient arguments
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "single-deck": {
+        "mode": "generate",
+        "decks": 1,
+        "slides": 10,
+        "providers": [
+            {"name": "SIM-PRIMARY", "latency": ["lognormal", 0.05, 0.4], "failure_rate": 0.1},
+            {"name": "SIM-FALLBACK", "latency": ["uniform", 0.05, 0.1]},
+        ],
+    },
+    "batch": {
+        "mode": "batch",
+        "decks": 6,
+        "slides": 10,
+        "concurrency": {"SIM-PRIMARY": 8, "SIM-FALLBACK": 4},
+        "providers": [
+            {"name": "SIM-PRIMARY", "latency": ["lognormal", 0.05, 0.4], "failure_rate": 0.1},
+            {"name": "SIM-FALLBACK", "latency": ["uniform", 0.05, 0.1]},
+        ],
+    },
+    "throttled-batch": {
+        "mode": "batch",
+        "decks": 4,
+        "slides": 10,
+        "concurrency": {"SIM-PRIMARY": 8, "SIM-FALLBACK": 4},
+        "providers": [
+            {"name": "SIM-PRIMARY", "latency": 0.05, "max_concurrency": 4},
+            {"name": "SIM-FALLBACK", "latency": 0.08},
+        ],
+    },
+    "large-payload": {
+        "mode": "generate",
+        "decks": 1,
+        "slides": 6,
+        "providers": [
+            {"name": "SIM-PRIMARY", "latency": 0.02, "payload_kb": 3072},
+        ],
+    },
+}
+
+# Metrics compared against baselines: name -> True if higher is better
+COMPARED_METRICS = {
+    "wall_time_s": False,
+    "first_image_s": False,
+    "p50_slide_s": False,
+    "p99_slide_s": False,
+    "peak_memory_mb": False,
+    "throughput_slides_per_s": True,
+}
+
+
+def run_scenario(name: str, scenario: Dict[str, Any], seed: int = 7) -> Dict[str, Any]:
+    """
+    Run one scenario
+
+    Args:
+        name: Scenario name
+        scenario: Scenario definition (see SCENARIOS)
+        seed: Base random seed
+
+    Returns:
+        Metrics dict
+    """
+    clients = [
+        SimulatedImageClient(seed=seed + i, **provider)
+        for i, provider in enumerate(scenario["providers"])
+    ]
+    glm_client = SimulatedGLMClient(
+        plan_latency=scenario.get("plan_latency", 0.1),
+        transition_latency=scenario.get("transition_latency", 0.005),
+        seed=seed
+    )
+    generator = PPTGenerator(
+        glm_client=glm_client,
+        image_clients=clients,
+        provider_concurrency=scenario.get("concurrency")
+    )
+    stages = _instrument(generator)
+
+    output_root = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    jobs = [
+        {
+            "content": f"Benchmark deck {i+1}",
+            "page_count": scenario["slides"],
+            "output_dir": os.path.join(output_root, f"deck_{i+1:03d}"),
+        }
+        for i in range(scenario["decks"])
+    ]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if scenario["mode"] == "batch":
+            results = generator.generate_batch(jobs)
+        else:
+            results = [generator.generate(**job) for job in jobs]
+    finally:
+        wall_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        generator.scheduler.shutdown()
+        shutil.rmtree(output_root, ignore_errors=True)
+
+    latencies = _slide_latencies(clients)
+    slides_ok = sum(r.get("page_count", 0) for r in results if r.get("success"))
+
+    metrics = {
+        "decks": len(jobs),
+        "slides": scenario["decks"] * scenario["slides"],
+        "slides_succeeded": slides_ok,
+        "wall_time_s": wall_time,
+        "throughput_slides_per_s": slides_ok / wall_time if wall_time > 0 else 0.0,
+        "first_image_s": _first_image(clients, start),
+        "p50_slide_s": _percentile(latencies, 50),
+        "p99_slide_s": _percentile(latencies, 99),
+        "peak_memory_mb": peak / (1024 * 1024),
+        "providers": {c.get_client_name(): c.get_stats() for c in clients},
+    }
+    for stage, seconds in stages.items():
+        metrics[f"stage_{stage}_s"] = seconds
+
+    return metrics
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baselines: Dict[str, Dict[str, Any]],
+    tolerance: float
+) -> List[str]:
+    """
+    Compare results with baselines
+
+    Args:
+        results: Scenario name -> metrics
+        baselines: Scenario name -> baseline metrics
+        tolerance: Allowed relative change (0.25 = 25%)
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for name, metrics in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = baseline.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{name}: {metric} {old:.3f} -> {new:.3f} ({change:+.0%})")
+
+    return regressions
+
+
+def _instrument(generator: PPTGenerator) -> Dict[str, float]:
+    """Wrap pipeline stages with timers; returns the live totals dict"""
+    totals = {"plan": 0.0, "images": 0.0, "assemble": 0.0}
+    lock = threading.Lock()
+
+    def timed(stage, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with lock:
+                    totals[stage] += time.perf_counter() - start
+        return wrapper
+
+    def images_wait(func):
+        # Slides are submitted during planning; the deck's "images" span
+        # (waiting for the remaining images) has closed by assembly time
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = current_tracer()
+            waited = tracer.stage_summary().get("images", {}).get("total_s", 0.0) if tracer else 0.0
+            with lock:
+                totals["images"] += waited
+            return func(*args, **kwargs)
+        return wrapper
+
+    generator.plan_deck = timed("plan", generator.plan_deck)
+    generator.assemble_deck = timed("assemble", images_wait(generator.assemble_deck))
+    return totals
+
+
+def _first_image(clients: List[SimulatedImageClient], start: float) -> float:
+    """Time from run start to the first successful provider attempt"""
+    ends = [end for client in clients for _, _, end, ok in client.attempts if ok]
+    return min(ends) - start if ends else 0.0
+
+
+def _slide_latencies(clients: List[SimulatedImageClient]) -> List[float]:
+    """Per-slide time from first attempt to first successful attempt"""
+    first_start: Dict[str, float] = {}
+    success_end: Dict[str, float] = {}
+    for client in clients:
+        for prompt, start, end, ok in client.attempts:
+            first_start[prompt] = min(start, first_start.get(prompt, start))
+            if ok:
+                success_end[prompt] = min(end, success_end.get(prompt, end))
+
+    return sorted(success_end[p] - first_start[p] for p in success_end)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def _print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print a summary table"""
+    header = f"{'scenario':<18}{'wall s':>9}{'first s':>9}{'slides/s':>10}{'p50 s':>8}{'p99 s':>8}{'peak MB':>9}  stages (plan/images/assemble s)"
+    print(header)
+    print("-" * len(header))
+    for name, m in results.items():
+        print(
+            f"{name:<18}{m['wall_time_s']:>9.3f}{m['first_image_s']:>9.3f}{m['throughput_slides_per_s']:>10.1f}"
+            f"{m['p50_slide_s']:>8.3f}{m['p99_slide_s']:>8.3f}{m['peak_memory_mb']:>9.1f}  "
+            f"{m['stage_plan_s']:.2f}/{m['stage_images_s']:.2f}/{m['stage_assemble_s']:.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Offline generation pipeline benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Write full results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        print(f"[BENCH] Running {name}...")
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            results[name] = run_scenario(name, SCENARIOS[name], seed=args.seed)
+
+    print()
+    _print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\n[BENCH] Baseline saved: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print("\n[BENCH] Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print("\n[BENCH] No regressions" if baselines else "\n[BENCH] No baseline to compare against")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Simulated Clients - Offline stand-ins for the provider clients
+Configurable latency, failures, throttling and payload size; no network, no API credits
+"""
+
+import base64
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.base_client import BaseImageClient
+from core.config import GenerationConfig
+from core.glm_client import GLMClient
+
+
+class LatencyModel:
+    """
+    Latency distribution in seconds
+
+    Kinds:
+        constant:  value
+        uniform:   low, high
+        lognormal: median, sigma (long tail, closest to real providers)
+    """
+
+    def __init__(self, kind: str = "constant", *params: float):
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency model: {kind}")
+        self.kind = kind
+        self.params = params
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency value"""
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return median * rng.lognormvariate(0.0, sigma)
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "LatencyModel":
+        """Build from a number or a [kind, *params] list"""
+        if isinstance(spec, LatencyModel):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls("constant", float(spec))
+        return cls(spec[0], *spec[1:])
+
+    def __repr__(self) -> str:
+        return f"<LatencyModel {self.kind}{self.params}>"
+
+
+class SimulatedImageClient(BaseImageClient):
+    """
+    Fake image provider
+
+    Every call sleeps for a sampled latency and returns a random base64
+    payload of the configured size. Calls beyond max_concurrency are
+    rejected after throttle_latency, like a provider answering 429.
+    """
+
+    def __init__(
+        self,
+        name: str = "SIM",
+        latency: Any = 0.05,
+        failure_rate: float = 0.0,
+        max_concurrency: Optional[int] = None,
+        throttle_latency: float = 0.01,
+        payload_kb: int = 256,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize simulated client
+
+        Args:
+            name: Client name used in logs and scheduler limits
+            latency: Seconds, or [kind, *params] for LatencyModel
+            failure_rate: Probability a call returns None
+            max_concurrency: In-flight calls above this are throttled
+            throttle_latency: Seconds before a throttled call returns
+            payload_kb: Decoded image size in KB
+            seed: Random seed for reproducible runs
+        """
+        super().__init__(api_key="simulated")
+        self.client = "simulated"
+        self.name = name
+        self.latency = LatencyModel.from_spec(latency)
+        self.failure_rate = failure_rate
+        self.max_concurrency = max_concurrency
+        self.throttle_latency = throttle_latency
+        self._raw_payload = os.urandom(payload_kb * 1024)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.throttled = 0
+        # (prompt, start, end, succeeded) per call
+        self.attempts: List[Tuple[str, float, float, bool]] = []
+
+    def generate_image(
+        self,
+        prompt: str,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        **kwargs
+    ) -> Optional[str]:
+        """Simulate one provider call"""
+        start = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            throttled = self.max_concurrency is not None and self._in_flight > self.max_concurrency
+            delay = self.throttle_latency if throttled else self.latency.sample(self._rng)
+            failed = throttled or self._rng.random() < self.failure_rate
+
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if throttled:
+                    self.throttled += 1
+                elif failed:
+                    self.failures += 1
+                self.attempts.append((prompt, start, time.perf_counter(), not failed))
+
+        if failed:
+            return None
+        # Fresh string per call, like a real response body
+        return base64.b64encode(self._raw_payload).decode("utf-8")
+
+    def get_client_name(self) -> str:
+        return self.name
+
+    def get_stats(self) -> Dict[str, int]:
+        """Call counters"""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "throttled": self.throttled,
+        }
+
+
+class SimulatedGLMClient(GLMClient):
+    """Fake GLM chat client with simulated planning and transition latency"""
+
+    def __init__(
+        self,
+        plan_latency: Any = 0.2,
+        transition_latency: Any = 0.05,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize simulated chat client
+
+        Args:
+            plan_latency: Seconds, or [kind, *params] for LatencyModel
+            transition_latency: Seconds per transition call
+            seed: Random seed for reproducible runs
+        """
+        BaseImageClient.__init__(self, api_key="simulated")
+        self.client = "simulated"
+        self.plan_latency = LatencyModel.from_spec(plan_latency)
+        self.transition_latency = LatencyModel.from_spec(transition_latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_image(self, prompt: str, **kwargs) -> Optional[str]:
+        """Chat-only client; image requests go to SimulatedImageClient"""
+        return None
+
+    def generate_slide_plan(
+        self,
+        topic: str,
+        page_count: int = 5,
+        on_slide: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Streams the default plan, spreading the plan latency over its slides"""
+        plan = self._default_plan(topic, page_count)
+        step = self._sample(self.plan_latency) / max(1, len(plan["slides"]))
+        for i, slide in enumerate(plan["slides"]):
+            time.sleep(step)
+            if on_slide:
+                on_slide(i, slide)
+        return plan
+
+    def generate_outline(self, topic: str, section_count: int, slide_count: int, context: Optional[str] = None) -> Dict[str, Any]:
+        time.sleep(self._sample(self.plan_latency))
+        return self._default_outline(topic, section_count, slide_count)
+
+    def expand_section(self, deck_title: str, section: Dict[str, Any], slide_count: int) -> List[Dict[str, Any]]:
+        time.sleep(self._sample(self.plan_latency))
+        return self._default_section_slides(section, slide_count)
+
+    def summarize_section(self, title: str, text: str, max_chars: int = 600) -> str:
+        time.sleep(self._sample(self.transition_latency))
+        return text[:max_chars]
+
+    def generate_transition(self, from_image: str, to_image: str, style: str = "professional") -> Dict[str, Any]:
+        time.sleep(self._sample(self.transition_latency))
+        return self._fallback_transition(from_image, to_image)
+
+    def generate_transitions(
+        self,
+        slides: List[Dict[str, Any]],
+        style: str = "professional",
+        descriptors: Optional[List[Optional[Dict[str, Any]]]] = None,
+        numbers: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """One simulated round trip per batch"""
+        time.sleep(self._sample(self.transition_latency))
+        return [self._fallback_transition("", "") for _ in range(max(0, len(slides) - 1))]
+
+    def optimize_content(self, content: str, max_length: int = 50) -> str:
+        return content
+
+    def _sample(self, model: LatencyModel) -> float:
+        with self._lock:
+            return model.sample(self._rng)
@@ -3,9 +3,13 @@ Base Image Client - Abstract base class for image generation clients
 Provides common interface and functionality for all image generation clients
 """
 
+import time
 from abc import ABC, abstractmethod
 from typing import Optional, List
+
 from core.config import GenerationConfig
+from core.metrics import PROVIDER_IN_FLIGHT, PROVIDER_LATENCY, PROVIDER_REQUESTS, record_provider_error
+from core.tracing import span
 
 
 class BaseImageClient(ABC):
@@ -25,6 +29,7 @@ class BaseImageClient(ABC):
         """
         self.api_key = api_key
         self.client = None  # Will be set by subclass
+        self.keys = None  # KeyPool when the subclass rotates several API keys
 
     @abstractmethod
     def generate_image(
@@ -56,6 +61,7 @@ class BaseImageClient(ABC):
         resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
         style: str = GenerationConfig.DEFAULT_STYLE,
         aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        slide_numbers: Optional[List[int]] = None,
         **kwargs
     ) -> List[Optional[str]]:
         """
@@ -66,6 +72,8 @@ class BaseImageClient(ABC):
             resolution: Resolution
             style: Style description
             aspect_ratio: Aspect ratio
+            slide_numbers: Deck slide numbers of the prompts, for logs and
+                           traces (defaults to 1..len(prompts))
             **kwargs: Additional provider-specific arguments
 
         Returns:
@@ -75,10 +83,12 @@ class BaseImageClient(ABC):
         client_name = self.__class__.__name__
 
         for i, prompt in enumerate(prompts):
-            print(f"[{client_name}] Generating slide {i+1}/{len(prompts)}...")
+            number = slide_numbers[i] if slide_numbers else i + 1
+            print(f"[{client_name}] Generating slide {number} ({i+1}/{len(prompts)})...")
             try:
-                image_result = self.generate_image(
+                image_result = self.generate_image_traced(
                     prompt=prompt,
+                    slide=number,
                     aspect_ratio=aspect_ratio,
                     resolution=resolution,
                     style=style,
@@ -87,16 +97,55 @@ class BaseImageClient(ABC):
                 images.append(image_result)
 
                 if image_result:
-                    print(f"[{client_name}] OK Slide {i+1} generated")
+                    print(f"[{client_name}] OK Slide {number} generated")
                 else:
-                    print(f"[{client_name}] FAIL Slide {i+1} failed")
+                    print(f"[{client_name}] FAIL Slide {number} failed")
 
             except Exception as e:
-                print(f"[{client_name}] ERROR Slide {i+1}: {str(e)}")
+                print(f"[{client_name}] ERROR Slide {number}: {str(e)}")
                 images.append(None)
 
         return images
 
+    def generate_image_traced(
+        self,
+        prompt: str,
+        slide: Optional[int] = None,
+        **kwargs
+    ) -> Optional[str]:
+        """
+        Call generate_image inside a provider span, recording metrics
+
+        Args:
+            prompt: Image generation prompt
+            slide: Slide number recorded on the span
+            **kwargs: generate_image arguments
+
+        Returns:
+            Base64 encoded image data, or None if generation failed
+        """
+        name = self.get_client_name()
+        PROVIDER_IN_FLIGHT.inc(provider=name, operation="image")
+        start = time.perf_counter()
+        result = None
+        try:
+            with span(f"{name}.generate_image", cat="provider", provider=name, slide=slide) as args:
+                args["ok"] = False
+                result = self.generate_image(prompt=prompt, **kwargs)
+                args["ok"] = result is not None
+                return result
+        except Exception as e:
+            record_provider_error(name, "image", e)
+            raise
+        finally:
+            PROVIDER_IN_FLIGHT.dec(provider=name, operation="image")
+            PROVIDER_LATENCY.observe(time.perf_counter() - start, provider=name, operation="image")
+            PROVIDER_REQUESTS.inc(
+                provider=name,
+                operation="image",
+                outcome="success" if result is not None else "failure"
+            )
+
     def is_available(self) -> bool:
         """
         Check if the client is available (has valid configuration)
@@ -106,6 +155,15 @@ class BaseImageClient(ABC):
         """
         return self.client is not None
 
+    def key_count(self) -> int:
+        """
+        Number of API keys the client rotates (scales its concurrency limit)
+
+        Returns:
+            Keys in the client's pool, 1 without a pool
+        """
+        return len(self.keys) if self.keys is not None else 1
+
     def get_success_count(self, results: List[Optional[str]]) -> int:
         """
         Count successful generations in results
@@ -0,0 +1,365 @@
+"""
+Cassette - Record/replay of provider interactions
+Captures GLM chat responses and image payloads for deterministic offline runs
+
+Layout of a cassette directory:
+
+    meta.json           Image providers in fallback order at record time
+    entries.jsonl       One line per interaction (request, latency, response)
+    payloads/*.b64      Image payloads referenced by entries
+
+Requests are keyed by provider, kind and a normalized request (whitespace
+collapsed, image file paths reduced to their file name), so replays match
+even when output directories differ between runs.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from core.base_client import BaseImageClient
+from core.config import GenerationConfig, ModelConfig
+from core.glm_client import GLMClient
+from core.local_renderer import LocalRendererClient
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+_WHITESPACE = re.compile(r"\s+")
+_IMAGE_PATH = re.compile(r"(?:[^\s/\\]*[/\\])+([^\s/\\]+\.(?:png|jpe?g|webp))", re.IGNORECASE)
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when no recorded interaction matches a request"""
+
+
+class Cassette:
+    """Stores and serves provider interactions"""
+
+    def __init__(self, path: str, mode: str = REPLAY, simulate_latency: bool = False):
+        """
+        Open a cassette
+
+        Args:
+            path: Cassette directory
+            mode: "record" (append interactions) or "replay" (serve them)
+            simulate_latency: In replay mode, sleep for the recorded latency
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.entries_path = os.path.join(path, "entries.jsonl")
+        self.payloads_dir = os.path.join(path, "payloads")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+
+        if mode == RECORD:
+            os.makedirs(self.payloads_dir, exist_ok=True)
+        elif not os.path.exists(self.entries_path):
+            raise FileNotFoundError(f"No cassette at {path}")
+        else:
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+
+        print(f"[CASSETTE] {mode} {path} ({sum(len(v) for v in self._entries.values())} entries)")
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """
+        Build from PPT_CASSETTE / PPT_CASSETTE_MODE / PPT_CASSETTE_LATENCY
+
+        Returns:
+            Cassette, or None if PPT_CASSETTE is not set
+        """
+        path = os.getenv("PPT_CASSETTE")
+        if not path:
+            return None
+        return cls(
+            path,
+            mode=os.getenv("PPT_CASSETTE_MODE", REPLAY),
+            simulate_latency=os.getenv("PPT_CASSETTE_LATENCY", "false").lower() == "true"
+        )
+
+    # ========================================
+    # Keys
+    # ========================================
+
+    @staticmethod
+    def normalize(value: Any) -> Any:
+        """Normalize a request value for keying"""
+        if isinstance(value, str):
+            value = _IMAGE_PATH.sub(r"\1", value)
+            return _WHITESPACE.sub(" ", value).strip()
+        if isinstance(value, dict):
+            return {k: Cassette.normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [Cassette.normalize(v) for v in value]
+        return value
+
+    @classmethod
+    def key(cls, kind: str, provider: str, request: Dict[str, Any]) -> str:
+        """Stable key of a request"""
+        normalized = json.dumps(
+            {"kind": kind, "provider": provider, "request": cls.normalize(request)},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+    # ========================================
+    # Record / Replay
+    # ========================================
+
+    def call(
+        self,
+        kind: str,
+        provider: str,
+        request: Dict[str, Any],
+        func: Callable[[], Any]
+    ) -> Any:
+        """
+        Run a provider call through the cassette
+
+        In record mode func is called and its result (or exception) stored;
+        in replay mode the stored result is returned without calling func.
+
+        Args:
+            kind: "chat" or "image"
+            provider: Provider name (GLM/GEMINI/OPENROUTER)
+            request: Request fields used as key
+            func: The real provider call
+
+        Returns:
+            Provider response
+        """
+        if self.mode == REPLAY:
+            return self.replay(kind, provider, request)
+
+        start = time.perf_counter()
+        try:
+            response = func()
+        except Exception as e:
+            self.record(kind, provider, request, None, time.perf_counter() - start, error=str(e))
+            raise
+        self.record(kind, provider, request, response, time.perf_counter() - start)
+        return response
+
+    def record(
+        self,
+        kind: str,
+        provider: str,
+        request: Dict[str, Any],
+        response: Any,
+        latency: float,
+        error: Optional[str] = None
+    ) -> None:
+        """Append one interaction"""
+        key = self.key(kind, provider, request)
+        entry = {
+            "key": key,
+            "kind": kind,
+            "provider": provider,
+            "request": request,
+            "latency": round(latency, 4),
+            "error": error,
+        }
+
+        with self._lock:
+            count = len(self._entries.setdefault(key, []))
+            if kind == "image" and response is not None:
+                payload_name = f"{key}-{count}.b64"
+                with open(os.path.join(self.payloads_dir, payload_name), "w", encoding="utf-8") as f:
+                    f.write(response)
+                entry["payload"] = payload_name
+            else:
+                entry["response"] = response
+
+            self._entries[key].append(entry)
+            with open(self.entries_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def replay(self, kind: str, provider: str, request: Dict[str, Any]) -> Any:
+        """
+        Serve a recorded interaction
+
+        Repeated requests are served in recorded order; once exhausted the
+        last recording is repeated.
+
+        Raises:
+            CassetteMiss: If the request was never recorded
+            RuntimeError: If the recorded call raised
+        """
+        key = self.key(kind, provider, request)
+        with self._lock:
+            recorded = self._entries.get(key)
+            if not recorded:
+                raise CassetteMiss(f"{provider} {kind} request not in cassette ({key})")
+            index = min(self._cursors.get(key, 0), len(recorded) - 1)
+            self._cursors[key] = index + 1
+            entry = recorded[index]
+
+        if self.simulate_latency:
+            time.sleep(entry["latency"])
+
+        if entry.get("error"):
+            raise RuntimeError(entry["error"])
+
+        if "payload" in entry:
+            with open(os.path.join(self.payloads_dir, entry["payload"]), "r", encoding="utf-8") as f:
+                return f.read()
+        return entry.get("response")
+
+    # ========================================
+    # Providers
+    # ========================================
+
+    def set_providers(self, names: List[str]) -> None:
+        """Store the image provider order (record mode)"""
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"providers": names}, f, indent=2)
+
+    def providers(self) -> List[str]:
+        """Image provider order at record time"""
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return sorted({e["provider"] for v in self._entries.values() for e in v if e["kind"] == "image"})
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)["providers"]
+
+    def replay_clients(self, glm_client: "CassetteGLMClient") -> List[BaseImageClient]:
+        """Image chain for replay, in recorded provider order (the local renderer is rebuilt, not replayed)"""
+        return [
+            glm_client if name == "GLM" else LocalRendererClient() if name == "LOCAL" else CassetteImageClient(self, name)
+            for name in self.providers()
+        ]
+
+
+class CassetteImageClient(BaseImageClient):
+    """Image client that records or replays another client's payloads"""
+
+    def __init__(self, cassette: Cassette, name: str, inner: Optional[BaseImageClient] = None):
+        """
+        Initialize client
+
+        Args:
+            cassette: Cassette to record into / replay from
+            name: Provider name (GEMINI/OPENROUTER)
+            inner: Real client (record mode only)
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.name = name
+        self.inner = inner
+        self.client = inner.client if cassette.mode == RECORD and inner else "replay"
+
+    def generate_image(
+        self,
+        prompt: str,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        **kwargs
+    ) -> Optional[str]:
+        """Generate (record) or look up (replay) one image"""
+        request = {"prompt": prompt, "aspect_ratio": aspect_ratio, "resolution": resolution, "style": style}
+        try:
+            return self.cassette.call(
+                "image", self.name, request,
+                lambda: self.inner.generate_image(prompt, aspect_ratio, resolution, style, **kwargs)
+            )
+        except CassetteMiss as e:
+            print(f"[CASSETTE] Miss: {str(e)}")
+            return None
+
+    def get_client_name(self) -> str:
+        return self.name
+
+
+class CassetteGLMClient(GLMClient):
+    """GLM client whose chat and image calls go through a cassette"""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        api_key: Optional[Union[str, List[str]]] = None,
+        http_client: Optional[Any] = None
+    ):
+        """
+        Initialize client
+
+        Args:
+            cassette: Cassette to record into / replay from
+            api_key: GLM API key or keys (record mode only)
+            http_client: Shared httpx.Client (record mode only)
+        """
+        self.cassette = cassette
+        if cassette.mode == RECORD:
+            super().__init__(api_key, http_client=http_client)
+        else:
+            BaseImageClient.__init__(self)
+            self.client = "replay"
+
+    def generate_image(
+        self,
+        prompt: str,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        **kwargs
+    ) -> Optional[str]:
+        """Generate (record) or look up (replay) one image"""
+        request = {"prompt": prompt, "aspect_ratio": aspect_ratio, "resolution": resolution, "style": style}
+        try:
+            return self.cassette.call(
+                "image", "GLM", request,
+                lambda: super(CassetteGLMClient, self).generate_image(prompt, aspect_ratio, resolution, style, **kwargs)
+            )
+        except CassetteMiss as e:
+            print(f"[CASSETTE] Miss: {str(e)}")
+            return None
+
+    def _chat(self, system: str, prompt: str, temperature: float) -> str:
+        """Chat completion through the cassette (misses raise, like API errors)"""
+        request = {
+            "model": ModelConfig.GLM_CHAT_MODEL,
+            "system": system,
+            "prompt": prompt,
+            "temperature": temperature,
+        }
+        return self.cassette.call(
+            "chat", "GLM", request,
+            lambda: super(CassetteGLMClient, self)._chat(system, prompt, temperature)
+        )
+
+    def _chat_stream(self, system: str, prompt: str, temperature: float) -> Iterator[str]:
+        """
+        Streamed chat through the cassette
+
+        Recorded under the same key as _chat; replay yields the whole
+        response as one chunk.
+        """
+        request = {
+            "model": ModelConfig.GLM_CHAT_MODEL,
+            "system": system,
+            "prompt": prompt,
+            "temperature": temperature,
+        }
+        yield self.cassette.call(
+            "chat", "GLM", request,
+            lambda: "".join(super(CassetteGLMClient, self)._chat_stream(system, prompt, temperature))
+        )
+
+    def get_client_name(self) -> str:
+        return "GLM"
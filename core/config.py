@@ -3,6 +3,7 @@ Configuration Management - 统一配置管理
 集中管理所有配置项，包括模型名称、分辨率映射等
 """
 
+import os
 from typing import Dict, Tuple
 
 
@@ -54,6 +55,28 @@ class ResolutionConfig:
         """
         return cls.RESOLUTION_MAP.get((aspect_ratio, resolution), cls.DEFAULT_SIZE)
 
+    @classmethod
+    def cheapest_resolution(cls, aspect_ratio: str = "16:9") -> str:
+        """
+        获取像素数最少的分辨率 (草稿模式使用)
+
+        Args:
+            aspect_ratio: 宽高比
+
+        Returns:
+            分辨率名称 (如 "1080p")
+        """
+        def area(size: str) -> int:
+            width, height = size.split("x")
+            return int(width) * int(height)
+
+        candidates = [
+            (area(size), resolution)
+            for (ratio, resolution), size in cls.RESOLUTION_MAP.items()
+            if ratio == aspect_ratio
+        ]
+        return min(candidates)[1] if candidates else "2K"
+
 
 class GenerationConfig:
     """图片生成配置"""
@@ -94,3 +117,331 @@ class PromptConfig:
 
     # 分辨率描述模板
     RESOLUTION_TEMPLATE = "Resolution: {resolution}"
+
+    # 是否在发送前压缩提示词 (去除重复指令、合并冲突指令、按长度预算裁剪)
+    COMPACT = True
+
+    # 各服务商提示词长度上限 (字符)，超出时从末尾的次要条目开始裁剪
+    MAX_PROMPT_CHARS: Dict[str, int] = {
+        "GLM": 1000,
+        "GEMINI": 1800,
+        "OPENROUTER": 6000,
+    }
+
+    # 视为键值指令的键 (小写)，同一键只保留第一次出现的取值
+    DIRECTIVE_KEYS = ("style", "aspect ratio", "resolution", "quality", "color palette", "background")
+
+
+class WriterConfig:
+    """图片写盘配置"""
+
+    # 后台写盘线程数
+    THREADS = 2
+
+    # 等待写盘的图片数上限；队列满时生成线程阻塞等待 (背压)，内存占用与并发数成正比而与页数无关
+    QUEUE_SIZE = 4
+
+
+class PlanningConfig:
+    """长文档规划配置"""
+
+    # 内容超过该长度 (字符) 时使用分段规划 (map-reduce)
+    CHUNK_THRESHOLD = 12000
+
+    # 每个分段的目标长度 (字符)
+    CHUNK_SIZE = 6000
+
+    # 并行摘要请求数
+    MAX_PARALLEL_SUMMARIES = 4
+
+    # 每个分段摘要的最大长度 (字符)
+    SUMMARY_MAX_CHARS = 600
+
+    # 页数超过该值时使用分层规划：先生成章节大纲，再并行展开各章节
+    OUTLINE_THRESHOLD = 20
+
+    # 分层规划中每个章节的目标页数
+    SLIDES_PER_SECTION = 8
+
+    # 并行展开章节的请求数
+    MAX_PARALLEL_SECTIONS = 4
+
+    # generation_log.json 中原文保留的最大长度 (字符)，更长的内容只记录哈希和长度
+    LOG_CONTENT_MAX_CHARS = 500
+
+
+class SchedulerConfig:
+    """全局调度配置"""
+
+    # 各服务商每个 API key 的并发上限 (按 get_client_name() 返回的名称)；配置多个 key 时按 key 数倍增
+    PROVIDER_CONCURRENCY: Dict[str, int] = {
+        "GLM": 4,
+        "GEMINI": 4,
+        "OPENROUTER": 2,
+        "LOCAL": 2,
+    }
+
+    # 未配置服务商的默认并发上限
+    DEFAULT_CONCURRENCY = 2
+
+    # 批量生成时同时规划/组装的演示文稿数量
+    MAX_PARALLEL_DECKS = 8
+
+    # 服务商延迟估计的指数平滑系数 (用于 deadline 调度)
+    LATENCY_EWMA_ALPHA = 0.3
+
+    # 设置 deadline 时，页面在 (期限 - 下一级预计耗时 - HEDGE_MARGIN) 秒仍未完成，
+    # 则同时交给下一级服务商 (对冲)，先返回的结果生效；无延迟记录时按 0 计
+    HEDGE_MARGIN = 0.5
+
+
+class KeyPoolConfig:
+    """API key 池配置 (GLM_API_KEY 等环境变量可用逗号分隔多个 key)"""
+
+    # 限流的 key 暂停使用的秒数，连续限流时翻倍，最长 MAX_THROTTLE_QUARANTINE
+    THROTTLE_QUARANTINE = 30.0
+    MAX_THROTTLE_QUARANTINE = 600.0
+
+    # 无效或无权限的 key 暂停使用的秒数
+    INVALID_QUARANTINE = 3600.0
+
+    # 识别无效 key：优先按 HTTP 状态码 (401/403)，其次按 SDK 的鉴权异常类名
+    INVALID_KEY_ERROR_TYPES = ("AuthenticationError", "PermissionDeniedError", "APIAuthenticationError")
+    # 无状态码时按整句匹配异常消息 (小写)，不匹配单独的 "401"/"403"
+    INVALID_KEY_MARKERS = (
+        "invalid api key", "invalid_api_key", "incorrect api key", "api key not valid", "api_key_invalid",
+    )
+
+
+class CoalescingConfig:
+    """相同请求合并配置 (同时进行的相同请求只调用一次服务商，结果共享)"""
+
+    # 图片请求 (提示词、分辨率、风格、比例相同)
+    IMAGES = True
+
+    # GLM 对话请求 (系统消息、用户消息、温度相同)
+    CHAT = True
+
+
+class HTTPConfig:
+    """HTTP 传输配置 (各服务商 SDK 共享同一个连接池)"""
+
+    # 超时 (秒): 建立连接 / 等待响应 (大图生成较慢) / 发送请求 / 等待空闲连接
+    CONNECT_TIMEOUT = 10.0
+    READ_TIMEOUT = 180.0
+    WRITE_TIMEOUT = 30.0
+    POOL_TIMEOUT = 60.0
+
+    # 空闲连接保持时间 (秒)；需长于规划阶段，预热的连接才能留到第一页图片
+    KEEPALIVE_EXPIRY = 120.0
+
+    # 启用 HTTP/2 (需安装 h2，未安装时使用 HTTP/1.1)
+    HTTP2 = True
+
+    # 连接池在各服务商并发上限之和以外，为规划、摘要和转场等对话请求预留的连接数
+    CHAT_CONNECTIONS = 8
+
+    # 构造生成器时在后台预先建立到已配置服务商的连接
+    PREWARM = True
+
+    # 每个服务商预热的连接数 (HTTP/2 下一个连接即可复用)
+    PREWARM_CONNECTIONS = 2
+
+    # 服务商 API 地址 (用于预热)
+    PROVIDER_ORIGINS: Dict[str, str] = {
+        "GLM": "https://open.bigmodel.cn",
+        "GEMINI": "https://generativelanguage.googleapis.com",
+        "OPENROUTER": "https://openrouter.ai",
+    }
+
+
+class RendererConfig:
+    """本地渲染 (最后一级回退) 配置"""
+
+    # 是否在默认生成链末尾加入本地渲染
+    ENABLED = True
+
+    # 风格文件没有颜色时使用的调色板
+    DEFAULT_PALETTE = ("#3B82F6", "#8B5CF6", "#F97316")
+
+    # 深色页面背景
+    DARK_BACKGROUND = "#0F172A"
+
+    # 字体候选 (按顺序取第一个存在的；需支持中文)，均不存在时使用 Pillow 内置字体
+    FONT_PATHS = (
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+        "/System/Library/Fonts/PingFang.ttc",
+        "C:/Windows/Fonts/msyh.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    )
+
+    # 标题字体候选 (优先于 FONT_PATHS)
+    BOLD_FONT_PATHS = (
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+        "C:/Windows/Fonts/msyhbd.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    )
+
+    # PNG 压缩级别 (0-9)；低级别编码更快
+    PNG_COMPRESS_LEVEL = 1
+
+
+class TransitionConfig:
+    """转场配置"""
+
+    # 转场引擎: "local" 由 NumPy 分析相邻两页图片 (不调用模型)，"llm" 由 GLM 生成描述
+    ENGINE = "local"
+
+    # "llm" 引擎每次请求包含的页数 (一次返回 页数-1 个转场)；更长的演示文稿自动分批，相邻批次共享一页
+    BATCH_SIZE = 25
+
+    # 同时进行的转场请求数上限
+    MAX_PARALLEL_BATCHES = 4
+
+    # 请求中每页内容的最大字符数
+    SLIDE_CONTENT_CHARS = 200
+
+    # 分析前将图片缩小到的宽度 (像素)
+    ANALYSIS_WIDTH = 96
+
+    # 颜色直方图每通道分箱数 (用于比较配色)，主色提取使用更粗的分箱
+    HISTOGRAM_BINS = 8
+    PALETTE_BINS = 4
+
+    # 每页提取的主色数量
+    PALETTE_SIZE = 3
+
+    # 布局网格 (行, 列)，比较各区域的亮度与细节分布
+    LAYOUT_GRID = (3, 4)
+
+    # 亮度梯度超过此值的像素计为边缘
+    EDGE_THRESHOLD = 0.08
+
+    # 转场类型判定阈值: 配色差异 >= DISSOLVE 为溶解，细节变化 >= ZOOM 为缩放，布局差异 >= SLIDE 为推移，否则淡入淡出
+    DISSOLVE_THRESHOLD = 0.6
+    ZOOM_THRESHOLD = 0.5
+    SLIDE_THRESHOLD = 0.25
+
+    # 转场时长范围 (秒)，随两页差异线性增长
+    MIN_DURATION = 0.6
+    MAX_DURATION = 2.0
+
+    # 缓存的图片特征数 (图片保存时即计算特征，组装时无需重新读取图片)
+    FEATURE_CACHE_SIZE = 256
+
+
+class OutputConfig:
+    """输出配置"""
+
+    # 未指定输出位置时，每次运行在此目录下新建 <时间戳>_<随机后缀> 子目录
+    ROOT = "outputs"
+
+    # 批量命令行 (service.batch_cli) 的输出根目录，每个任务写入 <root>/<任务 ID>
+    BATCH_ROOT = "outputs/batch"
+
+
+class ServiceConfig:
+    """本地任务服务配置"""
+
+    # HTTP 监听地址和端口
+    HOST = "127.0.0.1"
+    PORT = 8765
+
+    # SQLite 任务队列路径
+    DB_PATH = "outputs/jobs.db"
+
+    # 任务输出根目录 (每个任务写入 <root>/<job_id>)
+    OUTPUT_ROOT = "outputs/jobs"
+
+    # 预初始化的工作生成器数量
+    WORKERS = 2
+
+    # 队列空闲时的轮询间隔 (秒)
+    POLL_INTERVAL = 1.0
+
+    # 每个任务的最多执行次数；重启时已达上限的中断任务记为失败，不再重新排队
+    MAX_ATTEMPTS = 3
+
+
+class ShardConfig:
+    """多进程/多节点分片配置"""
+
+    # 共享文件系统上的工作根目录
+    ROOT = "outputs/shared"
+
+    # 租约有效期 (秒)，过期后其他进程可重新认领
+    LEASE_TTL = 120
+
+    # 心跳续租间隔 (秒)
+    HEARTBEAT_INTERVAL = 30
+
+    # 无可认领任务时的轮询间隔 (秒)
+    POLL_INTERVAL = 2.0
+
+    # 每个任务的最多尝试次数 (含 worker 崩溃)，用尽后单页按失败记录并以占位页组装
+    MAX_ATTEMPTS = 3
+
+
+class PreviewConfig:
+    """实时预览服务配置"""
+
+    # HTTP 监听地址和端口 (端口为 0 或已被占用时自动选择空闲端口)
+    HOST = "127.0.0.1"
+    PORT = 8766
+
+    # 无新事件时发送 SSE 心跳的间隔 (秒)
+    HEARTBEAT_INTERVAL = 15.0
+
+
+class MetricsConfig:
+    """指标配置"""
+
+    # /metrics HTTP 监听地址和端口
+    HOST = "127.0.0.1"
+    PORT = 9108
+
+    # 服务商请求延迟直方图分桶 (秒)
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+    # 单个演示文稿耗时直方图分桶 (秒)
+    DECK_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+
+    # 识别限流错误：优先按 HTTP 状态码 (429)，其次按 SDK 的限流异常类名
+    THROTTLE_ERROR_TYPES = ("RateLimitError", "APIReachLimitError", "ResourceExhausted", "TooManyRequests")
+
+    # 无状态码时按整词匹配异常消息的关键字 (小写)，如 "4290 px" 不算限流
+    THROTTLE_MARKERS = ("429", "rate limit", "ratelimit", "too many requests", "quota exceeded", "resource_exhausted")
+
+
+class ProfilingConfig:
+    """性能剖析配置 (PPT_PROFILE=true 或 PPTGenerator(profile=True) 时启用)"""
+
+    # 调用栈采样间隔 (秒)，采样覆盖进程内所有线程
+    SAMPLE_INTERVAL = 0.005
+
+    # 按阶段记录 tracemalloc 内存峰值 (会使分配变慢)
+    TRACE_MEMORY = True
+
+    # 丢弃空闲线程的样本 (叶子帧为下列 (文件名, 函数名) 之一，如线程池等待任务)
+    DROP_IDLE = True
+    IDLE_FRAMES = (
+        ("threading.py", "wait"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("selectors.py", "select"),
+    )
+
+    # profile.json 中列出的函数数量 (按自身耗时排序)
+    TOP_FUNCTIONS = 30
+
+
+class StyleConfig:
+    """风格库配置"""
+
+    # 风格文件目录
+    STYLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "styles")
+
+    # 热加载检查间隔 (秒)：两次检查之间直接使用已编译的风格，0 表示每次都检查文件修改时间
+    RELOAD_INTERVAL = 1.0
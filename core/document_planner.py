@@ -0,0 +1,244 @@
+"""
+Document Planner - Map-reduce slide planning for long source documents
+Splits a report into sections, summarizes them in parallel, then plans the deck from the summaries
+
+Map:    each chunk is summarized by its own chat call (PlanningConfig.MAX_PARALLEL_SUMMARIES at a time)
+Reduce: page_count slides are allocated across sections by length, and one
+        streamed planning call turns the allocated summaries into the slide plan
+"""
+
+import contextvars
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import PlanningConfig
+from core.tracing import span
+
+
+_HEADING = re.compile(r"^(?:#{1,3}\s+\S.*|第[一二三四五六七八九十百\d]+[章节部分篇].*|(?:\d+\.)+\d*\s*\S.*|\d+、\S.*)$")
+
+
+def split_sections(content: str, chunk_size: int = PlanningConfig.CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """
+    Split a document into chunks of roughly chunk_size characters
+
+    Headings (Markdown #, 第X章, numbered lines) start new sections; small
+    neighbouring sections are packed into one chunk and long sections are
+    split at paragraph boundaries.
+
+    Args:
+        content: Document text
+        chunk_size: Target chunk length in characters
+
+    Returns:
+        [{"title", "text", "chars"}] in document order
+    """
+    sections: List[Dict[str, Any]] = []
+    title, lines = "Introduction", []
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if _HEADING.match(stripped) and len(stripped) <= 80:
+            if "".join(lines).strip():
+                sections.append({"title": title, "text": "\n".join(lines).strip()})
+            title, lines = stripped.lstrip("#").strip(), []
+        else:
+            lines.append(line)
+    if "".join(lines).strip():
+        sections.append({"title": title, "text": "\n".join(lines).strip()})
+
+    chunks: List[Dict[str, Any]] = []
+    for section in sections:
+        for part_index, part in enumerate(_split_text(section["text"], chunk_size)):
+            part_title = section["title"] if part_index == 0 else f"{section['title']} (cont.)"
+            last = chunks[-1] if chunks else None
+            if last and part_index == 0 and len(last["text"]) + len(part) <= chunk_size // 2:
+                # Pack small sections together (the chunk keeps its first title)
+                last["text"] = f"{last['text']}\n\n{part_title}\n{part}"
+            else:
+                chunks.append({"title": part_title, "text": part})
+
+    for chunk in chunks:
+        chunk["chars"] = len(chunk["text"])
+    return chunks
+
+
+def _split_text(text: str, chunk_size: int) -> List[str]:
+    """Split text at paragraph boundaries into parts of at most chunk_size"""
+    parts: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > chunk_size:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(paragraph[:chunk_size])
+            paragraph = paragraph[chunk_size:]
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            parts.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        parts.append(current)
+    return parts
+
+
+def allocate_slides(chunks: List[Dict[str, Any]], slide_count: int) -> List[int]:
+    """
+    Distribute slides across chunks proportionally to their length
+
+    Uses the largest-remainder method, so the counts always sum to
+    slide_count.
+
+    Args:
+        chunks: Output of split_sections
+        slide_count: Number of content slides to distribute
+
+    Returns:
+        Slide count per chunk
+    """
+    if not chunks or slide_count <= 0:
+        return [0] * len(chunks)
+
+    total = sum(c["chars"] for c in chunks) or len(chunks)
+    shares = [slide_count * (c["chars"] or 1) / total for c in chunks]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(chunks)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:slide_count - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class DocumentPlanner:
+    """Plans decks from long documents with a map-reduce over sections"""
+
+    def __init__(self, glm_client: Any, max_parallel: int = PlanningConfig.MAX_PARALLEL_SUMMARIES):
+        """
+        Initialize planner
+
+        Args:
+            glm_client: GLMClient used for summaries and the reduce plan
+            max_parallel: Concurrent summary requests
+        """
+        self.glm_client = glm_client
+        self.max_parallel = max(1, max_parallel)
+
+    def plan(
+        self,
+        content: str,
+        page_count: int,
+        on_slide: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan a deck from a long document
+
+        Args:
+            content: Document text
+            page_count: Number of pages
+            on_slide: Optional callback (index, slide), as in GLMClient.generate_slide_plan
+
+        Returns:
+            Content plan dict with title and slides
+        """
+        chunks = split_sections(content)
+        print(f"[PLAN] Long document ({len(content)} chars): {len(chunks)} sections")
+
+        # Map: summarize sections in parallel
+        with span("plan.map", sections=len(chunks)):
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="plan-map") as executor:
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self.glm_client.summarize_section,
+                        chunk["title"], chunk["text"], PlanningConfig.SUMMARY_MAX_CHARS
+                    )
+                    for chunk in chunks
+                ]
+                summaries = [f.result() for f in futures]
+
+        # Reduce: allocate slides, then plan from the summaries
+        content_slides = max(0, page_count - 2)
+        allocation = allocate_slides(chunks, content_slides)
+        title = _document_title(content)
+
+        with span("plan.reduce", slides=page_count):
+            if self.glm_client.client:
+                digest = self._digest(chunks, summaries, allocation)
+                if page_count > PlanningConfig.OUTLINE_THRESHOLD:
+                    # Large deck: the outline planner expands sections in parallel
+                    from core.outline_planner import OutlinePlanner
+                    return OutlinePlanner(self.glm_client).plan(title, page_count, on_slide=on_slide, context=digest)
+                plan = self.glm_client.generate_slide_plan(title, page_count, on_slide=on_slide, context=digest)
+                if not plan.get("title"):
+                    plan["title"] = title
+                return plan
+
+            plan = self._extractive_plan(title, chunks, summaries, allocation, page_count)
+            if on_slide:
+                for i, slide in enumerate(plan["slides"]):
+                    on_slide(i, slide)
+            return plan
+
+    @staticmethod
+    def _digest(chunks: List[Dict[str, Any]], summaries: List[str], allocation: List[int]) -> str:
+        """Planning context built from section summaries"""
+        lines = [
+            "Long report, summarized by section. Follow the slide allocation per section;",
+            "sections with 0 slides may be mentioned on neighbouring slides.",
+            "",
+        ]
+        for i, (chunk, summary, slides) in enumerate(zip(chunks, summaries, allocation), 1):
+            lines.append(f"{i}. {chunk['title']} ({slides} slides)")
+            lines.append(summary.strip())
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    @staticmethod
+    def _extractive_plan(
+        title: str,
+        chunks: List[Dict[str, Any]],
+        summaries: List[str],
+        allocation: List[int],
+        page_count: int
+    ) -> Dict[str, Any]:
+        """Plan without GLM: allocated slides take consecutive parts of each summary"""
+        slides = [{"page_type": "cover", "content": title}]
+        for chunk, summary, count in zip(chunks, summaries, allocation):
+            if count <= 0:
+                continue
+            step = max(1, len(summary) // count)
+            for part in range(count):
+                text = summary[part * step:(part + 1) * step].strip()
+                slides.append({"page_type": "content", "content": f"{chunk['title']}: {text[:200]}"})
+        if page_count > 1:
+            slides.append({"page_type": "summary", "content": f"{title} Summary"})
+
+        return {"title": title[:50], "total_slides": len(slides), "slides": slides[:max(1, page_count)]}
+
+
+def _document_title(content: str) -> str:
+    """First heading or first non-empty line"""
+    for line in content.split("\n"):
+        stripped = line.strip().lstrip("#").strip()
+        if stripped:
+            return stripped[:50]
+    return "Presentation"
+
+
+def content_reference(content: str) -> Dict[str, Any]:
+    """
+    Log-friendly reference to the source content
+
+    Returns:
+        {"content_sha256", "content_chars"}, plus "content" itself when it is
+        no longer than PlanningConfig.LOG_CONTENT_MAX_CHARS
+    """
+    reference: Dict[str, Any] = {
+        "content_sha256": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        "content_chars": len(content),
+    }
+    if len(content) <= PlanningConfig.LOG_CONTENT_MAX_CHARS:
+        reference["content"] = content
+    return reference
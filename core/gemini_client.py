@@ -3,34 +3,45 @@ Gemini Client - Gemini Image Generation Client
 Uses Imagen 4 via google.genai
 """
 
-import os
 import base64
-from typing import Optional, List
+from typing import Any, Optional, List, Union
 from google import genai
 from google.genai import types
 
 from core.base_client import BaseImageClient
-from core.config import ModelConfig, ResolutionConfig, GenerationConfig
+from core.config import HTTPConfig, ModelConfig, ResolutionConfig, GenerationConfig
+from core.key_pool import KeyPool, resolve_keys
+from core.http_transport import client_settings
 from core.prompt_builder import ImagePromptBuilder
 from core.image_utils import save_base64_image
+from core.metrics import record_provider_error
 
 
 class GeminiClient(BaseImageClient):
     """Gemini API Client for PPT image generation"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[Union[str, List[str]]] = None, http_client: Optional[Any] = None):
         """
         Initialize Gemini Client
 
         Args:
-            api_key: Gemini API key, read from env var if not provided
+            api_key: Gemini API key, or several (list or comma separated)
+                     that are rotated; read from env var if not provided
+            http_client: Shared httpx.Client (see core.http_transport);
+                         the SDK's default transport if not provided
         """
         super().__init__(api_key)
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
+        keys = resolve_keys(api_key, 'GEMINI_API_KEY')
+        if not keys:
             raise ValueError("GEMINI_API_KEY not set, please check .env file")
+        self.api_key = keys[0]
 
-        self.client = genai.Client(api_key=self.api_key)
+        if http_client is not None:
+            http_options = _http_options(http_client)
+            self.keys = KeyPool("GEMINI", keys, lambda key: genai.Client(api_key=key, http_options=http_options))
+        else:
+            self.keys = KeyPool("GEMINI", keys, lambda key: genai.Client(api_key=key))
+        self.client = self.keys.client
         self.model = ModelConfig.GEMINI_IMAGE_MODEL
 
     def generate_image(
@@ -54,18 +65,19 @@ class GeminiClient(BaseImageClient):
             Image base64 data
         """
         full_prompt = ImagePromptBuilder.build_prompt(
-            prompt, aspect_ratio, resolution, style
+            prompt, aspect_ratio, resolution, style, provider="GEMINI"
         )
 
         try:
-            response = self.client.models.generate_images(
-                model=self.model,
-                prompt=full_prompt,
-                config=types.GenerateImagesConfig(
-                    number_of_images=1,
-                    aspect_ratio=aspect_ratio,
+            with self.keys.lease() as client:
+                response = client.models.generate_images(
+                    model=self.model,
+                    prompt=full_prompt,
+                    config=types.GenerateImagesConfig(
+                        number_of_images=1,
+                        aspect_ratio=aspect_ratio,
+                    )
                 )
-            )
 
             # Parse response - Imagen 4 returns image bytes
             if response.generated_images and len(response.generated_images) > 0:
@@ -83,5 +95,16 @@ class GeminiClient(BaseImageClient):
 
         except Exception as e:
             print(f"[GEMINI] Image generation failed: {str(e)}")
+            record_provider_error("GEMINI", "image", e)
             return None
 
+
+
+def _http_options(http_client: Any) -> "types.HttpOptions":
+    """HttpOptions using the shared httpx client (older SDKs copy its pool settings instead)"""
+    timeout_ms = int(HTTPConfig.READ_TIMEOUT * 1000)
+    try:
+        return types.HttpOptions(timeout=timeout_ms, httpx_client=http_client)
+    except Exception:
+        # google-genai without httpx_client: same tuning in a pool of its own
+        return types.HttpOptions(timeout=timeout_ms, client_args=client_settings())
@@ -5,6 +5,9 @@ Simplifies multi-level fallback by trying clients in order until all images succ
 
 from typing import List, Optional
 from core.base_client import BaseImageClient
+from core.config import CoalescingConfig
+from core.single_flight import SingleFlight, request_key
+from core.tracing import span
 
 
 class ImageGenerationChain:
@@ -24,6 +27,8 @@ class ImageGenerationChain:
                     (e.g., [glm_client, gemini_client, openrouter_client])
         """
         self.clients = [c for c in clients if c.is_available()]
+        # Identical single-image requests running at the same time share one chain walk
+        self._flights = SingleFlight("image")
 
         if not self.clients:
             print("[CHAIN] Warning: No available clients in chain")
@@ -74,19 +79,30 @@ class ImageGenerationChain:
             print(f"\n[CHAIN] Level {level}: Trying {client_name}")
             print(f"[CHAIN] Pending: {len(pending_indices)}/{len(prompts)} images")
 
-            # Generate only pending images
-            pending_prompts = [prompts[i] for i in pending_indices]
+            # Generate only pending images, each distinct prompt once
+            # (source maps each pending slide to the slide whose request it shares)
+            if CoalescingConfig.IMAGES:
+                first_index = {}
+                source = {i: first_index.setdefault(" ".join(prompts[i].split()), i) for i in pending_indices}
+            else:
+                source = {i: i for i in pending_indices}
+            request_indices = list(dict.fromkeys(source.values()))
+            pending_prompts = [prompts[i] for i in request_indices]
 
             try:
-                pending_results = client.generate_images(
-                    prompts=pending_prompts,
-                    resolution=resolution,
-                    style=style,
-                    aspect_ratio=aspect_ratio
-                )
-
-                # Fill in successful results
-                for i, result in zip(pending_indices, pending_results):
+                with span(f"chain.level{level}", cat="chain", provider=client_name, pending=len(request_indices)):
+                    pending_results = client.generate_images(
+                        prompts=pending_prompts,
+                        resolution=resolution,
+                        style=style,
+                        aspect_ratio=aspect_ratio,
+                        slide_numbers=[i + 1 for i in request_indices]
+                    )
+
+                # Fill in successful results (duplicates share their prompt's image)
+                by_index = dict(zip(request_indices, pending_results))
+                for i in pending_indices:
+                    result = by_index.get(source[i])
                     if result is not None:
                         results[i] = result
 
@@ -113,27 +129,52 @@ class ImageGenerationChain:
         prompt: str,
         resolution: str = "2K",
         style: str = "realistic",
-        aspect_ratio: str = "16:9"
+        aspect_ratio: str = "16:9",
+        slide: Optional[int] = None
     ) -> Optional[str]:
         """
         Generate a single image with fallback
 
+        Concurrent calls with the same normalized prompt and settings (e.g.
+        templated covers across a batch) wait on the first one and share its
+        image.
+
         Args:
             prompt: Image generation prompt
             resolution: Resolution
             style: Style description
             aspect_ratio: Aspect ratio
+            slide: Slide number recorded on traces
 
         Returns:
             Base64 image data, or None if all clients failed
         """
+        if not CoalescingConfig.IMAGES:
+            return self._generate_single_image(prompt, resolution, style, aspect_ratio, slide)
+        key = request_key("image", {
+            "prompt": prompt, "resolution": resolution, "style": style, "aspect_ratio": aspect_ratio
+        })
+        return self._flights.do(
+            key, lambda: self._generate_single_image(prompt, resolution, style, aspect_ratio, slide)
+        )
+
+    def _generate_single_image(
+        self,
+        prompt: str,
+        resolution: str,
+        style: str,
+        aspect_ratio: str,
+        slide: Optional[int]
+    ) -> Optional[str]:
+        """Walk the chain for one image"""
         for client in self.clients:
             client_name = client.get_client_name()
             print(f"[CHAIN] Trying {client_name} for single image...")
 
             try:
-                result = client.generate_image(
+                result = client.generate_image_traced(
                     prompt=prompt,
+                    slide=slide,
                     aspect_ratio=aspect_ratio,
                     resolution=resolution,
                     style=style
@@ -4,34 +4,49 @@ GLM Client - GLM-4V API Client
 优先使用 GLM-4V 生成图片
 """
 
-import os
 import json
-import re
-from typing import Optional, Dict, Any, List
+import os
+import time
+from typing import Optional, Dict, Any, List, Callable, Iterator, Union
 from zhipuai import ZhipuAI
 
 from core.base_client import BaseImageClient
-from core.config import ModelConfig, ResolutionConfig, GenerationConfig
+from core.config import CoalescingConfig, ModelConfig, ResolutionConfig, GenerationConfig, TransitionConfig
+from core.key_pool import KeyPool, resolve_keys
+from core.single_flight import SingleFlight, request_key
 from core.prompt_builder import ImagePromptBuilder
+from core.plan_stream import SlidePlanStreamParser
+from core.metrics import (
+    PROVIDER_IN_FLIGHT, PROVIDER_LATENCY, PROVIDER_REQUESTS, record_provider_error
+)
 
 
 class GLMClient(BaseImageClient):
     """GLM-4V API Client for image generation and auxiliary functions"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[Union[str, List[str]]] = None, http_client: Optional[Any] = None):
         """
         Initialize GLM Client
 
         Args:
-            api_key: GLM API key, read from env var if not provided
+            api_key: GLM API key, or several (list or comma separated) that
+                     are rotated; read from env var if not provided
+            http_client: Shared httpx.Client (see core.http_transport);
+                         the SDK's default transport if not provided
         """
         super().__init__(api_key)
-        self.api_key = api_key or os.getenv('GLM_API_KEY')
-        if not self.api_key:
+        # Identical chat requests running at the same time share one call
+        self._chat_flights = SingleFlight("chat")
+        keys = resolve_keys(api_key, 'GLM_API_KEY')
+        self.api_key = keys[0] if keys else None
+        if not keys:
             print("[GLM] GLM_API_KEY not set, GLM features will be disabled")
             self.client = None
-        else:
-            self.client = ZhipuAI(api_key=self.api_key)
+            return
+
+        transport = {"http_client": http_client, "timeout": http_client.timeout} if http_client is not None else {}
+        self.keys = KeyPool("GLM", keys, lambda key: ZhipuAI(api_key=key, **transport))
+        self.client = self.keys.client
 
     # ========================================
     # Image Generation (GLM-4V)
@@ -61,16 +76,17 @@ class GLMClient(BaseImageClient):
             return None
 
         full_prompt = ImagePromptBuilder.build_prompt(
-            prompt, aspect_ratio, resolution, style
+            prompt, aspect_ratio, resolution, style, provider="GLM"
         )
 
         try:
             # Try CogView-3 for image generation
-            response = self.client.images.generations(
-                model=ModelConfig.GLM_IMAGE_MODEL,
-                prompt=full_prompt,
-                size=ResolutionConfig.get_size(aspect_ratio, resolution)
-            )
+            with self.keys.lease() as client:
+                response = client.images.generations(
+                    model=ModelConfig.GLM_IMAGE_MODEL,
+                    prompt=full_prompt,
+                    size=ResolutionConfig.get_size(aspect_ratio, resolution)
+                )
 
             if response.data and len(response.data) > 0:
                 # Return base64 of the image
@@ -80,6 +96,7 @@ class GLMClient(BaseImageClient):
 
         except Exception as e:
             print(f"[GLM] Image generation failed: {str(e)}")
+            record_provider_error("GLM", "image", e)
             return None
 
 
@@ -91,30 +108,51 @@ class GLMClient(BaseImageClient):
     def generate_slide_plan(
         self,
         topic: str,
-        page_count: int = 5
+        page_count: int = 5,
+        on_slide: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        context: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate PPT content plan from topic
 
+        The completion is streamed; each slide is passed to on_slide as
+        soon as its JSON object is complete, so callers can start image
+        generation while the rest of the plan is still being written.
+        on_slide receives exactly the slides of the returned plan, in order.
+
         Args:
             topic: Presentation topic
             page_count: Number of pages
+            on_slide: Optional callback (index, slide)
+            context: Optional source material (e.g. section summaries of a
+                     long document) the plan should follow
 
         Returns:
             Content plan dict with title and slides
         """
+        emitted: List[Dict[str, Any]] = []
+
+        def emit(slide: Dict[str, Any]) -> None:
+            emitted.append(slide)
+            if on_slide:
+                on_slide(len(emitted) - 1, slide)
+
         if not self.client:
-            return self._default_plan(topic, page_count)
+            plan = self._default_plan(topic, page_count)
+            for slide in plan["slides"]:
+                emit(slide)
+            return plan
 
+        source = f"\nSource material:\n{context}\n" if context else ""
         prompt = f"""Generate a {page_count}-page PPT content plan for:
 
 Topic: {topic}
-
+{source}
 Generate structured content plan with:
 1. Page type (cover/content/data/summary)
 2. Page content (concise)
 
-Return as JSON:
+Return only JSON with exactly {page_count} slides:
 {{
   "title": "Presentation Title",
   "slides": [
@@ -123,40 +161,43 @@ Return as JSON:
   ]
 }}"""
 
+        parser = SlidePlanStreamParser()
         try:
-            response = self.client.chat.completions.create(
-                model=ModelConfig.GLM_CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a professional presentation planner."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
+            for chunk in self._chat_stream(
+                system="You are a professional presentation planner.",
+                prompt=prompt,
+                temperature=0.7
+            ):
+                for slide in parser.feed(chunk):
+                    emit(slide)
 
-            content = response.choices[0].message.content
-            return self._parse_plan_response(content)
+            plan = parser.close() or self._parse_plan_response(parser.text, page_count)
 
         except Exception as e:
             print(f"[GLM] Plan generation failed, using default: {str(e)}")
-            return self._default_plan(topic, page_count)
+            plan = self._default_plan(topic, page_count)
+            # Keep slides already handed out; complete the rest from the default plan
+            plan["slides"] = emitted + plan["slides"][len(emitted):]
+
+        for slide in plan["slides"][len(emitted):]:
+            emit(slide)
+        return plan
 
-    def _parse_plan_response(self, content: str) -> Dict[str, Any]:
+    def _parse_plan_response(self, content: str, page_count: Optional[int] = None) -> Dict[str, Any]:
         """Parse plan response"""
         # Try to extract JSON
-        json_match = re.search(r'\{[^{}]*"slides"[^{}]*\}', content, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError as e:
-                print(f"[GLM] JSON parse failed: {e}")
-            except Exception as e:
-                print(f"[GLM] Unexpected error parsing JSON: {e}")
+        parser = SlidePlanStreamParser()
+        parser.feed(content)
+        plan = parser.close()
+        if plan:
+            return plan
+        print("[GLM] No JSON plan in response, splitting lines")
 
         # Fallback: create plan from content
-        lines = [l.strip() for l in content.split('\n') if l.strip()]
+        lines = [l.strip() for l in content.split('\n') if l.strip() and not l.strip().startswith("```")]
 
         slides = []
-        for i, line in enumerate(lines[:5]):  # Max 5 slides
+        for i, line in enumerate(lines[:page_count]):
             if i == 0:
                 slides.append({"page_type": "cover", "content": line[:100]})
             else:
@@ -167,6 +208,147 @@ Return as JSON:
             "slides": slides
         }
 
+    def generate_outline(
+        self,
+        topic: str,
+        section_count: int,
+        slide_count: int,
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a section outline (first level of hierarchical planning)
+
+        Args:
+            topic: Presentation topic
+            section_count: Number of sections
+            slide_count: Content slides to spread over the sections
+            context: Optional source material
+
+        Returns:
+            {"title", "sections": [{"title", "summary", "slides"}]}
+        """
+        if not self.client:
+            return self._default_outline(topic, section_count, slide_count)
+
+        source = f"\nSource material:\n{context}\n" if context else ""
+        prompt = f"""Generate a section outline for a {slide_count}-slide presentation:
+
+Topic: {topic}
+{source}
+Split it into exactly {section_count} sections. For each section give a title,
+a one-paragraph summary of what it covers, and its number of slides.
+The slide numbers must add up to {slide_count}.
+
+Return only JSON:
+{{
+  "title": "Presentation Title",
+  "sections": [
+    {{"title": "Section title", "summary": "What the section covers", "slides": 8}}
+  ]
+}}"""
+
+        try:
+            parser = SlidePlanStreamParser(key="sections")
+            parser.feed(self._chat(
+                system="You are a professional presentation planner.",
+                prompt=prompt,
+                temperature=0.7
+            ))
+            outline = parser.close()
+            if outline:
+                return outline
+            print("[GLM] No JSON outline in response, using default")
+
+        except Exception as e:
+            print(f"[GLM] Outline generation failed, using default: {str(e)}")
+
+        return self._default_outline(topic, section_count, slide_count)
+
+    def expand_section(
+        self,
+        deck_title: str,
+        section: Dict[str, Any],
+        slide_count: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Write the slides of one outline section (second level of hierarchical planning)
+
+        Args:
+            deck_title: Presentation title
+            section: Outline section with title and summary
+            slide_count: Number of slides to write
+
+        Returns:
+            Slide dicts (page_type, content); may differ in length from slide_count
+        """
+        if not self.client:
+            return self._default_section_slides(section, slide_count)
+
+        prompt = f"""Write {slide_count} slides for one section of the presentation "{deck_title}".
+
+Section: {section.get("title", "")}
+Covers: {section.get("summary", "")}
+
+Use page_type "content" or "data". Keep each slide's content concise.
+
+Return only JSON:
+{{
+  "slides": [
+    {{"page_type": "content", "content": "Slide content"}}
+  ]
+}}"""
+
+        try:
+            parser = SlidePlanStreamParser()
+            parser.feed(self._chat(
+                system="You are a professional presentation planner.",
+                prompt=prompt,
+                temperature=0.7
+            ))
+            plan = parser.close()
+            if plan:
+                return plan["slides"]
+            print(f"[GLM] No JSON slides for section '{section.get('title', '')}', using default")
+
+        except Exception as e:
+            print(f"[GLM] Section expansion failed, using default: {str(e)}")
+
+        return self._default_section_slides(section, slide_count)
+
+    def summarize_section(self, title: str, text: str, max_chars: int = 600) -> str:
+        """
+        Summarize one section of a long document (map step of chunked planning)
+
+        Args:
+            title: Section title
+            text: Section text
+            max_chars: Summary length limit
+
+        Returns:
+            Summary text (leading extract of the section if GLM is unavailable)
+        """
+        if not self.client:
+            return text[:max_chars]
+
+        prompt = f"""Summarize this section of a report for presentation planning.
+Keep key facts, figures and conclusions. Maximum {max_chars} characters.
+
+Section: {title}
+
+{text}"""
+
+        try:
+            content = self._chat(
+                system="You are a professional report analyst.",
+                prompt=prompt,
+                temperature=0.3
+            )
+            return content.strip()[:max_chars]
+
+        except Exception as e:
+            print(f"[GLM] Section summary failed: {str(e)}")
+            return text[:max_chars]
+
     # ========================================
     # Transition Description
     # ========================================
@@ -196,22 +378,153 @@ Generate:
 Return as JSON."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=ModelConfig.GLM_CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a professional presentation transition designer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
+            content = self._chat(
+                system="You are a professional presentation transition designer.",
+                prompt=prompt,
+                temperature=0.7
             )
-
-            content = response.choices[0].message.content
             return self._parse_transition_response(content)
 
         except Exception as e:
             print(f"[GLM] Transition generation failed: {str(e)}")
             return self._fallback_transition(from_image, to_image)
 
+    def generate_transitions(
+        self,
+        slides: List[Dict[str, Any]],
+        style: str = "professional",
+        descriptors: Optional[List[Optional[Dict[str, Any]]]] = None,
+        numbers: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate the transitions of a slide sequence in one request
+
+        Args:
+            slides: Consecutive slides from the plan (page_type, content)
+            style: Style name
+            descriptors: Optional image descriptor per slide (palette,
+                         brightness, detail), e.g. from TransitionAnalyzer
+            numbers: Deck slide number of each slide (default: 1, 2, ...),
+                     used in the prompt and to match the response
+
+        Returns:
+            len(slides) - 1 transitions in order; pairs missing from the
+            response get the default transition
+        """
+        count = len(slides) - 1
+        if count <= 0:
+            return []
+        if not self.client:
+            return [self._fallback_transition("", "") for _ in range(count)]
+
+        numbers = list(numbers) if numbers else list(range(1, len(slides) + 1))
+        lines = []
+        for offset, slide in enumerate(slides):
+            text = " ".join(str(slide.get("content", "")).split())[:TransitionConfig.SLIDE_CONTENT_CHARS]
+            line = f"{numbers[offset]}. [{slide.get('page_type', 'content')}] {text}"
+            descriptor = descriptors[offset] if descriptors else None
+            if descriptor:
+                line += (f" (colors: {', '.join(descriptor['palette'])}; "
+                         f"brightness {descriptor['brightness']}; detail {descriptor['detail']})")
+            lines.append(line)
+        slide_list = "\n".join(lines)
+
+        prompt = f"""Design the transitions of this presentation, one for each pair of consecutive slides.
+
+Slides:
+{slide_list}
+
+Style: {style}
+
+Return only a JSON array with exactly {count} objects, in slide order, using the slide numbers above:
+[
+  {{"from": {numbers[0]}, "to": {numbers[1]}, "transition_type": "fade", "duration": 1.5, "description": "...", "key_elements": ["..."]}}
+]
+transition_type is one of fade, slide, zoom, dissolve, wipe, morph; duration is in seconds (1-3)."""
+
+        try:
+            content = self._chat(
+                system="You are a professional presentation transition designer.",
+                prompt=prompt,
+                temperature=0.7
+            )
+            transitions = self._parse_transitions_response(content, numbers)
+        except Exception as e:
+            print(f"[GLM] Transition generation failed: {str(e)}")
+            transitions = [None] * count
+
+        missing = transitions.count(None)
+        if missing:
+            print(f"[GLM] {missing}/{count} transitions missing from response, using default")
+        return [t or self._fallback_transition("", "") for t in transitions]
+
+    def _parse_transitions_response(
+        self,
+        content: str,
+        numbers: List[int]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parse a batched transition response
+
+        Accepts a bare array, an object wrapping it, code fences or a
+        truncated array: every complete transition object is decoded and
+        placed by its "from" slide number (or by order when it has none).
+
+        Args:
+            content: Response text
+            numbers: Deck slide number of each slide in the request
+
+        Returns:
+            len(numbers) - 1 entries, None where the response has no transition
+        """
+        count = len(numbers) - 1
+        positions = {number: i for i, number in enumerate(numbers[:-1])}
+        transitions: List[Optional[Dict[str, Any]]] = [None] * count
+        decoder = json.JSONDecoder()
+        # Position of the next object without a usable "from"
+        position = 0
+        pos = content.find("{")
+        while pos != -1:
+            try:
+                value, end = decoder.raw_decode(content, pos)
+            except ValueError:
+                pos = content.find("{", pos + 1)
+                continue
+            if not isinstance(value, dict) or not ("transition_type" in value or "type" in value):
+                # Wrapper object or stray JSON: look inside it
+                pos = content.find("{", pos + 1)
+                continue
+
+            try:
+                index = positions.get(int(value["from"]))
+            except (KeyError, TypeError, ValueError):
+                index = None
+            if index is None:
+                index = position
+            position = index + 1
+            if index < count and transitions[index] is None:
+                transitions[index] = self._normalize_transition(value)
+            pos = content.find("{", end)
+        return transitions
+
+    def _normalize_transition(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Transition dict in the log format from one parsed response object"""
+        try:
+            duration = float(str(value.get("duration", 1.5)).strip().rstrip("s"))
+        except ValueError:
+            duration = 1.5
+        key_elements = value.get("key_elements")
+        if not isinstance(key_elements, list):
+            key_elements = [key_elements] if key_elements else []
+        return {
+            "transition_type": str(value.get("transition_type") or value.get("type") or "fade").strip().lower(),
+            "duration": f"{min(max(duration, 0.3), 3.0):.1f}",
+            "description": str(value.get("description", "")),
+            "key_elements": [str(e) for e in key_elements],
+            "color_consistency": "auto",
+            "engine": "llm"
+        }
+
     def _parse_transition_response(self, content: str) -> Dict[str, Any]:
         """Parse transition response"""
         return {
@@ -258,25 +571,133 @@ Requirements:
 Return optimized content."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=ModelConfig.GLM_CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a professional presentation content editor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
+            optimized = self._chat(
+                system="You are a professional presentation content editor.",
+                prompt=prompt,
+                temperature=0.3
             )
-
-            return response.choices[0].message.content.strip()
+            return optimized.strip()
 
         except Exception as e:
             print(f"[GLM] Content optimization failed: {str(e)}")
             return content
 
+    # ========================================
+    # Chat
+    # ========================================
+
+    def _chat(self, system: str, prompt: str, temperature: float) -> str:
+        """
+        Run one chat completion, or share the identical one already running
+
+        Args:
+            system: System message
+            prompt: User message
+            temperature: Sampling temperature
+
+        Returns:
+            Assistant message content
+        """
+        if not CoalescingConfig.CHAT:
+            return self._request_chat(system, prompt, temperature)
+        key = request_key("chat", {"system": system, "prompt": prompt, "temperature": temperature})
+        return self._chat_flights.do(key, lambda: self._request_chat(system, prompt, temperature))
+
+    def _chat_stream(self, system: str, prompt: str, temperature: float) -> Iterator[str]:
+        """
+        Run one streamed chat completion, or follow the identical one already running
+
+        Args:
+            system: System message
+            prompt: User message
+            temperature: Sampling temperature
+
+        Yields:
+            Content deltas as they arrive
+        """
+        if not CoalescingConfig.CHAT:
+            return self._request_chat_stream(system, prompt, temperature)
+        key = request_key("chat_stream", {"system": system, "prompt": prompt, "temperature": temperature})
+        return self._chat_flights.stream(key, lambda: self._request_chat_stream(system, prompt, temperature))
+
+    def _request_chat(self, system: str, prompt: str, temperature: float) -> str:
+        """Chat completion request to the provider"""
+        PROVIDER_IN_FLIGHT.inc(provider="GLM", operation="chat")
+        start = time.perf_counter()
+        outcome = "failure"
+        try:
+            with self.keys.lease() as client:
+                response = client.chat.completions.create(
+                    model=ModelConfig.GLM_CHAT_MODEL,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                )
+            content = response.choices[0].message.content
+            outcome = "success"
+            return content
+        except Exception as e:
+            record_provider_error("GLM", "chat", e)
+            raise
+        finally:
+            PROVIDER_IN_FLIGHT.dec(provider="GLM", operation="chat")
+            PROVIDER_LATENCY.observe(time.perf_counter() - start, provider="GLM", operation="chat")
+            PROVIDER_REQUESTS.inc(provider="GLM", operation="chat", outcome=outcome)
+
+    def _request_chat_stream(self, system: str, prompt: str, temperature: float) -> Iterator[str]:
+        """Streamed chat completion request to the provider"""
+        PROVIDER_IN_FLIGHT.inc(provider="GLM", operation="chat")
+        start = time.perf_counter()
+        outcome = "failure"
+        try:
+            # The key stays leased while the stream is read
+            with self.keys.lease() as client:
+                response = client.chat.completions.create(
+                    model=ModelConfig.GLM_CHAT_MODEL,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                    stream=True,
+                )
+                for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            outcome = "success"
+        except Exception as e:
+            record_provider_error("GLM", "chat", e)
+            raise
+        finally:
+            PROVIDER_IN_FLIGHT.dec(provider="GLM", operation="chat")
+            PROVIDER_LATENCY.observe(time.perf_counter() - start, provider="GLM", operation="chat")
+            PROVIDER_REQUESTS.inc(provider="GLM", operation="chat", outcome=outcome)
+
     # ========================================
     # Default Plan
     # ========================================
 
+    def _default_outline(self, topic: str, section_count: int, slide_count: int) -> Dict[str, Any]:
+        """Default outline: equal parts"""
+        base, extra = divmod(slide_count, max(1, section_count))
+        return {
+            "title": topic[:50],
+            "sections": [
+                {"title": f"Part {i+1}", "summary": f"Part {i+1} of {topic[:50]}", "slides": base + (1 if i < extra else 0)}
+                for i in range(section_count)
+            ]
+        }
+
+    def _default_section_slides(self, section: Dict[str, Any], slide_count: int) -> List[Dict[str, Any]]:
+        """Default slides of an outline section"""
+        return [
+            {"page_type": "content", "content": f"{section.get('title', 'Section')}: point {i+1}"}
+            for i in range(slide_count)
+        ]
+
     def _default_plan(self, topic: str, page_count: int) -> Dict[str, Any]:
         """Default content plan"""
         slides = []
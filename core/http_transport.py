@@ -0,0 +1,128 @@
+"""
+HTTP Transport - Shared, tuned HTTP client for the provider SDKs
+One connection pool sized to the provider concurrency limits, with keep-alive, HTTP/2 and explicit timeouts
+
+The Gemini, GLM and OpenRouter SDKs all speak httpx. Handing them one client
+means connections are reused across decks, the pool cannot run out below the
+scheduler's concurrency limits, and prewarm() can open connections before
+the first slide needs them (DNS, TCP and TLS are paid during planning).
+
+Usage:
+    http_client = build_http_client(SchedulerConfig.PROVIDER_CONCURRENCY)
+    client = OpenAI(api_key=key, http_client=http_client, timeout=http_client.timeout)
+    prewarm(http_client, ["GLM", "GEMINI"])
+"""
+
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # httpx missing: SDKs fall back to their default transports
+    httpx = None
+
+from core.config import HTTPConfig, SchedulerConfig
+
+
+def pool_size(concurrency: Dict[str, int]) -> int:
+    """
+    Connections needed for the given provider concurrency limits
+
+    Args:
+        concurrency: Provider name -> concurrent requests
+
+    Returns:
+        Sum of the remote providers' limits plus HTTPConfig.CHAT_CONNECTIONS
+    """
+    remote = sum(limit for name, limit in concurrency.items() if name in HTTPConfig.PROVIDER_ORIGINS)
+    return remote + HTTPConfig.CHAT_CONNECTIONS
+
+
+def http_timeout() -> Optional["httpx.Timeout"]:
+    """Explicit connect/read/write/pool timeouts (None without httpx)"""
+    if httpx is None:
+        return None
+    return httpx.Timeout(
+        connect=HTTPConfig.CONNECT_TIMEOUT,
+        read=HTTPConfig.READ_TIMEOUT,
+        write=HTTPConfig.WRITE_TIMEOUT,
+        pool=HTTPConfig.POOL_TIMEOUT
+    )
+
+
+def client_settings(concurrency: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    httpx.Client keyword arguments: pool limits, keep-alive, HTTP/2, timeouts
+
+    Args:
+        concurrency: Provider concurrency limits the pool must cover
+                     (default: SchedulerConfig.PROVIDER_CONCURRENCY)
+    """
+    size = pool_size(concurrency or SchedulerConfig.PROVIDER_CONCURRENCY)
+    return {
+        # HTTP/2 needs the h2 package; HTTP/1.1 otherwise
+        "http2": HTTPConfig.HTTP2 and importlib.util.find_spec("h2") is not None,
+        "timeout": http_timeout(),
+        "limits": httpx.Limits(
+            max_connections=size,
+            max_keepalive_connections=size,
+            keepalive_expiry=HTTPConfig.KEEPALIVE_EXPIRY
+        ),
+    }
+
+
+def build_http_client(concurrency: Optional[Dict[str, int]] = None) -> Optional["httpx.Client"]:
+    """
+    Shared HTTP client for every provider SDK
+
+    Args:
+        concurrency: Provider concurrency limits the pool must cover
+                     (default: SchedulerConfig.PROVIDER_CONCURRENCY)
+
+    Returns:
+        httpx.Client, or None if httpx is not installed
+    """
+    if httpx is None:
+        return None
+    return httpx.Client(**client_settings(concurrency))
+
+
+def prewarm(
+    http_client: "httpx.Client",
+    providers: List[str],
+    connections: int = HTTPConfig.PREWARM_CONNECTIONS
+) -> Optional[threading.Thread]:
+    """
+    Open connections to providers in the background
+
+    Sends concurrent HEAD requests to each provider's origin; the response
+    does not matter, the pooled connection (DNS, TCP, TLS done) does.
+
+    Args:
+        http_client: Client whose pool is warmed
+        providers: Provider names (keys of HTTPConfig.PROVIDER_ORIGINS)
+        connections: Connections to open per provider
+
+    Returns:
+        The daemon thread doing the work, or None if there is nothing to warm
+    """
+    origins = [HTTPConfig.PROVIDER_ORIGINS[p] for p in providers if p in HTTPConfig.PROVIDER_ORIGINS]
+    if http_client is None or not origins:
+        return None
+
+    def touch(origin: str) -> None:
+        try:
+            http_client.head(origin, timeout=HTTPConfig.CONNECT_TIMEOUT)
+        except Exception as e:
+            print(f"[HTTP] Pre-warm {origin} failed: {str(e)}")
+
+    def run() -> None:
+        targets = [origin for origin in origins for _ in range(max(1, connections))]
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="prewarm") as executor:
+            list(executor.map(touch, targets))
+
+    thread = threading.Thread(target=run, name="http-prewarm", daemon=True)
+    thread.start()
+    return thread
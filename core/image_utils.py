@@ -4,7 +4,38 @@ Image Utilities - 图片处理工具
 """
 
 import base64
-from typing import Optional
+import contextvars
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from core.config import WriterConfig
+from core.tracing import span
+
+
+def decode_base64_image(image_base64: str) -> bytes:
+    """
+    解码 base64 图片数据
+
+    Args:
+        image_base64: Base64 编码的图片数据 (可能包含 data URL 前缀)
+
+    Returns:
+        图片字节
+
+    Raises:
+        Exception: 数据无效时抛出异常
+    """
+    # 移除 data URL 前缀 (如 "data:image/png;base64,")
+    if ',' in image_base64:
+        image_base64 = image_base64.split(',', 1)[1]
+    try:
+        return base64.b64decode(image_base64)
+    except base64.binascii.Error as e:
+        raise Exception(f"Invalid base64 data: {str(e)}")
 
 
 def save_base64_image(image_base64: str, filepath: str) -> None:
@@ -23,10 +54,18 @@ def save_base64_image(image_base64: str, filepath: str) -> None:
         if ',' in image_base64:
             image_base64 = image_base64.split(',', 1)[1]
 
-        # 解码并保存
+        # 解码并保存 (先写临时文件再替换，覆盖已有图片时读取方不会看到半张图)
+        # 临时文件名唯一：同一页被并发写入时 (分片重复渲染、升级与写盘并行) 互不覆盖
         image_data = base64.b64decode(image_base64)
-        with open(filepath, "wb") as f:
-            f.write(image_data)
+        temp_path = f"{filepath}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(image_data)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
 
         print(f"[SAVE] Image saved: {filepath}")
 
@@ -134,3 +173,95 @@ def remove_data_url_prefix(image_base64: str) -> str:
         return image_base64.split(',', 1)[1]
 
     return image_base64
+
+
+class ImageWriter:
+    """
+    后台图片写盘器
+
+    图片生成后立即交给写盘线程解码保存，调用方只保留文件路径。队列有界：
+    写盘跟不上时 submit() 阻塞，生成线程随之暂停，因此内存中同时存在的
+    图片数不超过 (并发数 + QUEUE_SIZE + THREADS)，与演示文稿页数无关。
+    """
+
+    def __init__(self, threads: int = WriterConfig.THREADS, queue_size: int = WriterConfig.QUEUE_SIZE):
+        """
+        初始化写盘器
+
+        Args:
+            threads: 写盘线程数
+            queue_size: 等待写盘的图片数上限
+        """
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = [
+            threading.Thread(target=self._run, name=f"image-writer-{i}", daemon=True)
+            for i in range(max(1, threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        image_base64: str,
+        filepath: str,
+        context: Optional[contextvars.Context] = None,
+        sink: Optional[Any] = None,
+        inspect: Optional[Callable[[str, bytes], None]] = None
+    ) -> Future:
+        """
+        排队写盘 (队列满时阻塞)
+
+        Args:
+            image_base64: Base64 编码的图片数据
+            filepath: 保存路径 (指定 sink 时为 sink.path() 返回的引用)
+            context: 写盘时使用的上下文 (用于 trace，默认为调用方当前上下文)
+            sink: 可选的 OutputSink，图片写入其中而不是直接写文件
+            inspect: 可选回调 (filepath, 图片字节)，写入后在写盘线程中调用 (如计算转场特征)
+
+        Returns:
+            Future，成功时结果为 filepath，失败时为异常
+        """
+        future = Future()
+        self._queue.put((image_base64, filepath, sink, inspect, future, context or contextvars.copy_context()))
+        return future
+
+    def close(self) -> None:
+        """写完队列中的图片后停止写盘线程"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            image_base64, filepath, sink, inspect, future, context = item
+            del item
+            try:
+                context.run(self._write, image_base64, filepath, sink, inspect)
+                future.set_result(filepath)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                # 释放图片数据，只保留路径
+                image_base64 = None
+
+    @staticmethod
+    def _write(
+        image_base64: str,
+        filepath: str,
+        sink: Optional[Any],
+        inspect: Optional[Callable[[str, bytes], None]]
+    ) -> None:
+        with span("write", cat="io", path=filepath):
+            if sink is None:
+                save_base64_image(image_base64, filepath)
+                image_data = decode_base64_image(image_base64) if inspect else None
+            else:
+                image_data = decode_base64_image(image_base64)
+                sink.write_bytes(sink.name_of(filepath), image_data)
+        if inspect is not None:
+            with span("inspect", cat="io", path=filepath):
+                inspect(filepath, image_data)
@@ -0,0 +1,180 @@
+"""
+Key Pool - Several API keys per provider, balanced least-loaded
+Each key has its own SDK client and rate-limit state; throttled or invalid keys are quarantined
+
+Keys come from the client's api_key argument (a string or a list) or from the
+provider's environment variable, where several keys are comma separated:
+
+    GLM_API_KEY=key-a,key-b,key-c
+
+Usage:
+    pool = KeyPool("GLM", resolve_keys(None, "GLM_API_KEY"), lambda key: ZhipuAI(api_key=key))
+    with pool.lease() as client:
+        client.chat.completions.create(...)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Union
+
+from core.config import KeyPoolConfig
+from core.metrics import API_KEY_QUARANTINES, API_KEYS_AVAILABLE, error_status, is_throttle_error, matches_phrase
+
+
+class KeysUnavailable(RuntimeError):
+    """Every key of a provider is quarantined"""
+
+
+def resolve_keys(api_key: Optional[Union[str, List[str]]], env_var: str) -> List[str]:
+    """
+    API keys from an explicit key or list, else from a comma-separated env var
+
+    Args:
+        api_key: Key, comma-separated keys or list of keys
+        env_var: Environment variable read when api_key is empty
+
+    Returns:
+        Distinct non-empty keys, in order
+    """
+    value = api_key if api_key else os.getenv(env_var, "")
+    keys = value if isinstance(value, (list, tuple)) else value.split(",")
+    return list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+
+
+def is_invalid_key_error(error: BaseException) -> bool:
+    """
+    Check whether an exception is a rejected API key
+
+    The SDK's HTTP status decides when there is one (401 or 403); without it,
+    the SDK's authentication error types and whole phrases such as
+    "invalid api key" in the message count.
+    """
+    status = error_status(error)
+    if status is not None:
+        return status in (401, 403)
+    if any(cls.__name__ in KeyPoolConfig.INVALID_KEY_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+    return matches_phrase(error, KeyPoolConfig.INVALID_KEY_MARKERS)
+
+
+class _Key:
+    """One key, its SDK client and rate-limit state"""
+
+    def __init__(self, key: str, client: Any):
+        self.key = key
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.quarantined_until = 0.0
+        self.throttles = 0
+
+    @property
+    def label(self) -> str:
+        """Masked key for logs"""
+        return f"...{self.key[-4:]}" if len(self.key) > 8 else "***"
+
+
+class KeyPool:
+    """API keys of one provider"""
+
+    def __init__(self, provider: str, keys: List[str], factory: Callable[[str], Any]):
+        """
+        Initialize pool
+
+        Args:
+            provider: Provider name (metrics and logs)
+            keys: API keys (at least one)
+            factory: Builds the SDK client for a key
+        """
+        if not keys:
+            raise ValueError(f"{provider} key pool needs at least one key")
+        self.provider = provider
+        self._keys = [_Key(key, factory(key)) for key in keys]
+        self._lock = threading.Lock()
+        self._reported = len(self._keys)
+        API_KEYS_AVAILABLE.set(len(self._keys), provider=provider)
+        if len(self._keys) > 1:
+            print(f"[KEYS] {provider}: {len(self._keys)} API keys in rotation")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def client(self) -> Any:
+        """SDK client of the first key"""
+        return self._keys[0].client
+
+    def available(self) -> int:
+        """Number of keys not in quarantine"""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for k in self._keys if k.quarantined_until <= now)
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """
+        SDK client of the least-loaded key for one request
+
+        Errors raised inside the block quarantine the key when they look like
+        rate limiting or a rejected key, then propagate. A pool with a single
+        key never quarantines it: the error fails only that request.
+
+        Raises:
+            KeysUnavailable: If every key is quarantined
+        """
+        key = self._acquire()
+        error = None
+        try:
+            yield key.client
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(key, error)
+
+    def _acquire(self) -> _Key:
+        now = time.monotonic()
+        with self._lock:
+            ready = [k for k in self._keys if k.quarantined_until <= now]
+            if len(ready) != self._reported:
+                # Keys come back from quarantine lazily, on the next request
+                self._reported = len(ready)
+                API_KEYS_AVAILABLE.set(len(ready), provider=self.provider)
+            if not ready:
+                wait = min(k.quarantined_until for k in self._keys) - now
+                raise KeysUnavailable(f"All {self.provider} API keys are quarantined (next in {wait:.0f}s)")
+            # Fewest requests in flight; ties go to the key used least overall
+            key = min(ready, key=lambda k: (k.in_flight, k.requests))
+            key.in_flight += 1
+            key.requests += 1
+            return key
+
+    def _release(self, key: _Key, error: Optional[BaseException]) -> None:
+        reason = None
+        with self._lock:
+            key.in_flight -= 1
+            if error is None:
+                key.throttles = 0
+            elif len(self._keys) == 1:
+                # No other key to fall back on
+                pass
+            elif is_invalid_key_error(error):
+                reason, duration = "invalid", KeyPoolConfig.INVALID_QUARANTINE
+            elif is_throttle_error(error):
+                reason = "throttled"
+                duration = min(
+                    KeyPoolConfig.THROTTLE_QUARANTINE * 2 ** key.throttles,
+                    KeyPoolConfig.MAX_THROTTLE_QUARANTINE
+                )
+                key.throttles += 1
+            if reason:
+                key.quarantined_until = time.monotonic() + duration
+        if reason:
+            API_KEY_QUARANTINES.inc(provider=self.provider, reason=reason)
+            available = self.available()
+            with self._lock:
+                self._reported = available
+            API_KEYS_AVAILABLE.set(available, provider=self.provider)
+            print(f"[KEYS] {self.provider} key {key.label} {reason}, quarantined for {duration:.0f}s")
@@ -0,0 +1,251 @@
+"""
+Local Renderer - Zero-network slide renderer used as the last fallback level
+Draws a styled text slide (title, bullets, style palette) with Pillow in milliseconds
+
+When every remote provider fails, the chain still returns an image for each
+planned slide, so decks keep one image per page even during provider outages.
+The slide text is recovered from the image prompt built from the style
+templates (TITLE:/SUBTITLE: lines or the block after "following content:").
+"""
+
+import base64
+import io
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow missing: the renderer reports itself unavailable
+    Image = ImageDraw = ImageFont = None
+
+from core.base_client import BaseImageClient
+from core.config import GenerationConfig, RendererConfig, ResolutionConfig
+from core.style_manager import STYLE_REGISTRY
+
+
+_CONTENT_INTRO = re.compile(r"following (?:content|information)\s*:\s*$", re.IGNORECASE)
+_SECTION_HEADER = re.compile(r"^[A-Z][A-Za-z /&-]{2,40}:$")
+_BULLET_MARK = re.compile(r"^(?:[-*•·]|\d+[.)、])\s*")
+_INLINE_CONTENT = re.compile(r"\bwith(?: title)?:\s*(.+?)\.\s*Style:", re.DOTALL)
+
+
+class LocalRendererClient(BaseImageClient):
+    """Renders text slides locally with Pillow (final fallback)"""
+
+    def __init__(self):
+        """Initialize renderer (available whenever Pillow is installed)"""
+        super().__init__(None)
+        self.client = "pillow" if Image is not None else None
+        if self.client is None:
+            print("[LOCAL] Pillow not installed, local slide rendering will be disabled")
+        self._fonts: Dict[Tuple[int, bool], "ImageFont.ImageFont"] = {}
+        self._font_lock = threading.Lock()
+
+    # ========================================
+    # Image Generation
+    # ========================================
+
+    def generate_image(
+        self,
+        prompt: str,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        **kwargs
+    ) -> Optional[str]:
+        """
+        Render a slide from its image prompt
+
+        Args:
+            prompt: Image generation prompt (built from a style template)
+            aspect_ratio: Aspect ratio
+            resolution: Resolution
+            style: Style name, whose file provides the palette
+            **kwargs: Additional arguments (size)
+
+        Returns:
+            Base64 PNG data, or None if Pillow is not installed
+        """
+        if not self.client:
+            return None
+
+        size = kwargs.get('size', ResolutionConfig.get_size(aspect_ratio, resolution))
+        width, height = (int(v) for v in size.split("x"))
+        title, bullets = parse_slide_text(prompt)
+        colors = slide_colors(STYLE_REGISTRY.get(style).palette or list(RendererConfig.DEFAULT_PALETTE))
+
+        image = Image.new("RGB", (width, height), colors["background"])
+        draw = ImageDraw.Draw(image)
+
+        # Accent bar and underline in the style's palette
+        margin = width // 16
+        draw.rectangle([0, 0, width // 80, height], fill=colors["accent"])
+        draw.rectangle([width - width // 5, height - height // 60, width, height], fill=colors["highlight"])
+
+        title_size, body_size = max(12, height // 12), max(10, height // 26)
+        title_font = self._font(title_size, bold=True)
+        body_font = self._font(body_size)
+        text_width = width - 2 * margin
+
+        y = height // 8
+        for line in _wrap(draw, title, title_font, text_width)[:3]:
+            draw.text((margin, y), line, font=title_font, fill=colors["text"])
+            y += int(title_size * 1.25)
+
+        y += height // 40
+        draw.rectangle([margin, y, margin + width // 10, y + max(2, height // 200)], fill=colors["accent"])
+        y += height // 20
+
+        line_height = int(body_size * 1.5)
+        for bullet in bullets:
+            lines = _wrap(draw, bullet, body_font, text_width - body_size * 2)
+            if y + line_height > height - height // 10:
+                break
+            dot = body_size // 3
+            draw.ellipse(
+                [margin, y + body_size * 3 // 5 - dot // 2, margin + dot, y + body_size * 3 // 5 + dot // 2],
+                fill=colors["highlight"]
+            )
+            for line in lines:
+                if y + line_height > height - height // 10:
+                    break
+                draw.text((margin + body_size * 2, y), line, font=body_font, fill=colors["muted"])
+                y += line_height
+            y += line_height // 3
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=RendererConfig.PNG_COMPRESS_LEVEL)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    def get_client_name(self) -> str:
+        """Client name used for chain logs, metrics and concurrency limits"""
+        return "LOCAL"
+
+    def _font(self, size: int, bold: bool = False) -> "ImageFont.ImageFont":
+        """Font at a pixel size (first installed of RendererConfig.FONT_PATHS), cached"""
+        key = (size, bold)
+        with self._font_lock:
+            font = self._fonts.get(key)
+            if font is None:
+                font = _load_font(size, bold)
+                self._fonts[key] = font
+            return font
+
+
+# ========================================
+# Slide text and colors
+# ========================================
+
+def parse_slide_text(prompt: str) -> Tuple[str, List[str]]:
+    """
+    Recover the slide title and bullets from an image prompt
+
+    Args:
+        prompt: Prompt rendered from a style template
+
+    Returns:
+        (title, bullets)
+    """
+    lines = [line.strip() for line in prompt.split("\n")]
+
+    fields = {}
+    for line in lines:
+        for key in ("TITLE", "SUBTITLE"):
+            if line.upper().startswith(f"{key}:"):
+                fields.setdefault(key, line[len(key) + 1:].strip())
+    if fields.get("TITLE"):
+        return fields["TITLE"], [fields["SUBTITLE"]] if fields.get("SUBTITLE") else []
+
+    block: List[str] = []
+    for i, line in enumerate(lines):
+        if _CONTENT_INTRO.search(line):
+            for body in lines[i + 1:]:
+                if _SECTION_HEADER.match(body):
+                    break
+                if body:
+                    block.append(_BULLET_MARK.sub("", body))
+            break
+
+    if not block:
+        # Default style: "... page with: {content}. Style: ..."
+        inline = _INLINE_CONTENT.search(prompt)
+        if inline:
+            block = [line.strip() for line in inline.group(1).split("\n") if line.strip()]
+    if not block:
+        block = [line for line in lines if line][:1] or ["Slide"]
+    if len(block) == 1:
+        # "Section: point" (document plans) splits into title and bullet
+        title, sep, rest = block[0].partition(": ")
+        if sep and len(title) <= 60:
+            return title, [rest]
+        return block[0], []
+    return block[0], block[1:]
+
+
+def slide_colors(palette: List[str]) -> Dict[str, str]:
+    """
+    Background, text and accent colors for a style palette
+
+    Light first colors (e.g. beige) become the background with dark text;
+    otherwise the slide is dark and the palette is used for accents.
+    """
+    palette = palette + list(RendererConfig.DEFAULT_PALETTE)
+    first = palette[0]
+    if _luminance(first) > 0.6:
+        dark = min(palette, key=_luminance)
+        return {
+            "background": first,
+            "text": dark if _luminance(dark) < 0.3 else "#1F2937",
+            "muted": "#374151",
+            "accent": palette[1],
+            "highlight": palette[2],
+        }
+    return {
+        "background": RendererConfig.DARK_BACKGROUND,
+        "text": "#FFFFFF",
+        "muted": "#D1D5DB",
+        "accent": first,
+        "highlight": palette[2] if len(palette) > 2 else palette[1],
+    }
+
+
+def _luminance(color: str) -> float:
+    """Relative luminance (0-1) of a #RRGGBB color"""
+    red, green, blue = (int(color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    return 0.2126 * red + 0.7152 * green + 0.0722 * blue
+
+
+def _load_font(size: int, bold: bool) -> "ImageFont.ImageFont":
+    paths = RendererConfig.BOLD_FONT_PATHS + RendererConfig.FONT_PATHS if bold else RendererConfig.FONT_PATHS
+    for path in paths:
+        try:
+            return ImageFont.truetype(path, size)
+        except (OSError, IOError):
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def _wrap(draw: "ImageDraw.ImageDraw", text: str, font: "ImageFont.ImageFont", max_width: int) -> List[str]:
+    """Wrap text to max_width pixels, at spaces where possible (CJK text breaks anywhere)"""
+    lines: List[str] = []
+    current = ""
+    for char in text:
+        candidate = current + char
+        if current and draw.textlength(candidate, font=font) > max_width:
+            cut = current.rfind(" ")
+            if cut > 0 and char != " ":
+                lines.append(current[:cut])
+                current = current[cut + 1:] + char
+            else:
+                lines.append(current.rstrip())
+                current = char.lstrip()
+        else:
+            current = candidate
+    if current.strip():
+        lines.append(current.strip())
+    return lines
@@ -0,0 +1,413 @@
+"""
+Metrics - Process-wide metrics registry with Prometheus text exposition
+Provider latency histograms, outcome/error counters, in-flight gauges, cache and deck metrics
+
+Usage:
+    from core.metrics import REGISTRY, serve_metrics, PrometheusFileSink
+
+    serve_metrics(9108)                              # GET /metrics
+
+    REGISTRY.add_sink(PrometheusFileSink("metrics.prom"))
+    REGISTRY.flush()                                 # PPTGenerator flushes after every deck
+
+Custom sinks implement MetricsSink.write(registry) and can read
+registry.snapshot() or registry.render_prometheus().
+"""
+
+import os
+import re
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.config import MetricsConfig
+
+
+class _Metric:
+    """Labelled metric base"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _label_text(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(k)} {_number(v)}" for k, v in items]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {",".join(k): v for k, v in self._values.items()}
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = MetricsConfig.LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, dict(v, counts=list(v["counts"]))) for k, v in self._values.items())
+
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state["counts"]):
+                lines.append(f"{self.name}_bucket{self._label_text(key, ('le', _number(bound)))} {count}")
+            lines.append(f"{self.name}_bucket{self._label_text(key, ('le', '+Inf'))} {state['count']}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_number(state['sum'])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {state['count']}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {",".join(k): {"count": v["count"], "sum": v["sum"]} for k, v in self._values.items()}
+
+
+class MetricsRegistry:
+    """Named collection of metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._sinks: List["MetricsSink"] = []
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: "MetricsSink") -> None:
+        """Register a sink written on every flush()"""
+        with self._lock:
+            self._sinks.append(sink)
+
+    def flush(self) -> None:
+        """Write the current state to all registered sinks"""
+        with self._lock:
+            sinks = list(self._sinks)
+        for sink in sinks:
+            try:
+                sink.write(self)
+            except Exception as e:
+                print(f"[METRICS] Sink {sink.__class__.__name__} failed: {str(e)}")
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = MetricsConfig.LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain dict of all metric values, keyed by metric name then labels"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+    def _register(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} already registered with a different type or labels")
+                return existing
+            metric = cls(name, help_text, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+
+# ========================================
+# Sinks
+# ========================================
+
+class MetricsSink(ABC):
+    """Destination for registry contents"""
+
+    @abstractmethod
+    def write(self, registry: MetricsRegistry) -> None:
+        """Export the current state of the registry"""
+        pass
+
+
+class PrometheusFileSink(MetricsSink):
+    """Writes the Prometheus text format to a file (atomic replace)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, registry: MetricsRegistry) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{uuid.uuid4().hex[:8]}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(registry.render_prometheus())
+        os.replace(tmp_path, self.path)
+
+
+def make_metrics_handler(registry: "MetricsRegistry"):
+    """Request handler class serving GET /metrics"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0].rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            data = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def serve_metrics(
+    port: int = MetricsConfig.PORT,
+    host: str = MetricsConfig.HOST,
+    registry: Optional[MetricsRegistry] = None
+) -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a background thread
+
+    Args:
+        port: Listen port (0 picks a free port)
+        host: Listen address
+        registry: Registry to expose (default: REGISTRY)
+
+    Returns:
+        The running server (call shutdown() to stop)
+    """
+    server = ThreadingHTTPServer((host, port), make_metrics_handler(registry or REGISTRY))
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    print(f"[METRICS] Serving http://{host}:{server.server_port}/metrics")
+    return server
+
+
+# ========================================
+# Pipeline Metrics
+# ========================================
+
+REGISTRY = MetricsRegistry()
+
+PROVIDER_LATENCY = REGISTRY.histogram(
+    "ppt_provider_request_seconds",
+    "Provider request latency",
+    ("provider", "operation")
+)
+PROVIDER_REQUESTS = REGISTRY.counter(
+    "ppt_provider_requests_total",
+    "Provider requests by outcome (success, failure)",
+    ("provider", "operation", "outcome")
+)
+PROVIDER_THROTTLES = REGISTRY.counter(
+    "ppt_provider_throttled_total",
+    "Provider requests rejected by rate limiting",
+    ("provider", "operation")
+)
+PROVIDER_ERRORS = REGISTRY.counter(
+    "ppt_provider_errors_total",
+    "Provider errors by error class",
+    ("provider", "operation", "error_class")
+)
+PROVIDER_IN_FLIGHT = REGISTRY.gauge(
+    "ppt_provider_in_flight",
+    "Provider requests currently in flight",
+    ("provider", "operation")
+)
+API_KEY_QUARANTINES = REGISTRY.counter(
+    "ppt_api_key_quarantines_total",
+    "API keys taken out of rotation, by reason (throttled, invalid)",
+    ("provider", "reason")
+)
+API_KEYS_AVAILABLE = REGISTRY.gauge(
+    "ppt_api_keys_available",
+    "API keys currently in rotation",
+    ("provider",)
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "ppt_coalesced_requests_total",
+    "Requests that joined an identical in-flight request instead of calling the provider",
+    ("kind",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "ppt_cache_requests_total",
+    "Cache lookups by result (hit, miss)",
+    ("cache", "result")
+)
+PROMPT_CHARS = REGISTRY.counter(
+    "ppt_prompt_chars_total",
+    "Image prompt characters before and after compaction",
+    ("provider", "stage")
+)
+DECK_DURATION = REGISTRY.histogram(
+    "ppt_deck_duration_seconds",
+    "End-to-end deck generation time",
+    ("mode",),
+    buckets=MetricsConfig.DECK_BUCKETS
+)
+DECKS = REGISTRY.counter(
+    "ppt_decks_total",
+    "Finished decks by outcome",
+    ("mode", "outcome")
+)
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """
+    HTTP status code carried by an SDK exception
+
+    Covers status_code (OpenAI, ZhipuAI), response.status_code (httpx) and
+    an integer code (google-genai).
+
+    Returns:
+        Status code, or None if the exception has none
+    """
+    candidates = (
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+        getattr(error, "code", None),
+    )
+    for status in candidates:
+        if isinstance(status, int) and not isinstance(status, bool) and 100 <= status <= 599:
+            return status
+    return None
+
+
+def matches_phrase(error: BaseException, phrases: Sequence[str]) -> bool:
+    """Check whether an exception's message contains one of the phrases as whole words"""
+    text = str(error).lower()
+    return any(re.search(rf"(?<![\w]){re.escape(phrase)}(?![\w])", text) for phrase in phrases)
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """
+    Check whether an exception is provider rate limiting
+
+    The HTTP status decides when the exception has one (429); otherwise the
+    SDK's rate-limit exception types, then whole-word message markers.
+    """
+    status = error_status(error)
+    if status is not None:
+        return status == 429
+    if any(cls.__name__ in MetricsConfig.THROTTLE_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+    return matches_phrase(error, MetricsConfig.THROTTLE_MARKERS)
+
+
+def record_provider_error(provider: str, operation: str, error: BaseException) -> None:
+    """
+    Count a provider error by class
+
+    Clients call this from the except blocks that turn errors into None
+    results, so the error class survives for metrics.
+    """
+    PROVIDER_ERRORS.inc(provider=provider, operation=operation, error_class=error.__class__.__name__)
+    if is_throttle_error(error):
+        PROVIDER_THROTTLES.inc(provider=provider, operation=operation)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
@@ -3,36 +3,44 @@ OpenRouter Client - OpenRouter API Client
 Uses FLUX/Gemini-3 via OpenRouter
 """
 
-import os
 import base64
-from typing import Optional, List
+from typing import Any, Optional, List, Union
 from openai import OpenAI
 
 from core.base_client import BaseImageClient
 from core.config import ModelConfig, ResolutionConfig, GenerationConfig
+from core.key_pool import KeyPool, resolve_keys
 from core.prompt_builder import ImagePromptBuilder
+from core.metrics import record_provider_error
 
 
 class OpenRouterClient(BaseImageClient):
     """OpenRouter API Client for PPT image generation (3rd fallback)"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[Union[str, List[str]]] = None, http_client: Optional[Any] = None):
         """
         Initialize OpenRouter Client
 
         Args:
-            api_key: OpenRouter API key, read from env var if not provided
+            api_key: OpenRouter API key, or several (list or comma separated)
+                     that are rotated; read from env var if not provided
+            http_client: Shared httpx.Client (see core.http_transport);
+                         the SDK's default transport if not provided
         """
         super().__init__(api_key)
-        self.api_key = api_key or os.getenv('OPENROUTER_API_KEY')
-        if not self.api_key:
+        keys = resolve_keys(api_key, 'OPENROUTER_API_KEY')
+        self.api_key = keys[0] if keys else None
+        if not keys:
             print("[OPENROUTER] OPENROUTER_API_KEY not set, OpenRouter features will be disabled")
             self.client = None
         else:
-            self.client = OpenAI(
+            transport = {"http_client": http_client, "timeout": http_client.timeout} if http_client is not None else {}
+            self.keys = KeyPool("OPENROUTER", keys, lambda key: OpenAI(
                 base_url="https://openrouter.ai/api/v1",
-                api_key=self.api_key
-            )
+                api_key=key,
+                **transport
+            ))
+            self.client = self.keys.client
             self.model = ModelConfig.OPENROUTER_IMAGE_MODEL
 
     # ========================================
@@ -66,13 +74,14 @@ class OpenRouterClient(BaseImageClient):
         model = kwargs.get('model', self.model)
         size = kwargs.get('size', ResolutionConfig.get_size(aspect_ratio, resolution))
 
-        full_prompt = ImagePromptBuilder.build_simple_prompt(prompt, style)
+        full_prompt = ImagePromptBuilder.build_simple_prompt(prompt, style, provider="OPENROUTER")
 
         try:
-            response = self.client.responses.create(
-                model=model,
-                input=full_prompt
-            )
+            with self.keys.lease() as client:
+                response = client.responses.create(
+                    model=model,
+                    input=full_prompt
+                )
 
             # Parse response for image data
             if hasattr(response, 'data') and len(response.data) > 0:
@@ -88,6 +97,7 @@ class OpenRouterClient(BaseImageClient):
 
         except Exception as e:
             print(f"[OPENROUTER] Image generation failed: {str(e)}")
+            record_provider_error("OPENROUTER", "image", e)
             return None
 
 
@@ -120,4 +130,5 @@ class OpenRouterClient(BaseImageClient):
             return None
         except Exception as e:
             print(f"[OPENROUTER] Failed to download image: {str(e)}")
+            record_provider_error("OPENROUTER", "download", e)
             return None
@@ -0,0 +1,157 @@
+"""
+Outline Planner - Two-level slide planning for very large decks
+Generates a section outline, expands the sections in parallel, then merges them in order
+
+Planning latency grows with the slide count of the largest section instead
+of the whole deck: each expansion call writes about PlanningConfig.SLIDES_PER_SECTION
+slides, and PlanningConfig.MAX_PARALLEL_SECTIONS calls run at once.
+"""
+
+import contextvars
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import PlanningConfig
+from core.document_planner import allocate_slides
+from core.tracing import span
+
+
+class OutlinePlanner:
+    """Plans large decks as outline + parallel section expansion"""
+
+    def __init__(self, glm_client: Any, max_parallel: int = PlanningConfig.MAX_PARALLEL_SECTIONS):
+        """
+        Initialize planner
+
+        Args:
+            glm_client: GLMClient used for the outline and section expansion
+            max_parallel: Concurrent section expansion requests
+        """
+        self.glm_client = glm_client
+        self.max_parallel = max(1, max_parallel)
+
+    def plan(
+        self,
+        topic: str,
+        page_count: int,
+        on_slide: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan a deck
+
+        Slide numbers are fixed once the outline is known: the cover is
+        slide 1, each section owns a contiguous range, the summary is last.
+        on_slide still receives slides strictly in order, so sections that
+        finish early wait for the ones before them.
+
+        Args:
+            topic: Presentation topic (title of a long document)
+            page_count: Number of pages
+            on_slide: Optional callback (index, slide), as in GLMClient.generate_slide_plan
+            context: Optional source material (e.g. section summaries)
+
+        Returns:
+            Content plan dict with title, slides and sections
+        """
+        content_slides = max(0, page_count - 2)
+        section_count = max(1, math.ceil(content_slides / PlanningConfig.SLIDES_PER_SECTION))
+
+        # Level 1: outline
+        with span("plan.outline", sections=section_count):
+            outline = self.glm_client.generate_outline(topic, section_count, content_slides, context=context)
+
+        title = outline.get("title") or topic[:50]
+        sections = outline["sections"] or [{"title": title, "summary": topic[:200], "slides": content_slides}]
+
+        # Requested sizes are only weights; the counts must add up to the deck
+        weights = [{"chars": max(1, _as_int(s.get("slides"), 1))} for s in sections]
+        counts = allocate_slides(weights, content_slides)
+        print(f"[PLAN] Outline: {len(sections)} sections, {counts} slides")
+
+        slides: List[Optional[Dict[str, Any]]] = [None] * (content_slides + 2)
+        slides[0] = {"page_type": "cover", "content": title}
+        slides[-1] = {"page_type": "summary", "content": f"{title} Summary"}
+
+        starts = []
+        position = 1
+        for count in counts:
+            starts.append(position)
+            position += count
+
+        emitter = _OrderedEmitter(slides, on_slide)
+        emitter.ready(0, 1)
+
+        # Level 2: expand sections in parallel
+        def expand(index: int) -> None:
+            section, count = sections[index], counts[index]
+            if count == 0:
+                emitter.ready(starts[index], 0)
+                return
+            with span("plan.section", section=index + 1, slides=count):
+                written = self.glm_client.expand_section(title, section, count)
+            for j, slide in enumerate(_fit(written, count, section)):
+                slide["section"] = section.get("title", f"Part {index + 1}")
+                slides[starts[index] + j] = slide
+            emitter.ready(starts[index], count)
+
+        with span("plan.expand", sections=len(sections)):
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="plan-section") as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, expand, i)
+                    for i in range(len(sections))
+                ]
+                for future in futures:
+                    future.result()
+
+        emitter.ready(len(slides) - 1, 1)
+
+        return {
+            "title": title,
+            "total_slides": len(slides),
+            "slides": slides,
+            "sections": [
+                {"title": s.get("title", ""), "first_slide": start + 1, "slides": count}
+                for s, start, count in zip(sections, starts, counts)
+            ]
+        }
+
+
+class _OrderedEmitter:
+    """Passes slides to on_slide in index order as ranges become ready"""
+
+    def __init__(self, slides: List[Optional[Dict[str, Any]]], on_slide):
+        self.slides = slides
+        self.on_slide = on_slide
+        self._ready = [False] * len(slides)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def ready(self, start: int, count: int) -> None:
+        with self._lock:
+            for i in range(start, start + count):
+                self._ready[i] = True
+            while self._next < len(self.slides) and self._ready[self._next]:
+                if self.on_slide:
+                    self.on_slide(self._next, self.slides[self._next])
+                self._next += 1
+
+
+def _fit(written: List[Dict[str, Any]], count: int, section: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Trim or pad a section's slides to exactly count, keeping numbering stable"""
+    slides = [dict(s) for s in written if isinstance(s, dict)][:count]
+    for i in range(len(slides), count):
+        slides.append({"page_type": "content", "content": f"{section.get('title', 'Section')}: point {i+1}"})
+    for slide in slides:
+        slide.setdefault("page_type", "content")
+        slide.setdefault("content", "")
+    return slides
+
+
+def _as_int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
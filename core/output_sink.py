@@ -0,0 +1,268 @@
+"""
+Output Sink - Destinations for a deck's artifacts
+Local directory (collision-free run IDs), streaming zip, or in-memory with no disk writes
+
+Artifacts are addressed by names relative to the deck root ("slides_plan.json",
+"images/slide_01_cover.png"). sink.path(name) is the reference reported in
+results (a real file path for DirectorySink).
+
+Usage:
+    sink = MemorySink()
+    generator.generate(content, sink=sink)
+    sink.images()                  # PNG bytes in slide order
+    sink.text("viewer.html")       # rendered documents
+
+    generator.generate(content, sink=ZipSink("deck.zip"))
+    generator.generate(content, sink=ZipSink(response_stream))   # non-seekable streams work
+"""
+
+import json
+import os
+import threading
+import uuid
+import zipfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from core.config import OutputConfig
+
+
+def new_run_id() -> str:
+    """Timestamped run ID that does not collide for runs started in the same second"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class OutputSink(ABC):
+    """Destination for one deck's artifacts"""
+
+    def __init__(self, location: str):
+        """
+        Initialize sink
+
+        Args:
+            location: Deck root reported as output_dir (path, zip name or memory:// URL)
+        """
+        self.location = location
+
+    def path(self, name: str) -> str:
+        """Reference of an artifact, as reported in results"""
+        return os.path.join(self.location, *name.split("/"))
+
+    def name_of(self, path: str) -> str:
+        """Artifact name of a reference returned by path()"""
+        prefix = self.location.rstrip("/\\") + os.sep
+        relative = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, self.location)
+        return relative.replace(os.sep, "/")
+
+    @abstractmethod
+    def write_bytes(self, name: str, data: bytes) -> str:
+        """
+        Store an artifact
+
+        Args:
+            name: Name relative to the deck root
+            data: Content
+
+        Returns:
+            Reference of the artifact (see path())
+        """
+
+    def write_text(self, name: str, text: str) -> str:
+        """Store a UTF-8 document"""
+        return self.write_bytes(name, text.encode("utf-8"))
+
+    def write_json(self, name: str, value: Any, indent: Optional[int] = 2) -> str:
+        """Store a JSON document"""
+        return self.write_text(name, json.dumps(value, ensure_ascii=False, indent=indent))
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """Whether an artifact has been written"""
+
+    def read_bytes(self, name: str) -> bytes:
+        """
+        Read an artifact back
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist
+            NotImplementedError: If the sink is write-only
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} cannot be read back")
+
+    def read_json(self, name: str) -> Any:
+        """Read a JSON artifact back"""
+        return json.loads(self.read_bytes(name).decode("utf-8"))
+
+    def version(self, name: str) -> Optional[str]:
+        """Token that changes when an artifact is rewritten (viewer cache-busting)"""
+        return None
+
+    def close(self) -> None:
+        """Finish the output (e.g. write the zip directory)"""
+
+
+class DirectorySink(OutputSink):
+    """Writes artifacts into a local directory"""
+
+    def __init__(self, output_dir: str):
+        """
+        Initialize sink
+
+        Args:
+            output_dir: Deck directory (created as needed)
+        """
+        super().__init__(output_dir)
+        self._dirs = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, root: str = OutputConfig.ROOT, suffix: str = "") -> "DirectorySink":
+        """
+        Sink for a new, uniquely named run directory under root
+
+        Args:
+            root: Parent directory
+            suffix: Appended to the run ID (e.g. "_001" for batch jobs)
+
+        Returns:
+            Sink whose directory did not exist before
+        """
+        os.makedirs(root, exist_ok=True)
+        while True:
+            output_dir = os.path.join(root, new_run_id() + suffix)
+            try:
+                os.makedirs(output_dir)
+                return cls(output_dir)
+            except FileExistsError:
+                continue
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        with self._lock:
+            if directory not in self._dirs:
+                os.makedirs(directory, exist_ok=True)
+                self._dirs.add(directory)
+        # Replace atomically, so readers never see half-written files; the temp
+        # name is unique, so concurrent writers of one file do not mix
+        temp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return path
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def read_bytes(self, name: str) -> bytes:
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def version(self, name: str) -> Optional[str]:
+        try:
+            return str(os.stat(self.path(name)).st_mtime_ns)
+        except OSError:
+            return None
+
+
+class ZipSink(OutputSink):
+    """
+    Streams artifacts into a zip archive as they are produced
+
+    Entries are written once, in completion order; the archive is valid
+    after close(). Works with non-seekable streams (entries then use data
+    descriptors). PNG images are stored, documents deflated.
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], location: Optional[str] = None):
+        """
+        Initialize sink
+
+        Args:
+            target: Zip file path or writable binary stream
+            location: output_dir reported in results (default: the path, or zip://<run id>)
+        """
+        if location is None:
+            location = target if isinstance(target, str) else f"zip://{new_run_id()}"
+        super().__init__(location)
+        if isinstance(target, str) and os.path.dirname(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+        self._zip = zipfile.ZipFile(target, "w")
+        self._names: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        compression = zipfile.ZIP_STORED if name.endswith(".png") else zipfile.ZIP_DEFLATED
+        with self._lock:
+            if name in self._names:
+                raise ValueError(f"{name} is already in the archive")
+            self._zip.writestr(name, data, compress_type=compression)
+            self._names[name] = len(data)
+        return self.path(name)
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._names
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zip.fp is not None:
+                self._zip.close()
+
+
+class MemorySink(OutputSink):
+    """Keeps artifacts in memory; nothing touches the filesystem"""
+
+    def __init__(self, run_id: Optional[str] = None):
+        """
+        Initialize sink
+
+        Args:
+            run_id: Identifier used in the memory:// location (default: new_run_id())
+        """
+        super().__init__(f"memory://{run_id or new_run_id()}")
+        self.files: Dict[str, bytes] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return f"{self.location}/{name}"
+
+    def name_of(self, path: str) -> str:
+        return path[len(self.location) + 1:] if path.startswith(self.location + "/") else path
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        with self._lock:
+            self.files[name] = data
+            self._versions[name] = self._versions.get(name, 0) + 1
+        return self.path(name)
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self.files
+
+    def read_bytes(self, name: str) -> bytes:
+        with self._lock:
+            if name not in self.files:
+                raise FileNotFoundError(self.path(name))
+            return self.files[name]
+
+    def version(self, name: str) -> Optional[str]:
+        with self._lock:
+            version = self._versions.get(name)
+        return str(version) if version is not None else None
+
+    def text(self, name: str) -> str:
+        """A rendered document (viewer.html, generation_log.json, ...)"""
+        return self.read_bytes(name).decode("utf-8")
+
+    def images(self) -> List[bytes]:
+        """Slide images in slide order"""
+        with self._lock:
+            return [data for name, data in sorted(self.files.items()) if name.startswith("images/")]
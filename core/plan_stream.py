@@ -0,0 +1,150 @@
+"""
+Plan Stream - Incremental parser for streamed slide plans
+Emits each slide object of a JSON plan as soon as its closing brace arrives
+
+Usage:
+    parser = SlidePlanStreamParser()
+    for chunk in stream:
+        for slide in parser.feed(chunk):
+            ...                      # start work on the slide right away
+    plan = parser.close()            # full plan dict, or None if no slides were found
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+_TITLE = re.compile(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class SlidePlanStreamParser:
+    """
+    Incremental parser for {"title": ..., "slides": [{...}, ...]}
+
+    Text before the slides array (prose, code fences, the title) is
+    skipped. Inside the array, brace depth is tracked outside of JSON
+    strings, so nested objects and braces within slide text are handled.
+    The array key is configurable (e.g. "sections" for outlines).
+    """
+
+    def __init__(self, key: str = "slides"):
+        """
+        Initialize parser
+
+        Args:
+            key: Name of the array whose objects are emitted
+        """
+        self.key = key
+        self._key_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self.text = ""
+        self.slides: List[Dict[str, Any]] = []
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add streamed text
+
+        Args:
+            chunk: Next piece of the completion
+
+        Returns:
+            Slide objects completed by this chunk, in order
+        """
+        self.text += chunk
+        if self._done:
+            return []
+
+        if not self._in_array:
+            match = self._key_pattern.search(self.text, max(0, self._pos - len(self.key) - 8))
+            if not match:
+                self._pos = len(self.text)
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # End of the slides array
+                    self._done = True
+                    self._pos = i + 1
+                    return completed
+                self._depth -= 1
+                if self._depth == 0:
+                    slide = self._decode(text[self._start:i + 1])
+                    if slide is not None:
+                        self.slides.append(slide)
+                        completed.append(slide)
+
+        self._pos = len(text)
+        return completed
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """
+        Finish parsing
+
+        Returns:
+            Plan dict with title and slides, or None if no slide was found
+        """
+        plan = self._decode_document()
+        if plan is not None and plan.get(self.key):
+            # Objects already emitted stay authoritative
+            if len(plan[self.key]) < len(self.slides):
+                plan[self.key] = list(self.slides)
+            return plan
+
+        if not self.slides:
+            return None
+
+        title = _TITLE.search(self.text)
+        return {
+            "title": json.loads(f'"{title.group(1)}"') if title else "",
+            self.key: list(self.slides)
+        }
+
+    def _decode_document(self) -> Optional[Dict[str, Any]]:
+        """Decode the complete JSON document, if the text holds one"""
+        decoder = json.JSONDecoder()
+        for match in re.finditer(r"\{", self.text):
+            try:
+                value, _ = decoder.raw_decode(self.text, match.start())
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, dict) and isinstance(value.get(self.key), list):
+                value[self.key] = [s for s in value[self.key] if isinstance(s, dict)]
+                return value
+        return None
+
+    @staticmethod
+    def _decode(fragment: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
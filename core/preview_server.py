@@ -0,0 +1,192 @@
+"""
+Preview Server - Local live preview of a deck while it renders
+Serves output_dir over HTTP and pushes slide events to the viewer with Server-Sent Events
+
+Usage:
+    server = PreviewServer("outputs/20240113_120000").start()
+    server.publish("slide", {"number": 3, "image": "images/slide_03_content.png", ...})
+    server.close()
+
+Endpoints:
+    GET /          Live viewer (inserts slides as they arrive, ordered by slide number)
+    GET /events    Event stream; every event is replayed to late or reconnecting clients
+    GET /<path>    Files under output_dir (images, viewer.html, logs)
+
+Events: "plan" {title, total_slides}, "slide" {number, image, type, content[, status]},
+"complete" {viewer, partial}.
+"""
+
+import errno
+import json
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from core.config import PreviewConfig
+
+
+class PreviewServer:
+    """Serves one deck's output directory with a live event stream"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        host: str = PreviewConfig.HOST,
+        port: int = PreviewConfig.PORT,
+        title: str = "Presentation"
+    ):
+        """
+        Initialize server (call start() to listen)
+
+        Args:
+            output_dir: Deck output directory to serve
+            host: Listen address
+            port: Listen port (0 picks a free port; a free port is also
+                  picked when this one is in use)
+            title: Viewer title until the plan event arrives
+        """
+        self.output_dir = os.path.abspath(output_dir)
+        self.host = host
+        self.port = port
+        self.title = title
+        self._events: List[Tuple[str, str]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        """Live viewer URL"""
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self) -> "PreviewServer":
+        """Listen from a background thread"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), make_preview_handler(self))
+        except OSError as e:
+            if self.port == 0 or e.errno != errno.EADDRINUSE:
+                raise
+            # Another preview (this process or another) holds the port
+            print(f"[PREVIEW] Port {self.port} is in use, picking a free port")
+            self._server = ThreadingHTTPServer((self.host, 0), make_preview_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        thread = threading.Thread(target=self._server.serve_forever, name="preview-http", daemon=True)
+        thread.start()
+        print(f"[PREVIEW] Live viewer: {self.url}")
+        return self
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """
+        Push an event to every connected viewer
+
+        Args:
+            event: Event name ("plan", "slide", "complete")
+            data: JSON-serializable payload
+        """
+        with self._condition:
+            self._events.append((event, json.dumps(data, ensure_ascii=False)))
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """End open event streams and stop listening"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def live_page(self) -> bytes:
+        """Viewer HTML in live mode, with no slides yet"""
+        template_path = os.path.join(os.path.dirname(__file__), "../templates/viewer.html")
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template = f.read()
+        html = template.replace("{{SLIDES_DATA}}", "[]")
+        html = html.replace("{{TOTAL_SLIDES}}", "0")
+        html = html.replace("{{LIVE}}", "true")
+        html = html.replace("{{TITLE}}", self.title)
+        return html.encode("utf-8")
+
+    def stream(self, write, last_event_id: int = 0) -> None:
+        """
+        Write events to one client until the server closes or the client goes away
+
+        Args:
+            write: Callable taking bytes (raises OSError when the client disconnects)
+            last_event_id: Number of events the client has already seen
+        """
+        sent = max(0, last_event_id)
+        while True:
+            with self._condition:
+                if sent >= len(self._events) and not self._closed:
+                    self._condition.wait(PreviewConfig.HEARTBEAT_INTERVAL)
+                pending = self._events[sent:]
+                closed = self._closed
+
+            if pending:
+                chunks = []
+                for offset, (event, data) in enumerate(pending, sent + 1):
+                    chunks.append(f"id: {offset}\nevent: {event}\ndata: {data}\n\n")
+                write("".join(chunks).encode("utf-8"))
+                sent += len(pending)
+            elif not closed:
+                # Comment line keeps proxies and the browser from timing out
+                write(b": keep-alive\n\n")
+
+            if closed:
+                return
+
+
+def make_preview_handler(server: PreviewServer):
+    """Request handler factory bound to a preview server"""
+
+    class PreviewRequestHandler(SimpleHTTPRequestHandler):
+        """Live viewer, event stream and static files"""
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+
+            if path in ("/", "/live"):
+                data = server.live_page()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            if path == "/events":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.end_headers()
+                try:
+                    last_id = int(self.headers.get("Last-Event-ID", 0))
+                except ValueError:
+                    last_id = 0
+
+                def write(data: bytes) -> None:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+
+                try:
+                    server.stream(write, last_id)
+                except OSError:
+                    pass  # Viewer closed
+                return
+
+            super().do_GET()
+
+        def end_headers(self):
+            # Images are replaced in place (drafts) and events must not be buffered
+            self.send_header("Cache-Control", "no-store")
+            super().end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return partial(PreviewRequestHandler, directory=server.output_dir)
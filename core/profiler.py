@@ -0,0 +1,367 @@
+"""
+Profiler - Opt-in CPU and memory profiling of the generation pipeline
+Samples the stacks of every thread, records tracemalloc peaks per stage, writes pstats and collapsed stacks
+
+The pipeline runs on many threads (planning, provider pools, image writers),
+and cProfile only sees the thread that enabled it. The profiler therefore
+samples sys._current_frames() at ProfilingConfig.SAMPLE_INTERVAL from one
+background thread shared by every active profiler. Samples are exported as:
+
+    profile.pstats   pstats format (python -m pstats, snakeviz); call counts are sample counts
+    profile.folded   collapsed stacks, one "thread;outer;...;inner count" line per stack
+                     (flamegraph.pl, speedscope, inferno)
+    profile.json     top functions by self time, traced memory peak per stage
+
+Samples are wall-clock: a thread blocked in a call (a provider request, a
+sleep) is counted where it blocks, while pool threads waiting for work are
+dropped (ProfilingConfig.IDLE_FRAMES). Profilers active at the same time
+(decks of one batch) share the process: each one covers everything that
+ran while it was active.
+
+Memory is not sampled. Whenever a "stage" span of the attached tracer opens
+or closes, the tracemalloc peak since the previous boundary is credited to
+every stage open in between and then reset (tracemalloc.reset_peak), so
+short-lived spikes are counted exactly. The reset is process-wide: other
+code reading tracemalloc peaks while a profiler runs sees partial peaks.
+
+Usage:
+    with Profiler(tracer) as profiler:
+        ...
+    profiler.write(sink)
+"""
+
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import ProfilingConfig
+from core.output_sink import OutputSink
+from core.tracing import Tracer
+
+# (filename, first line, function name), the pstats function key
+Frame = Tuple[str, int, str]
+
+
+class _Sampler:
+    """Background thread sampling every thread's stack for the active profilers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profilers: List["Profiler"] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._owns_tracemalloc = False
+        # Open stage spans: id(span args) -> [profiler, name, traced bytes at open, peak]
+        self._stages: Dict[int, List[Any]] = {}
+
+    def add(self, profiler: "Profiler") -> None:
+        with self._lock:
+            if profiler.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+            # Peaks from before the profiler started belong to the others
+            self._collect_peak()
+            self._profilers.append(profiler)
+            if profiler.trace_memory and tracemalloc.is_tracing():
+                profiler.memory_peak = tracemalloc.get_traced_memory()[0]
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profiler: "Profiler") -> None:
+        thread = None
+        with self._lock:
+            self._collect_peak()
+            for key in [k for k, stage in self._stages.items() if stage[0] is profiler]:
+                del self._stages[key]
+            if profiler in self._profilers:
+                self._profilers.remove(profiler)
+            if not self._profilers:
+                thread, self._thread = self._thread, None
+                self._stop.set()
+                if self._owns_tracemalloc:
+                    tracemalloc.stop()
+                    self._owns_tracemalloc = False
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def stage_boundary(self, profiler: "Profiler", key: int, name: str, ended: bool) -> None:
+        """Credit the peak so far to the open stages, then open or close one"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return
+            self._collect_peak()
+            if not ended:
+                current = tracemalloc.get_traced_memory()[0]
+                self._stages[key] = [profiler, name, current, current]
+                return
+            stage = self._stages.pop(key, None)
+        if stage is not None:
+            profiler._record_stage(name, stage[2], stage[3])
+
+    def _collect_peak(self) -> None:
+        """Credit the traced peak since the last call to everything open, and reset it"""
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        for stage in self._stages.values():
+            stage[3] = max(stage[3], peak)
+        for profiler in self._profilers:
+            if profiler.trace_memory:
+                profiler.memory_peak = max(profiler.memory_peak or 0, peak)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        previous = time.perf_counter()
+        while True:
+            with self._lock:
+                profilers = list(self._profilers)
+            if not profilers or self._stop.wait(min(p.interval for p in profilers)):
+                return
+
+            now = time.perf_counter()
+            names = {t.ident: _thread_group(t.name) for t in threading.enumerate()}
+            stacks = [
+                (names.get(ident, "thread"), _stack(frame))
+                for ident, frame in sys._current_frames().items()
+                if ident != me
+            ]
+            for profiler in profilers:
+                profiler._record(now - previous, stacks)
+            previous = now
+
+
+_SAMPLER = _Sampler()
+
+
+def _thread_group(name: str) -> str:
+    """Thread name without the pool index ("sched-glm_3" -> "sched-glm")"""
+    return re.sub(r"[_-]\d+$", "", name).replace(";", ",")
+
+
+def _stack(frame: Any) -> Tuple[Frame, ...]:
+    """Frames from the outermost call to the innermost"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _label(frame: Frame) -> str:
+    filename, line, name = frame
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+    filename, _, name = stack[-1]
+    return (os.path.basename(filename), name) in ProfilingConfig.IDLE_FRAMES
+
+
+class Profiler:
+    """Stack samples and traced memory of one run"""
+
+    def __init__(
+        self,
+        tracer: Optional[Tracer] = None,
+        interval: float = ProfilingConfig.SAMPLE_INTERVAL,
+        trace_memory: bool = ProfilingConfig.TRACE_MEMORY
+    ):
+        """
+        Initialize profiler
+
+        Args:
+            tracer: Tracer of the run; its "stage" spans get memory peaks
+            interval: Seconds between stack samples
+            trace_memory: Record tracemalloc memory (starts tracemalloc
+                          while profiling if it is not running already)
+        """
+        self.tracer = tracer
+        self.interval = interval
+        self.trace_memory = trace_memory
+        # (thread group, frames) -> samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampled_s = 0.0
+        # Highest traced bytes while profiling, and per stage name
+        self.memory_peak: Optional[int] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "Profiler":
+        """Start sampling"""
+        _SAMPLER.add(self)
+        if self.tracer is not None and self.trace_memory:
+            self.tracer.hooks.append(self._on_span)
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling (safe to call more than once)"""
+        if self.started is None or self.stopped is not None:
+            return
+        self.stopped = time.perf_counter()
+        if self._on_span in getattr(self.tracer, "hooks", []):
+            self.tracer.hooks.remove(self._on_span)
+        _SAMPLER.remove(self)
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _record(self, elapsed: float, stacks: List[Tuple[str, Tuple[Frame, ...]]]) -> None:
+        with self._lock:
+            self.samples += 1
+            self.sampled_s += elapsed
+            for thread, stack in stacks:
+                if stack and not (ProfilingConfig.DROP_IDLE and _is_idle(stack)):
+                    self.stacks[(thread, stack)] += 1
+
+    def _on_span(self, name: str, cat: str, args: Dict[str, Any], ended: bool) -> None:
+        if cat == "stage":
+            _SAMPLER.stage_boundary(self, id(args), name, ended)
+
+    def _record_stage(self, name: str, baseline: int, peak: int) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, {"count": 0, "peak_mb": 0.0, "growth_mb": 0.0})
+            entry["count"] += 1
+            entry["peak_mb"] = max(entry["peak_mb"], round(peak / 1048576, 2))
+            entry["growth_mb"] = max(entry["growth_mb"], round((peak - baseline) / 1048576, 2))
+
+    # ========================================
+    # Results
+    # ========================================
+
+    @property
+    def seconds_per_sample(self) -> float:
+        """Wall time one sample stands for"""
+        return self.sampled_s / self.samples if self.samples else self.interval
+
+    def collapsed_stacks(self) -> str:
+        """Collapsed stacks ("thread;outer;...;inner count" per line) for flamegraph tools"""
+        with self._lock:
+            stacks = list(self.stacks.items())
+        lines = [
+            ";".join([thread] + [_label(frame) for frame in stack]) + f" {count}"
+            for (thread, stack), count in stacks
+        ]
+        return "\n".join(sorted(lines)) + "\n"
+
+    def pstats_data(self) -> Dict[Frame, Tuple[int, int, float, float, Dict[Frame, Tuple[int, int, float, float]]]]:
+        """
+        Samples in the pstats stats layout
+
+        Returns:
+            {function: (calls, calls, self s, total s, {caller: (...)})},
+            where calls are sample counts (what pstats.Stats loads)
+        """
+        per_sample = self.seconds_per_sample
+        stats: Dict[Frame, List[Any]] = {}
+        with self._lock:
+            stacks = list(self.stacks.items())
+
+        for (_, stack), count in stacks:
+            seconds = count * per_sample
+            seen = set()
+            for i, frame in enumerate(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0, {}])
+                # Recursive frames count once toward the total
+                if frame not in seen:
+                    seen.add(frame)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if i:
+                    edge = entry[4].setdefault(stack[i - 1], [0, 0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += seconds
+                    if i == len(stack) - 1:
+                        edge[2] += seconds
+            stats[stack[-1]][2] += seconds
+
+        return {
+            frame: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+            for frame, (cc, nc, tt, ct, callers) in stats.items()
+        }
+
+    def top_functions(self, count: int = ProfilingConfig.TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """Functions with the most self time"""
+        stats = self.pstats_data()
+        busy = sum(tt for _, _, tt, _, _ in stats.values()) or 1.0
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:count]
+        return [
+            {
+                "function": name,
+                "file": filename,
+                "line": line,
+                "self_s": round(tt, 4),
+                "total_s": round(ct, 4),
+                "self_pct": round(100 * tt / busy, 1)
+            }
+            for (filename, line, name), (_, _, tt, ct, _) in ranked
+        ]
+
+    def stage_memory(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Traced memory peak per stage
+
+        Returns:
+            {stage: {"count", "peak_mb", "growth_mb"}}: the highest traced
+            memory while the stage was open, and the most it rose above its
+            level when the stage opened
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self.stages.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """profile.json contents"""
+        with self._lock:
+            threads: Counter = Counter()
+            for (thread, _), count in self.stacks.items():
+                threads[thread] += count
+            peak = self.memory_peak
+        end = self.stopped or time.perf_counter()
+        return {
+            "mode": "sampling",
+            "interval_s": self.interval,
+            "duration_s": round(end - self.started, 3) if self.started else 0.0,
+            "samples": self.samples,
+            "thread_samples": dict(threads.most_common()),
+            "top_functions": self.top_functions(),
+            "memory": {
+                "traced": peak is not None,
+                "peak_mb": round(peak / 1048576, 2) if peak is not None else None,
+                "stages": self.stage_memory()
+            }
+        }
+
+    def write(self, sink: OutputSink) -> Dict[str, str]:
+        """
+        Write profile.pstats, profile.folded and profile.json
+
+        Args:
+            sink: Artifact destination (the deck's, next to generation_log.json)
+
+        Returns:
+            {"pstats", "collapsed", "summary"} artifact references
+        """
+        self.stop()
+        return {
+            "pstats": sink.write_bytes("profile.pstats", marshal.dumps(self.pstats_data())),
+            "collapsed": sink.write_text("profile.folded", self.collapsed_stacks()),
+            "summary": sink.write_json("profile.json", self.summary())
+        }
@@ -3,8 +3,17 @@ Prompt Builder - 提示词构建器
 提供统一的图片生成提示词构建功能
 """
 
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Tuple
+
 from core.config import PromptConfig, GenerationConfig
+from core.metrics import PROMPT_CHARS
+
+
+_DIRECTIVE = re.compile(r"^\s*(?:[-*]\s*)?([A-Za-z][A-Za-z ]*?)\s*:\s*(\S.*)$")
+_BULLET = re.compile(r"^\s*[-*]\s+")
+_NON_WORD = re.compile(r"[^\w]+")
+_EMPTY_LABEL = re.compile(r"^\s*[A-Z][A-Z _]*:\s*$")
 
 
 class ImagePromptBuilder:
@@ -16,7 +25,8 @@ class ImagePromptBuilder:
         aspect_ratio: Optional[str] = None,
         resolution: Optional[str] = None,
         style: Optional[str] = None,
-        include_quality_requirements: bool = True
+        include_quality_requirements: bool = True,
+        provider: Optional[str] = None
     ) -> str:
         """
         构建完整的图片生成提示词
@@ -27,10 +37,25 @@ class ImagePromptBuilder:
             resolution: 分辨率 (如 "2K", "4K")
             style: 风格描述
             include_quality_requirements: 是否包含质量要求
+            provider: 服务商名称，用于选择长度预算 (见 PromptConfig.MAX_PROMPT_CHARS)
 
         Returns:
-            完整的提示词
+            完整的提示词 (PromptConfig.COMPACT 时已压缩)
         """
+        prompt = ImagePromptBuilder._assemble_prompt(
+            base_prompt, aspect_ratio, resolution, style, include_quality_requirements
+        )
+        return ImagePromptBuilder._finalize(prompt, provider)
+
+    @staticmethod
+    def _assemble_prompt(
+        base_prompt: str,
+        aspect_ratio: Optional[str],
+        resolution: Optional[str],
+        style: Optional[str],
+        include_quality_requirements: bool
+    ) -> str:
+        """拼接未压缩的提示词"""
         # 使用默认值
         aspect_ratio = aspect_ratio or GenerationConfig.DEFAULT_ASPECT_RATIO
         resolution = resolution or GenerationConfig.DEFAULT_RESOLUTION
@@ -54,7 +79,8 @@ class ImagePromptBuilder:
     @staticmethod
     def build_simple_prompt(
         base_prompt: str,
-        style: Optional[str] = None
+        style: Optional[str] = None,
+        provider: Optional[str] = None
     ) -> str:
         """
         构建简化版提示词 (用于某些 API)
@@ -62,10 +88,18 @@ class ImagePromptBuilder:
         Args:
             base_prompt: 基础提示词内容
             style: 风格描述
+            provider: 服务商名称，用于选择长度预算
 
         Returns:
             简化的提示词
         """
+        return ImagePromptBuilder._finalize(
+            ImagePromptBuilder._assemble_simple_prompt(base_prompt, style), provider
+        )
+
+    @staticmethod
+    def _assemble_simple_prompt(base_prompt: str, style: Optional[str]) -> str:
+        """拼接未压缩的简化版提示词"""
         style = style or GenerationConfig.DEFAULT_STYLE
 
         return f"""Professional presentation slide: {base_prompt}
@@ -80,6 +114,137 @@ Create a high-quality, professional presentation slide with:
 
 Quality: High resolution, professional design, clean layout."""
 
+    # ========================================
+    # 提示词压缩
+    # ========================================
+
+    @staticmethod
+    def compact_prompt(prompt: str, max_chars: Optional[int] = None) -> str:
+        """
+        压缩提示词
+
+        - 同一键的指令 (Style/Aspect Ratio/Resolution 等，见
+          PromptConfig.DIRECTIVE_KEYS) 只保留第一次出现的取值。风格模板位于
+          外层包装之前，因此模板中的具体取值优先于包装添加的默认值
+          (如 "Style: realistic")
+        - 重复的列表条目 (忽略大小写、标点和词序) 只保留一次，条目全部
+          被移除的小标题以及未填写的字段 (如 "SUBTITLE: ") 一并移除
+        - 超出 max_chars 时从末尾开始移除普通列表条目 (优先级最低的通用
+          质量要求位于末尾)，仍超出时在单词边界截断
+
+        Args:
+            prompt: 原始提示词
+            max_chars: 长度上限 (None 表示不限)
+
+        Returns:
+            压缩后的提示词
+        """
+        lines = prompt.split("\n")
+        headers = {
+            i for i, line in enumerate(lines[:-1])
+            if line.strip().endswith(":") and not _BULLET.match(line) and _BULLET.match(lines[i + 1])
+        }
+
+        # (类型, 文本)：header / bullet / directive / text / blank
+        items: List[Tuple[str, str]] = []
+        seen_directives = set()
+        seen_bullets = set()
+
+        for i, line in enumerate(lines):
+            line = line.rstrip()
+            if not line.strip():
+                if items and items[-1][0] != "blank":
+                    items.append(("blank", ""))
+                continue
+
+            if _EMPTY_LABEL.match(line):
+                # 未填写的字段 (如 "SUBTITLE: ")
+                continue
+
+            if i in headers:
+                items.append(("header", line))
+                continue
+
+            match = _DIRECTIVE.match(line)
+            if match and match.group(1).strip().lower() in PromptConfig.DIRECTIVE_KEYS:
+                key = match.group(1).strip().lower()
+                if key in seen_directives:
+                    continue
+                seen_directives.add(key)
+                seen_bullets.add(_word_set(line))
+                items.append(("directive", line))
+            elif _BULLET.match(line):
+                # 词序不同的同一条目 ("16:9 aspect ratio" / "Aspect ratio: 16:9") 视为重复
+                key = _word_set(line)
+                if key in seen_bullets:
+                    continue
+                seen_bullets.add(key)
+                items.append(("bullet", line))
+            else:
+                items.append(("text", line))
+
+        items = _drop_empty_headers(items)
+        text = _join(items)
+        if not max_chars or len(text) <= max_chars:
+            return text
+
+        # 长度预算：从末尾移除普通条目
+        while len(text) > max_chars:
+            index = next((i for i in range(len(items) - 1, -1, -1) if items[i][0] == "bullet"), None)
+            if index is None:
+                break
+            del items[index]
+            items = _drop_empty_headers(items)
+            text = _join(items)
+
+        if len(text) > max_chars:
+            cut = text[:max_chars]
+            text = cut.rsplit(None, 1)[0] if " " in cut else cut
+        return text
+
+    @staticmethod
+    def size_report(
+        prompts: List[str],
+        provider: str,
+        aspect_ratio: Optional[str] = None,
+        resolution: Optional[str] = None,
+        style: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        统计一组提示词压缩前后的总长度 (不计入指标)
+
+        Args:
+            prompts: 基础提示词列表
+            provider: 服务商名称
+            aspect_ratio: 宽高比
+            resolution: 分辨率
+            style: 风格描述
+
+        Returns:
+            {"before": 字符数, "after": 字符数}
+        """
+        before = after = 0
+        budget = PromptConfig.MAX_PROMPT_CHARS.get(provider)
+        for prompt in prompts:
+            if provider == "OPENROUTER":
+                raw = ImagePromptBuilder._assemble_simple_prompt(prompt, style)
+            else:
+                raw = ImagePromptBuilder._assemble_prompt(prompt, aspect_ratio, resolution, style, True)
+            before += len(raw)
+            after += len(ImagePromptBuilder.compact_prompt(raw, budget)) if PromptConfig.COMPACT else len(raw)
+        return {"before": before, "after": after}
+
+    @staticmethod
+    def _finalize(prompt: str, provider: Optional[str]) -> str:
+        """按配置压缩提示词并记录前后长度"""
+        if not PromptConfig.COMPACT:
+            return prompt
+
+        compacted = ImagePromptBuilder.compact_prompt(prompt, PromptConfig.MAX_PROMPT_CHARS.get(provider))
+        PROMPT_CHARS.inc(len(prompt), provider=provider or "unknown", stage="before")
+        PROMPT_CHARS.inc(len(compacted), provider=provider or "unknown", stage="after")
+        return compacted
+
     @staticmethod
     def enhance_prompt_with_style(
         base_prompt: str,
@@ -116,3 +281,30 @@ Additional Style Requirements:
         import re
         words = re.findall(r'\b[A-Z][a-z]+\b', prompt)
         return words[:max_keywords]
+
+
+def _drop_empty_headers(items: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """移除其下已无条目的小标题"""
+    kept = []
+    for i, (kind, line) in enumerate(items):
+        if kind == "header":
+            following = items[i + 1][0] if i + 1 < len(items) else None
+            if following not in ("bullet", "directive"):
+                continue
+        kept.append((kind, line))
+    return kept
+
+
+def _word_set(line: str) -> frozenset:
+    """列表条目的去重键"""
+    return frozenset(_NON_WORD.sub(" ", line).lower().split())
+
+
+def _join(items: List[Tuple[str, str]]) -> str:
+    """拼接为文本，合并连续空行"""
+    lines = []
+    for kind, line in items:
+        if kind == "blank" and (not lines or lines[-1] == ""):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
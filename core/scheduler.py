@@ -0,0 +1,386 @@
+"""
+Generation Scheduler - Global slide scheduler shared across decks
+Keeps every provider busy up to its concurrency ceiling while preserving fallback order
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from core.base_client import BaseImageClient
+from core.config import CoalescingConfig, GenerationConfig, SchedulerConfig
+from core.metrics import PROVIDER_LATENCY
+from core.single_flight import SingleFlight, request_key
+
+
+class DeadlineExceeded(Exception):
+    """No provider could finish a slide before its deadline, so none was tried"""
+
+
+class GenerationScheduler:
+    """
+    Schedules single-slide image requests across providers
+
+    Each provider owns a worker pool sized to its concurrency limit. A slide
+    request is queued on the first provider; when that attempt fails it is
+    re-queued on the next provider, so fallback traffic never occupies the
+    primary provider's workers. Slides from any number of decks share the
+    same queues, which lets batch throughput follow provider capacity.
+
+    Slides submitted with a deadline skip providers whose expected finish
+    time (latency estimate x queue waves ahead) is past it, and fail with
+    DeadlineExceeded when no provider fits. Estimates need latency history,
+    so a slide still running shortly before its deadline is also queued on
+    the next provider (hedged, SchedulerConfig.HEDGE_MARGIN); whichever
+    attempt returns an image first resolves the slide.
+
+    A slide whose request is identical to one already queued or running
+    (same normalized prompt and settings, from any deck) shares that
+    request's result instead of being queued again.
+    """
+
+    def __init__(
+        self,
+        clients: List[BaseImageClient],
+        concurrency: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize scheduler with ordered list of clients
+
+        Args:
+            clients: List of image clients in priority order
+            concurrency: Optional per-provider (per API key) concurrency overrides,
+                         keyed by client name (e.g., {"GLM": 8})
+        """
+        self.clients = [c for c in clients if c.is_available()]
+
+        limits = dict(SchedulerConfig.PROVIDER_CONCURRENCY)
+        if concurrency:
+            limits.update(concurrency)
+
+        # Limits are per API key: providers with a key pool get one share per key
+        self.concurrency = {
+            c.get_client_name(): max(1, limits.get(c.get_client_name(), SchedulerConfig.DEFAULT_CONCURRENCY)) * c.key_count()
+            for c in self.clients
+        }
+        self._executors = [
+            ThreadPoolExecutor(
+                max_workers=self.concurrency[c.get_client_name()],
+                thread_name_prefix=f"sched-{c.get_client_name().lower()}"
+            )
+            for c in self.clients
+        ]
+
+        # Deadline estimates: per-level queue depth and latency EWMA
+        self._lock = threading.Lock()
+        self._pending = [0] * len(self.clients)
+        self._latency: List[Optional[float]] = [None] * len(self.clients)
+        self._flights = SingleFlight("image")
+
+        # Pending hedges: (time.monotonic(), sequence, callback), run by one thread
+        self._hedges: List[Any] = []
+        self._hedge_sequence = itertools.count()
+        self._hedge_condition = threading.Condition()
+        self._hedge_thread: Optional[threading.Thread] = None
+
+        if not self.clients:
+            print("[SCHED] Warning: No available clients in scheduler")
+
+    def submit(
+        self,
+        prompt: str,
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO,
+        slide: Optional[int] = None,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        Queue a single slide for generation
+
+        Args:
+            prompt: Image generation prompt
+            resolution: Resolution
+            style: Style description
+            aspect_ratio: Aspect ratio
+            slide: Slide number recorded on traces
+            deadline: Optional time.monotonic() by which the image is needed
+
+        Returns:
+            Future resolving to base64 image data, or None if all clients
+            failed. Fails with DeadlineExceeded if providers were skipped
+            because none could finish in time.
+        """
+        request = {
+            "prompt": prompt,
+            "aspect_ratio": aspect_ratio,
+            "resolution": resolution,
+            "style": style,
+            "slide": slide,
+        }
+        # Attempts run in the submitter's context so they land in its trace
+        context = contextvars.copy_context()
+        if not CoalescingConfig.IMAGES:
+            return self._start(request, context, deadline)
+
+        key = request_key("image", {k: v for k, v in request.items() if k != "slide"})
+        shared, joined = self._flights.submit(key, lambda: self._start(request, context, deadline))
+        if not joined:
+            return shared
+
+        # The shared request ran against its own deadline; a slide with more
+        # time left gets its own attempt when that one ran out
+        future = Future()
+
+        def settle(done: Future) -> None:
+            error = None if done.cancelled() else done.exception()
+            if isinstance(error, DeadlineExceeded) and (deadline is None or deadline > time.monotonic()):
+                self._dispatch(future, request, context, self._new_state(deadline))
+            elif done.cancelled():
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result())
+
+        shared.add_done_callback(settle)
+        return future
+
+    def estimated_finish(self, level: int, queued: Optional[int] = None) -> Optional[float]:
+        """
+        Expected seconds until a new request at a fallback level completes
+
+        Args:
+            level: Fallback level (index into clients)
+            queued: Requests ahead of it (default: currently pending at the level)
+
+        Returns:
+            Estimate in seconds, or None while the provider has no latency history
+        """
+        latency = self._latency[level]
+        if latency is None:
+            stats = PROVIDER_LATENCY.snapshot().get(f"{self.clients[level].get_client_name()},image")
+            if not stats or not stats["count"]:
+                return None
+            latency = stats["sum"] / stats["count"]
+        if queued is None:
+            queued = self._pending[level]
+        waves = queued // self.concurrency[self.clients[level].get_client_name()] + 1
+        return latency * waves
+
+    def generate_images(
+        self,
+        prompts: List[str],
+        resolution: str = GenerationConfig.DEFAULT_RESOLUTION,
+        style: str = GenerationConfig.DEFAULT_STYLE,
+        aspect_ratio: str = GenerationConfig.DEFAULT_ASPECT_RATIO
+    ) -> List[Optional[str]]:
+        """
+        Generate a deck's images through the shared queues
+
+        Same contract as ImageGenerationChain.generate_images, so either
+        can back a deck.
+
+        Args:
+            prompts: List of image generation prompts
+            resolution: Resolution
+            style: Style description
+            aspect_ratio: Aspect ratio
+
+        Returns:
+            List of base64 image data (None for failed generations)
+        """
+        futures = [
+            self.submit(p, resolution=resolution, style=style, aspect_ratio=aspect_ratio, slide=i + 1)
+            for i, p in enumerate(prompts)
+        ]
+        results = [f.result() for f in futures]
+
+        success = sum(1 for r in results if r is not None)
+        print(f"[SCHED] Deck complete: {success}/{len(prompts)} images succeeded")
+
+        return results
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """
+        Stop all provider worker pools
+
+        Args:
+            wait: Block until running attempts finish
+            cancel_futures: Drop queued attempts; their slides resolve to None
+        """
+        for executor in self._executors:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def _start(self, request: Dict[str, Any], context: contextvars.Context, deadline: Optional[float]) -> Future:
+        """Queue a request on the first provider"""
+        future = Future()
+        self._dispatch(future, request, context, self._new_state(deadline))
+        return future
+
+    @staticmethod
+    def _new_state(deadline: Optional[float]) -> Dict[str, Any]:
+        """Per-slide routing state: next level to try and attempts in flight"""
+        return {"deadline": deadline, "skipped": False, "next": 0, "running": 0, "attempts": []}
+
+    def _dispatch(
+        self,
+        future: Future,
+        request: Dict[str, Any],
+        context: contextvars.Context,
+        state: Dict[str, Any]
+    ) -> None:
+        """Queue an attempt on the next provider that fits the deadline"""
+        with self._lock:
+            level = state["next"]
+            while level < len(self.clients) and not self._fits(level, state):
+                state["skipped"] = True
+                level += 1
+            state["next"] = level + 1
+            if level < len(self.clients):
+                state["running"] += 1
+                self._pending[level] += 1
+            last = state["running"] == 0
+
+        if level >= len(self.clients):
+            # A hedged attempt still running resolves the slide instead
+            if not last:
+                return
+            if state["skipped"]:
+                _resolve(future, error=DeadlineExceeded(f"Slide {request['slide']}: no provider can finish before the deadline"))
+            else:
+                _resolve(future, None)
+            return
+
+        try:
+            # A copy per attempt: a hedged slide runs two attempts at once
+            attempt = self._executors[level].submit(context.copy().run, self._attempt, level, request, state)
+        except RuntimeError as e:
+            # Executor already shut down
+            with self._lock:
+                self._pending[level] -= 1
+                state["running"] -= 1
+                last = state["running"] == 0
+            print(f"[SCHED] Cannot queue request: {str(e)}")
+            if last:
+                _resolve(future, None)
+            return
+
+        state["attempts"].append(attempt)
+        attempt.add_done_callback(
+            lambda done: self._on_attempt_done(future, level, request, context, state, done)
+        )
+        if state["deadline"] is not None and state["next"] < len(self.clients):
+            self._hedge_at(future, request, context, state)
+
+    def _hedge_at(
+        self,
+        future: Future,
+        request: Dict[str, Any],
+        context: contextvars.Context,
+        state: Dict[str, Any]
+    ) -> None:
+        """Queue the slide on the next level too if it is still running near its deadline"""
+        level = state["next"]
+        lead = (self.estimated_finish(level) or 0.0) + SchedulerConfig.HEDGE_MARGIN
+
+        def hedge() -> None:
+            if future.done() or state["next"] != level or state["deadline"] <= time.monotonic():
+                return
+            print(f"[SCHED] Slide {request['slide']}: still running near the deadline, "
+                  f"also trying {self.clients[level].get_client_name()}")
+            self._dispatch(future, request, context, state)
+
+        with self._hedge_condition:
+            heapq.heappush(self._hedges, (state["deadline"] - lead, next(self._hedge_sequence), hedge))
+            if self._hedge_thread is None:
+                self._hedge_thread = threading.Thread(target=self._run_hedges, name="sched-hedge", daemon=True)
+                self._hedge_thread.start()
+            self._hedge_condition.notify()
+
+    def _run_hedges(self) -> None:
+        """Run hedges as they come due"""
+        while True:
+            with self._hedge_condition:
+                while not self._hedges or self._hedges[0][0] > time.monotonic():
+                    self._hedge_condition.wait(
+                        None if not self._hedges else self._hedges[0][0] - time.monotonic()
+                    )
+                _, _, hedge = heapq.heappop(self._hedges)
+            hedge()
+
+    def _fits(self, level: int, state: Dict[str, Any], queued: Optional[int] = None) -> bool:
+        """Whether an attempt at level is expected to finish before the deadline"""
+        if state["deadline"] is None:
+            return True
+        remaining = state["deadline"] - time.monotonic()
+        if remaining <= 0:
+            return False
+        estimate = self.estimated_finish(level, queued)
+        return estimate is None or estimate <= remaining
+
+    def _attempt(self, level: int, request: Dict[str, Any], state: Dict[str, Any]) -> Optional[str]:
+        """Run one provider attempt"""
+        client = self.clients[level]
+        # Time spent queued may have used up the budget
+        if not self._fits(level, state, queued=0):
+            state["skipped"] = True
+            return None
+
+        start = time.monotonic()
+        try:
+            return client.generate_image_traced(**request)
+        except Exception as e:
+            print(f"[SCHED] {client.get_client_name()} error: {str(e)}")
+            return None
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                previous = self._latency[level]
+                self._latency[level] = elapsed if previous is None else (
+                    SchedulerConfig.LATENCY_EWMA_ALPHA * elapsed + (1 - SchedulerConfig.LATENCY_EWMA_ALPHA) * previous
+                )
+
+    def _on_attempt_done(
+        self,
+        future: Future,
+        level: int,
+        request: Dict[str, Any],
+        context: contextvars.Context,
+        state: Dict[str, Any],
+        attempt: Future
+    ) -> None:
+        """Resolve the slide, or move it to the next fallback level"""
+        with self._lock:
+            self._pending[level] -= 1
+            state["running"] -= 1
+            # Holding finished attempts would keep their images alive
+            state["attempts"].remove(attempt)
+        result = None if attempt.cancelled() else attempt.result()
+
+        if result is not None:
+            _resolve(future, result)
+            # Hedged attempts still queued are no longer needed
+            for other in list(state["attempts"]):
+                other.cancel()
+        elif not future.done():
+            self._dispatch(future, request, context, state)
+
+    def __repr__(self) -> str:
+        """String representation of the scheduler"""
+        return f"<GenerationScheduler concurrency={self.concurrency}>"
+
+
+def _resolve(future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """Resolve a slide future unless a hedged attempt (or the caller) already did"""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
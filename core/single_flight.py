@@ -0,0 +1,245 @@
+"""
+Single Flight - Coalesce identical in-flight requests
+Concurrent duplicates wait on one provider call and share its result (or its error)
+
+A cache cannot help requests that start together: none of them has a result
+yet. SingleFlight keeps the requests that are currently running by key; a
+request whose key is already running joins it instead of calling the
+provider again. The key is forgotten as soon as the call finishes, so
+results are never reused by later requests.
+
+Usage:
+    flights = SingleFlight("chat")
+    content = flights.do(request_key("chat", request), lambda: call_provider(request))
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.metrics import COALESCED_REQUESTS
+from core.tracing import span
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """
+    Stable key of a normalized request
+
+    Strings are whitespace-collapsed, so prompts that differ only in
+    indentation or line breaks coalesce.
+
+    Args:
+        kind: Request kind (e.g., "image", "chat")
+        request: Request fields that determine the response
+
+    Returns:
+        Hex digest
+    """
+    normalized = json.dumps({"kind": kind, "request": _normalize(request)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class StreamAbandoned(RuntimeError):
+    """The request that owned a shared stream stopped reading it"""
+
+
+class _Broadcast:
+    """Chunks of one streamed call, replayed to every reader"""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+
+    def publish(self, chunk: Any) -> None:
+        with self.condition:
+            self.chunks.append(chunk)
+            self.condition.notify_all()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def follow(self) -> Iterator[Any]:
+        """Every chunk so far, then new chunks as they are published"""
+        position = 0
+        while True:
+            with self.condition:
+                while position >= len(self.chunks) and not self.done:
+                    self.condition.wait()
+                chunks = self.chunks[position:]
+                position = len(self.chunks)
+                done, error = self.done, self.error
+            yield from chunks
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """In-flight requests of one kind, by key"""
+
+    def __init__(self, kind: str):
+        """
+        Initialize
+
+        Args:
+            kind: Request kind (metrics label and span name)
+        """
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the identical call already running
+
+        Args:
+            key: Request key (see request_key)
+            fn: Makes the call when no identical one is running
+
+        Returns:
+            The call's result; its exception is raised in every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            joined = call is not None
+            if not joined:
+                call = self._calls[key] = Future()
+
+        if joined:
+            COALESCED_REQUESTS.inc(kind=self.kind)
+            with span(f"{self.kind}.coalesced", cat="chain"):
+                return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._forget(key, call)
+            call.set_exception(e)
+            raise
+        self._forget(key, call)
+        call.set_result(result)
+        return result
+
+    def submit(self, key: str, start: Callable[[], Future]) -> Tuple[Future, bool]:
+        """
+        Start an asynchronous call, or join the identical one already running
+
+        Args:
+            key: Request key (see request_key)
+            start: Starts the call and returns its Future
+
+        Returns:
+            (future, joined): the caller's Future, and whether it joined a
+            running call (joined callers get their own Future, so
+            cancelling one does not affect the others)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            joined = call is not None
+            if not joined:
+                call = self._calls[key] = Future()
+
+        if joined:
+            COALESCED_REQUESTS.inc(kind=self.kind)
+            future = Future()
+            call.add_done_callback(lambda done: _copy(done, future))
+            return future, True
+
+        try:
+            source = start()
+        except BaseException as e:
+            self._forget(key, call)
+            call.set_exception(e)
+            raise
+
+        def finish(done: Future) -> None:
+            self._forget(key, call)
+            _copy(done, call)
+
+        source.add_done_callback(finish)
+        return source, False
+
+    def stream(self, key: str, fn: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """
+        Iterate fn(), or replay the identical stream already running
+
+        Joining readers get every chunk published so far, then follow the
+        stream live. The request is registered when iteration starts.
+
+        Args:
+            key: Request key (see request_key)
+            fn: Opens the stream when no identical one is running
+
+        Yields:
+            Stream chunks
+
+        Raises:
+            StreamAbandoned: In joined readers, if the owning reader stopped early
+        """
+        with self._lock:
+            flight = self._streams.get(key)
+            joined = flight is not None
+            if not joined:
+                flight = self._streams[key] = _Broadcast()
+
+        if joined:
+            COALESCED_REQUESTS.inc(kind=self.kind)
+            yield from flight.follow()
+            return
+
+        source = fn()
+        error = None
+        try:
+            for chunk in source:
+                flight.publish(chunk)
+                yield chunk
+        except GeneratorExit:
+            error = StreamAbandoned(f"Shared {self.kind} stream was closed before it finished")
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+            with self._lock:
+                if self._streams.get(key) is flight:
+                    del self._streams[key]
+            flight.close(error)
+
+    def _forget(self, key: str, call: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+def _copy(source: Future, target: Future) -> None:
+    """Resolve target the way source was resolved"""
+    if source.cancelled():
+        target.cancel()
+        return
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
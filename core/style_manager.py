@@ -1,107 +1,301 @@
 """
 Style Manager - 风格管理器
 加载和管理 PPT 风格配置
+
+风格文件 (config/styles/*.md) 编译为预拆分的模板对象，由进程级 STYLE_REGISTRY
+共享；文件修改时间变化后自动重新编译，服务无需重启即可使用新风格。
 """
 
 import os
-import json
-from typing import Dict, Any
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+from core.config import StyleConfig
+from core.metrics import record_cache
 
-class StyleManager:
-    """风格管理器"""
 
-    def __init__(self):
-        """初始化风格管理器"""
-        self.styles_dir = os.path.join(
-            os.path.dirname(__file__),
-            "../config/styles"
-        )
-        self._cache = {}
+_FIELD = re.compile(r"\{([a-z_]+)\}")
+_PAGE_HEADING = re.compile(r"^###\s+(.+?)\s*$")
+_PAGE_NAME = re.compile(r"\(([^)]+)\)")
+_HEX_COLOR = re.compile(r"#[0-9A-Fa-f]{6}\b")
 
-    def load_style(self, style_name: str) -> Dict[str, Any]:
+
+class CompiledTemplate:
+    """预拆分的提示词模板"""
+
+    def __init__(self, text: str):
         """
-        加载风格配置
+        编译模板
 
         Args:
-            style_name: 风格名称
+            text: 含 {field} 占位符的模板文本
+        """
+        self.text = text
+        self.fields: List[str] = []
+        self._parts: List[Tuple[str, Optional[str]]] = []
 
-        Returns:
-            风格配置字典
+        position = 0
+        for match in _FIELD.finditer(text):
+            self._parts.append((text[position:match.start()], match.group(1)))
+            self.fields.append(match.group(1))
+            position = match.end()
+        self._parts.append((text[position:], None))
+
+    def render(self, values: Dict[str, str]) -> str:
         """
-        if style_name in self._cache:
-            return self._cache[style_name]
+        一次性填充所有占位符
 
-        style_path = os.path.join(self.styles_dir, f"{style_name}.md")
+        Args:
+            values: 占位符取值，未提供的占位符原样保留
 
-        if not os.path.exists(style_path):
-            print(f"警告: 风格 '{style_name}' 不存在，使用默认风格")
-            return self._default_style()
+        Returns:
+            渲染后的提示词
+        """
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = values.get(field)
+                out.append(value if value is not None else "{" + field + "}")
+        return "".join(out)
 
-        with open(style_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def __str__(self) -> str:
+        return self.text
 
-        # 解析风格文件
-        style_config = self._parse_style_file(content, style_name)
-        self._cache[style_name] = style_config
 
-        return style_config
+class CompiledStyle:
+    """编译后的风格"""
 
-    def _parse_style_file(self, content: str, style_name: str) -> Dict[str, Any]:
-        """解析风格文件"""
-        # 这里简化处理，实际可以更精确地解析 Markdown
-        lines = content.split('\n')
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        templates: Dict[str, CompiledTemplate],
+        path: Optional[str] = None,
+        mtime: Optional[float] = None,
+        palette: Optional[List[str]] = None
+    ):
+        self.name = name
+        self.description = description
+        self.templates = templates
+        self.path = path
+        self.mtime = mtime
+        # 风格文件中出现的颜色 (#RRGGBB，按出现顺序去重)，供本地渲染使用
+        self.palette = palette or []
 
-        config = {
-            "name": style_name,
-            "description": "",
-            "templates": {}
+    @property
+    def config(self) -> Dict[str, Any]:
+        """风格配置字典 (StyleManager.load_style 的返回格式)"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "templates": self.templates,
+            "palette": self.palette
         }
 
-        current_section = None
-        current_template = []
 
-        for line in lines:
-            if line.startswith("## "):
-                # 新的章节
-                if current_section and current_template:
-                    template_text = "\n".join(current_template)
-                    config["templates"][current_section] = template_text
+class StyleRegistry:
+    """
+    进程级风格注册表
 
-                current_section = line[3:].strip().lower()
-                current_template = []
+    每个风格文件只解析一次；之后的访问在 RELOAD_INTERVAL 内直接返回已编译
+    的风格，超过间隔时比较文件修改时间，变化则重新编译 (热加载)。未知风格
+    编译为默认风格并同样缓存，风格文件出现后自动切换。
+    """
 
-            elif line.strip() and current_section:
-                current_template.append(line)
+    def __init__(
+        self,
+        styles_dir: str = StyleConfig.STYLES_DIR,
+        reload_interval: float = StyleConfig.RELOAD_INTERVAL
+    ):
+        """
+        初始化注册表
 
-        # 添加最后一个模板
-        if current_section and current_template:
-            template_text = "\n".join(current_template)
-            config["templates"][current_section] = template_text
+        Args:
+            styles_dir: 风格文件目录
+            reload_interval: 修改时间检查间隔 (秒)
+        """
+        self.styles_dir = styles_dir
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._styles: Dict[str, CompiledStyle] = {}
+        self._checked: Dict[str, float] = {}
 
-        return config
+    def get(self, style_name: str) -> CompiledStyle:
+        """
+        获取编译后的风格
 
-    def _default_style(self) -> Dict[str, Any]:
-        """默认风格配置"""
-        return {
-            "name": "default",
-            "description": "默认专业风格",
-            "templates": {
-                "cover": "Create a professional presentation cover with title: {content}. Style: Modern, clean, professional.",
-                "content": "Create a professional presentation content page with: {content}. Style: Clean, readable, professional.",
-                "data": "Create a professional presentation data page with: {content}. Style: Clear data visualization.",
-                "summary": "Create a professional presentation summary page with: {content}. Style: Clean, impactful conclusion."
-            }
-        }
+        Args:
+            style_name: 风格名称
 
-    def list_styles(self) -> list[str]:
+        Returns:
+            编译后的风格 (风格文件不存在时为默认风格)
+        """
+        now = time.monotonic()
+        with self._lock:
+            style = self._styles.get(style_name)
+            if style is not None and now - self._checked.get(style_name, 0.0) < self.reload_interval:
+                record_cache("style", hit=True)
+                return style
+
+        path = os.path.join(self.styles_dir, f"{style_name}.md")
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+
+        if style is not None and style.mtime == mtime:
+            with self._lock:
+                self._checked[style_name] = now
+            record_cache("style", hit=True)
+            return style
+
+        record_cache("style", hit=False)
+        if mtime is None:
+            print(f"警告: 风格 '{style_name}' 不存在，使用默认风格")
+            compiled = default_style()
+        else:
+            if style is not None:
+                print(f"[STYLE] Reloading {style_name}")
+            with open(path, 'r', encoding='utf-8') as f:
+                compiled = compile_style(f.read(), style_name, path=path, mtime=mtime)
+
+        with self._lock:
+            self._styles[style_name] = compiled
+            self._checked[style_name] = now
+        return compiled
+
+    def compile_all(self) -> List[str]:
+        """
+        预编译目录下所有风格
+
+        Returns:
+            风格名称列表
+        """
+        names = self.list_styles()
+        for name in names:
+            if name != "default":
+                self.get(name)
+        return names
+
+    def invalidate(self, style_name: Optional[str] = None) -> None:
+        """丢弃已编译的风格 (不指定名称时全部丢弃)"""
+        with self._lock:
+            if style_name is None:
+                self._styles.clear()
+                self._checked.clear()
+            else:
+                self._styles.pop(style_name, None)
+                self._checked.pop(style_name, None)
+
+    def list_styles(self) -> List[str]:
         """列出所有可用风格"""
         if not os.path.exists(self.styles_dir):
             return ["default"]
 
-        styles = []
-        for file in os.listdir(self.styles_dir):
-            if file.endswith(".md"):
-                styles.append(file[:-3])
-
+        styles = sorted(f[:-3] for f in os.listdir(self.styles_dir) if f.endswith(".md"))
         return styles if styles else ["default"]
+
+
+def compile_style(
+    content: str,
+    style_name: str,
+    path: Optional[str] = None,
+    mtime: Optional[float] = None
+) -> CompiledStyle:
+    """
+    解析风格文件
+
+    "## 提示词模板" 章节下每个 "### 封面页 (Cover)" 形式的小节对应一种页面
+    类型 (取括号内英文名的小写)，模板为小节内代码块的内容。
+
+    Args:
+        content: Markdown 文本
+        style_name: 风格名称
+        path: 文件路径
+        mtime: 文件修改时间
+
+    Returns:
+        编译后的风格
+    """
+    description = ""
+    templates: Dict[str, CompiledTemplate] = {}
+
+    in_templates = False
+    page_type = None
+    block: Optional[List[str]] = None
+
+    for line in content.split('\n'):
+        if block is not None:
+            if line.strip().startswith("```"):
+                if page_type and page_type not in templates:
+                    templates[page_type] = CompiledTemplate("\n".join(block).strip())
+                block = None
+            else:
+                block.append(line)
+            continue
+
+        if line.startswith("# ") and not description:
+            description = line[2:].strip()
+        elif line.startswith("## "):
+            in_templates = "提示词模板" in line or "prompt template" in line.lower()
+            page_type = None
+        elif in_templates and _PAGE_HEADING.match(line):
+            heading = _PAGE_HEADING.match(line).group(1)
+            english = _PAGE_NAME.search(heading)
+            page_type = (english.group(1) if english else heading).strip().lower()
+        elif line.strip().startswith("```"):
+            block = []
+
+    palette = list(dict.fromkeys(color.upper() for color in _HEX_COLOR.findall(content)))
+
+    return CompiledStyle(style_name, description, templates, path=path, mtime=mtime, palette=palette)
+
+
+def default_style() -> CompiledStyle:
+    """默认风格"""
+    return CompiledStyle(
+        name="default",
+        description="默认专业风格",
+        templates={
+            "cover": CompiledTemplate("Create a professional presentation cover with title: {content}. Style: Modern, clean, professional."),
+            "content": CompiledTemplate("Create a professional presentation content page with: {content}. Style: Clean, readable, professional."),
+            "data": CompiledTemplate("Create a professional presentation data page with: {content}. Style: Clear data visualization."),
+            "summary": CompiledTemplate("Create a professional presentation summary page with: {content}. Style: Clean, impactful conclusion.")
+        }
+    )
+
+
+STYLE_REGISTRY = StyleRegistry()
+
+
+class StyleManager:
+    """风格管理器"""
+
+    def __init__(self, registry: Optional[StyleRegistry] = None):
+        """
+        初始化风格管理器
+
+        Args:
+            registry: 风格注册表 (默认使用进程级 STYLE_REGISTRY)
+        """
+        self.registry = registry or STYLE_REGISTRY
+        self.styles_dir = self.registry.styles_dir
+
+    def load_style(self, style_name: str) -> Dict[str, Any]:
+        """
+        加载风格配置
+
+        Args:
+            style_name: 风格名称
+
+        Returns:
+            风格配置字典，templates 为 {页面类型: CompiledTemplate}
+        """
+        return self.registry.get(style_name).config
+
+    def list_styles(self) -> list[str]:
+        """列出所有可用风格"""
+        return self.registry.list_styles()
@@ -0,0 +1,174 @@
+"""
+Tracing - Span-based timing for the generation pipeline
+Records stage, chain and provider spans per deck; exports Chrome trace-event JSON
+
+Usage:
+    tracer = Tracer("my-deck")
+    with use_tracer(tracer):
+        with span("plan"):
+            ...
+    tracer.export_chrome_trace("trace.json")   # open in chrome://tracing or Perfetto
+
+Spans opened while no tracer is active are no-ops, so instrumented code
+works unchanged outside of a traced run. The active tracer lives in a
+context variable; code that hands work to other threads must copy the
+context (see GenerationScheduler.submit).
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("ppt_tracer", default=None)
+
+
+class Tracer:
+    """Collects spans of one deck run"""
+
+    def __init__(self, name: str = "deck"):
+        """
+        Initialize tracer
+
+        Args:
+            name: Trace name (shown as process name in trace viewers)
+        """
+        self.name = name
+        self.origin = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        # Called as hook(name, cat, args, ended) when a span opens and closes
+        self.hooks: List[Callable[[str, str, Dict[str, Any], bool], Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        """
+        Time a block
+
+        Args:
+            name: Span name (e.g., "plan", "GLM.generate_image")
+            cat: Category: stage, chain or provider
+            **args: Extra fields (slide number, provider, ...)
+
+        Yields:
+            Mutable args dict, for results known only at the end
+        """
+        for hook in list(self.hooks):
+            hook(name, cat, args, False)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "cat": cat,
+                    "start": start - self.origin,
+                    "duration": end - start,
+                    "thread": thread.name,
+                    "tid": thread.ident,
+                    "args": args,
+                })
+            for hook in list(self.hooks):
+                hook(name, cat, args, True)
+
+    def stage_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate spans by name
+
+        Returns:
+            {name: {"cat", "count", "total_s", "max_s"}} in first-seen order
+        """
+        summary: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+
+        for s in spans:
+            entry = summary.setdefault(s["name"], {"cat": s["cat"], "count": 0, "total_s": 0.0, "max_s": 0.0})
+            entry["count"] += 1
+            entry["total_s"] += s["duration"]
+            entry["max_s"] = max(entry["max_s"], s["duration"])
+
+        for entry in summary.values():
+            entry["total_s"] = round(entry["total_s"], 4)
+            entry["max_s"] = round(entry["max_s"], 4)
+        return summary
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Convert to Chrome trace-event format
+
+        Returns:
+            Trace dict with complete ("X") events and thread-name metadata
+        """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        threads = {}
+
+        with self._lock:
+            spans = list(self.spans)
+
+        for s in spans:
+            threads[s["tid"]] = s["thread"]
+            events.append({
+                "name": s["name"],
+                "cat": s["cat"],
+                "ph": "X",
+                "ts": round(s["start"] * 1e6, 1),
+                "dur": round(s["duration"] * 1e6, 1),
+                "pid": pid,
+                "tid": s["tid"],
+                "args": {k: v for k, v in s["args"].items() if isinstance(v, (str, int, float, bool, type(None)))},
+            })
+
+        for tid, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> str:
+        """
+        Write the Chrome trace file
+
+        Args:
+            path: Output file path
+
+        Returns:
+            The path written
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Tracer of the current context, or None"""
+    return _current.get()
+
+
+@contextmanager
+def use_tracer(tracer: Tracer):
+    """Make tracer the active tracer within the block"""
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args):
+    """Time a block on the active tracer (no-op without one)"""
+    tracer = _current.get()
+    if tracer is None:
+        yield args
+        return
+
+    with tracer.span(name, cat, **args) as span_args:
+        yield span_args
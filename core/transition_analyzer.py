@@ -0,0 +1,326 @@
+"""
+Transition Analyzer - Local transition engine (no LLM calls)
+Compares adjacent slide images with vectorized NumPy and picks the transition deterministically
+
+Each slide is downsampled once to TransitionConfig.ANALYSIS_WIDTH and reduced
+to a few features: a colour histogram, its dominant palette, edge density and
+a coarse layout grid (brightness and detail per region). Adjacent slides are
+compared on those features:
+
+    palette change  -> dissolve
+    detail change   -> zoom in / out
+    layout change   -> slide left / right
+    otherwise       -> fade
+
+Duration grows with how different the slides are. Features are cached by
+image path; observe() computes them when an image is saved, so assembly
+does not read the images again.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # NumPy or Pillow missing: the analyzer reports itself unavailable
+    np = Image = None
+
+from core.config import TransitionConfig
+
+
+class SlideFeatures:
+    """Downsampled image features of one slide"""
+
+    def __init__(
+        self,
+        histogram: "np.ndarray",
+        palette: List[str],
+        luminance: float,
+        edge_density: float,
+        luminance_grid: "np.ndarray",
+        edge_grid: "np.ndarray",
+        edge_center: float
+    ):
+        # Normalized colour histogram (HISTOGRAM_BINS ** 3 bins)
+        self.histogram = histogram
+        # Dominant colours (#RRGGBB), most common first
+        self.palette = palette
+        self.luminance = luminance
+        # Fraction of pixels on an edge (how detailed the slide is)
+        self.edge_density = edge_density
+        # Mean brightness and share of edges per LAYOUT_GRID cell
+        self.luminance_grid = luminance_grid
+        self.edge_grid = edge_grid
+        # Horizontal centre of the edges (0 left - 1 right)
+        self.edge_center = edge_center
+
+
+class TransitionAnalyzer:
+    """Picks slide transitions from image content"""
+
+    def __init__(self, cache_size: int = TransitionConfig.FEATURE_CACHE_SIZE):
+        """
+        Initialize analyzer (available whenever NumPy and Pillow are installed)
+
+        Args:
+            cache_size: Number of slide features kept by image path
+        """
+        self.available = np is not None
+        if not self.available:
+            print("[TRANSITION] NumPy or Pillow not installed, local transition analysis will be disabled")
+        else:
+            # Register every decoder now, not on the first save in a writer thread
+            Image.init()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, SlideFeatures]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ========================================
+    # Features
+    # ========================================
+
+    def observe(self, path: str, data: bytes) -> None:
+        """
+        Compute and cache the features of an image that was just saved
+
+        Args:
+            path: Image path (the key later passed to transitions())
+            data: Encoded image bytes
+        """
+        if not self.available:
+            return
+        try:
+            features = extract_features(data)
+        except Exception as e:
+            print(f"[TRANSITION] Cannot analyze {path}: {str(e)}")
+            features = None
+        with self._lock:
+            self._cache.pop(path, None)
+            if features is not None:
+                self._cache[path] = features
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def features(self, image: Union[str, bytes]) -> Optional[SlideFeatures]:
+        """
+        Features of an image path (cached, else read from disk) or of image bytes
+
+        Returns:
+            SlideFeatures, or None if the image cannot be read
+        """
+        if not self.available:
+            return None
+        if isinstance(image, bytes):
+            return extract_features(image)
+
+        with self._lock:
+            features = self._cache.get(image)
+            if features is not None:
+                self._cache.move_to_end(image)
+                return features
+        try:
+            with open(image, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.observe(image, data)
+        with self._lock:
+            return self._cache.get(image)
+
+    # ========================================
+    # Transitions
+    # ========================================
+
+    def transitions(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Transitions between consecutive slides
+
+        Args:
+            image_paths: Slide images in slide order
+
+        Returns:
+            One transition per adjacent pair (the default fade where an
+            image cannot be analyzed)
+        """
+        features = [self.features(path) for path in image_paths]
+        return [
+            compare(features[i], features[i + 1]) if features[i] and features[i + 1] else default_transition()
+            for i in range(len(image_paths) - 1)
+        ]
+
+    def transition(self, from_image: Union[str, bytes], to_image: Union[str, bytes]) -> Dict[str, Any]:
+        """Transition between two slides (paths or image bytes)"""
+        return self.transitions([from_image, to_image])[0]
+
+    def describe(self, image: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Short image descriptor for LLM prompts
+
+        Returns:
+            {palette, brightness, detail} (0-1 values), or None if the image
+            cannot be analyzed
+        """
+        features = self.features(image)
+        if features is None:
+            return None
+        return {
+            "palette": features.palette,
+            "brightness": round(features.luminance, 2),
+            "detail": round(features.edge_density, 3)
+        }
+
+
+def extract_features(data: bytes) -> SlideFeatures:
+    """
+    Downsample an encoded image and compute its features
+
+    Args:
+        data: Encoded image bytes (PNG, JPEG, ...)
+
+    Returns:
+        SlideFeatures
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        width = TransitionConfig.ANALYSIS_WIDTH
+        height = max(1, round(image.height * width / image.width))
+        # JPEG decodes at reduced scale directly; reducing_gap keeps large PNGs cheap
+        image.draft("RGB", (width, height))
+        small = image.convert("RGB").resize((width, height), Image.BILINEAR, reducing_gap=2.0)
+    rgb = np.asarray(small, dtype=np.uint8)
+    pixels = rgb.reshape(-1, 3)
+
+    # Colour histogram: one bincount over the packed bin index of every pixel
+    bins = TransitionConfig.HISTOGRAM_BINS
+    quantized = pixels.astype(np.int32) * bins // 256
+    index = (quantized[:, 0] * bins + quantized[:, 1]) * bins + quantized[:, 2]
+    histogram = np.bincount(index, minlength=bins ** 3).astype(np.float32) / len(pixels)
+
+    # Dominant colours: mean colour of the most populated coarse bins
+    coarse = TransitionConfig.PALETTE_BINS
+    quantized = pixels.astype(np.int32) * coarse // 256
+    index = (quantized[:, 0] * coarse + quantized[:, 1]) * coarse + quantized[:, 2]
+    counts = np.bincount(index, minlength=coarse ** 3)
+    sums = np.stack([np.bincount(index, weights=pixels[:, c], minlength=coarse ** 3) for c in range(3)], axis=1)
+    top = [b for b in np.argsort(counts)[::-1][:TransitionConfig.PALETTE_SIZE] if counts[b]]
+    palette = ["#{:02X}{:02X}{:02X}".format(*(sums[b] / counts[b]).round().astype(int)) for b in top]
+
+    # Edges: luminance gradient magnitude above a threshold
+    lum = rgb.astype(np.float32) @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32) / 255
+    gradient = np.zeros_like(lum)
+    gradient[:, :-1] += np.abs(np.diff(lum, axis=1))
+    gradient[:-1, :] += np.abs(np.diff(lum, axis=0))
+    edges = (gradient > TransitionConfig.EDGE_THRESHOLD).astype(np.float32)
+
+    rows, cols = TransitionConfig.LAYOUT_GRID
+    edge_grid = _grid_means(edges, rows, cols)
+    total = edge_grid.sum()
+    columns = edges.sum(axis=0)
+    return SlideFeatures(
+        histogram=histogram,
+        palette=palette,
+        luminance=float(lum.mean()),
+        edge_density=float(edges.mean()),
+        luminance_grid=_grid_means(lum, rows, cols),
+        edge_grid=edge_grid / total if total else edge_grid,
+        edge_center=float(columns @ np.linspace(0, 1, len(columns)) / columns.sum()) if columns.sum() else 0.5
+    )
+
+
+def _grid_means(values: "np.ndarray", rows: int, cols: int) -> "np.ndarray":
+    """Mean of a 2-D array over a rows x cols grid of cells"""
+    height, width = values.shape
+    rows, cols = min(rows, height), min(cols, width)
+    cropped = values[:height - height % rows, :width - width % cols]
+    return cropped.reshape(rows, height // rows, cols, width // cols).mean(axis=(1, 3))
+
+
+def compare(before: SlideFeatures, after: SlideFeatures) -> Dict[str, Any]:
+    """
+    Pick the transition between two slides
+
+    Args:
+        before: Features of the current slide
+        after: Features of the next slide
+
+    Returns:
+        Transition dict (transition_type, duration, description, key_elements,
+        color_consistency as before, plus direction, key_colors and metrics)
+    """
+    # 0 = identical colours, 1 = no colour in common
+    color_distance = float(1 - np.minimum(before.histogram, after.histogram).sum())
+    # Where the detail sits and how bright each region is
+    edge_shift = float(np.abs(before.edge_grid - after.edge_grid).sum() / 2)
+    brightness_shift = float(np.abs(before.luminance_grid - after.luminance_grid).mean())
+    layout_distance = 0.5 * edge_shift + 0.5 * min(1.0, 2 * brightness_shift)
+    denser = max(before.edge_density, after.edge_density)
+    detail_change = (after.edge_density - before.edge_density) / denser if denser else 0.0
+    brightness_change = after.luminance - before.luminance
+
+    direction = None
+    if color_distance >= TransitionConfig.DISSOLVE_THRESHOLD:
+        transition_type = "dissolve"
+    elif abs(detail_change) >= TransitionConfig.ZOOM_THRESHOLD:
+        transition_type = "zoom"
+        direction = "in" if detail_change > 0 else "out"
+    elif layout_distance >= TransitionConfig.SLIDE_THRESHOLD:
+        transition_type = "slide"
+        # Content moves the way its detail moved
+        direction = "left" if after.edge_center < before.edge_center else "right"
+    else:
+        transition_type = "fade"
+
+    change = min(1.0, max(color_distance, layout_distance, abs(detail_change)))
+    duration = TransitionConfig.MIN_DURATION + (TransitionConfig.MAX_DURATION - TransitionConfig.MIN_DURATION) * change
+
+    key_elements = []
+    if color_distance >= TransitionConfig.DISSOLVE_THRESHOLD / 2:
+        key_elements.append("palette change")
+    if layout_distance >= TransitionConfig.SLIDE_THRESHOLD:
+        key_elements.append("layout shift")
+    if abs(detail_change) >= TransitionConfig.ZOOM_THRESHOLD / 2:
+        key_elements.append("more detail" if detail_change > 0 else "less detail")
+    if abs(brightness_change) >= 0.15:
+        key_elements.append("brighter" if brightness_change > 0 else "darker")
+    if not key_elements:
+        key_elements.append("continuous layout")
+
+    key_colors = list(dict.fromkeys(after.palette + before.palette[:1]))
+    if color_distance < 0.3:
+        consistency = "high"
+    elif color_distance < TransitionConfig.DISSOLVE_THRESHOLD:
+        consistency = "medium"
+    else:
+        consistency = "low"
+
+    name = f"{transition_type} {direction}" if direction else transition_type
+    return {
+        "transition_type": transition_type,
+        "direction": direction,
+        "duration": f"{duration:.1f}",
+        "description": f"{name.capitalize()} over {duration:.1f}s ({', '.join(key_elements)}), "
+                       f"leading into {', '.join(after.palette)}",
+        "key_elements": key_elements,
+        "key_colors": key_colors,
+        "color_consistency": consistency,
+        "metrics": {
+            "color_distance": round(color_distance, 3),
+            "layout_distance": round(layout_distance, 3),
+            "detail_change": round(detail_change, 3),
+            "brightness_change": round(brightness_change, 3)
+        },
+        "engine": "local"
+    }
+
+
+def default_transition() -> Dict[str, Any]:
+    """Transition used when a slide image cannot be analyzed"""
+    return {
+        "transition_type": "fade",
+        "duration": "1.5",
+        "description": "Fade transition effect",
+        "key_elements": ["fade out", "fade in"],
+        "color_consistency": "auto"
+    }
@@ -1,33 +1,65 @@
 """
 PPT Generator - Main generator
 Coordinates the entire PPT generation workflow
-Priority: GLM-4V (primary) -> Gemini (secondary) -> OpenRouter (tertiary)
+Priority: GLM-4V (primary) -> Gemini (secondary) -> OpenRouter (tertiary) -> local renderer (last resort)
 """
 
+import contextvars
 import os
 import json
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from pathlib import Path
 
 from core.gemini_client import GeminiClient
 from core.glm_client import GLMClient
 from core.openrouter_client import OpenRouterClient
 from core.style_manager import StyleManager
-from core.config import ResolutionConfig
-from core.image_utils import save_base64_image
+from core.base_client import BaseImageClient
+from core.cassette import Cassette, CassetteGLMClient, CassetteImageClient, RECORD, REPLAY
+from core.config import (
+    GenerationConfig, HTTPConfig, OutputConfig, PlanningConfig, RendererConfig, ResolutionConfig, SchedulerConfig,
+    TransitionConfig
+)
+from core.document_planner import DocumentPlanner, content_reference
+from core.http_transport import build_http_client, prewarm as prewarm_connections
+from core.key_pool import resolve_keys
+from core.outline_planner import OutlinePlanner
+from core.output_sink import DirectorySink, OutputSink, new_run_id
+from core.preview_server import PreviewServer
+from core.profiler import Profiler
+from core.image_utils import ImageWriter
+from core.local_renderer import LocalRendererClient
+from core.prompt_builder import ImagePromptBuilder
 from core.generation_chain import ImageGenerationChain
+from core.scheduler import DeadlineExceeded, GenerationScheduler
+from core.tracing import Tracer, current_tracer, span, use_tracer
+from core.transition_analyzer import TransitionAnalyzer
+from core.metrics import DECK_DURATION, DECKS, REGISTRY
 from generators.prompt_generator import PromptGenerator
 
 
 class PPTGenerator:
-    """Main PPT Generator with 3-level fallback"""
+    """Main PPT Generator with 4-level fallback"""
 
     def __init__(
         self,
-        gemini_api_key: Optional[str] = None,
-        glm_api_key: Optional[str] = None,
-        openrouter_api_key: Optional[str] = None
+        gemini_api_key: Optional[Union[str, List[str]]] = None,
+        glm_api_key: Optional[Union[str, List[str]]] = None,
+        openrouter_api_key: Optional[Union[str, List[str]]] = None,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        glm_client: Optional[GLMClient] = None,
+        image_clients: Optional[List[BaseImageClient]] = None,
+        cassette: Optional[Cassette] = None,
+        export_trace: Optional[bool] = None,
+        transition_engine: Optional[str] = None,
+        http_client: Optional[Any] = None,
+        prewarm: Optional[bool] = None,
+        profile: Optional[bool] = None
     ):
         """
         Initialize generator
@@ -36,19 +68,112 @@ class PPTGenerator:
             gemini_api_key: Gemini API key (secondary fallback)
             glm_api_key: GLM API key (primary for images)
             openrouter_api_key: OpenRouter API key (tertiary fallback)
+                                (each also accepts a list or comma-separated
+                                keys, rotated through a key pool)
+            provider_concurrency: Per-provider, per-key concurrency overrides
+                                  for generate_batch (e.g., {"GLM": 8})
+            glm_client: Prebuilt client for planning and transitions
+            image_clients: Image clients in fallback order, replacing the
+                           default GLM -> Gemini -> OpenRouter -> Local chain
+                           (Gemini/OpenRouter clients are then not built)
+            cassette: Record or replay provider interactions; defaults to
+                      Cassette.from_env() (PPT_CASSETTE). Replay needs no API keys.
+            export_trace: Write trace.json (Chrome trace-event format) next to
+                          generation_log.json; defaults to PPT_TRACE=true
+            transition_engine: "local" (analyze the slide images, no model
+                               calls) or "llm" (GLM descriptions); defaults
+                               to TransitionConfig.ENGINE
+            http_client: httpx.Client shared by the provider SDKs this
+                         generator builds; by default one is built with a
+                         pool sized to the provider concurrency limits
+                         (see core.http_transport)
+            prewarm: Open connections to the configured providers in the
+                     background now, so the first slide does not pay for
+                     DNS/TCP/TLS; defaults to HTTPConfig.PREWARM
+            profile: Profile each deck (stack sampling of every thread and
+                     tracemalloc per stage, see core.profiler) and write
+                     profile.pstats, profile.folded and profile.json next
+                     to generation_log.json; defaults to PPT_PROFILE=true
         """
-        self.gemini_client = GeminiClient(gemini_api_key)
-        self.glm_client = GLMClient(glm_api_key)
-        self.openrouter_client = OpenRouterClient(openrouter_api_key)
+        concurrency = {**SchedulerConfig.PROVIDER_CONCURRENCY, **(provider_concurrency or {})}
+        # Limits are per key: the shared pool covers every key of a provider
+        for name, api_key, env_var in (
+            ("GLM", glm_api_key, "GLM_API_KEY"),
+            ("GEMINI", gemini_api_key, "GEMINI_API_KEY"),
+            ("OPENROUTER", openrouter_api_key, "OPENROUTER_API_KEY")
+        ):
+            if name in concurrency:
+                concurrency[name] *= max(1, len(resolve_keys(api_key, env_var)))
+        self._owns_http_client = http_client is None
+        self.http_client = http_client if http_client is not None else build_http_client(concurrency)
+        # Providers whose SDK client is built here (and uses the shared transport)
+        warm = []
+
+        cassette = cassette or Cassette.from_env()
+        if cassette is not None and glm_client is None:
+            glm_client = CassetteGLMClient(cassette, glm_api_key, http_client=self.http_client)
+        if glm_client is None:
+            glm_client = GLMClient(glm_api_key, http_client=self.http_client)
+            warm.append("GLM")
+        self.glm_client = glm_client
+
+        if image_clients is None and cassette is not None and cassette.mode == REPLAY:
+            image_clients = cassette.replay_clients(self.glm_client)
+
+        if image_clients is None:
+            self.gemini_client = GeminiClient(gemini_api_key, http_client=self.http_client)
+            self.openrouter_client = OpenRouterClient(openrouter_api_key, http_client=self.http_client)
+            warm += ["GEMINI", "OPENROUTER"]
+            # Default chain (GLM -> Gemini -> OpenRouter)
+            image_clients = [
+                self.glm_client,
+                self.gemini_client,
+                self.openrouter_client
+            ]
+            if cassette is not None:
+                image_clients = [self.glm_client] + [
+                    CassetteImageClient(cassette, c.get_client_name(), c)
+                    for c in (self.gemini_client, self.openrouter_client)
+                ]
+            # Zero-network last level: every planned slide still gets an image
+            if RendererConfig.ENABLED:
+                image_clients.append(LocalRendererClient())
+        else:
+            self.gemini_client = None
+            self.openrouter_client = None
         self.style_manager = StyleManager()
         self.prompt_generator = PromptGenerator()
+        self.image_writer = ImageWriter()
+        # Draft finalize passes run one at a time in the background
+        self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="finalize")
+        # Live preview of the latest generate(preview=True) deck
+        self.preview_server: Optional[PreviewServer] = None
+        if export_trace is None:
+            export_trace = os.getenv("PPT_TRACE", "false").lower() == "true"
+        self.export_trace = export_trace
+        if profile is None:
+            profile = os.getenv("PPT_PROFILE", "false").lower() == "true"
+        self.profile = profile
+        # Image features are computed as images are saved: the local engine
+        # derives transitions from them, the LLM engine gets them as descriptors
+        self.transition_engine = transition_engine or TransitionConfig.ENGINE
+        analyzer = TransitionAnalyzer()
+        self.transition_analyzer: Optional[TransitionAnalyzer] = analyzer if analyzer.available else None
 
-        # Create generation chain (GLM -> Gemini -> OpenRouter)
-        self.generation_chain = ImageGenerationChain([
-            self.glm_client,
-            self.gemini_client,
-            self.openrouter_client
-        ])
+        if prewarm if prewarm is not None else HTTPConfig.PREWARM:
+            built = {"GLM": self.glm_client, "GEMINI": self.gemini_client, "OPENROUTER": self.openrouter_client}
+            prewarm_connections(self.http_client, [name for name in warm if built[name].client])
+
+        # Create generation chain
+        self.generation_chain = ImageGenerationChain(image_clients)
+        if cassette is not None and cassette.mode == RECORD:
+            cassette.set_providers(self.generation_chain.get_available_clients())
+
+        # Global scheduler shared by every deck in generate_batch
+        self.scheduler = GenerationScheduler(
+            self.generation_chain.clients,
+            concurrency=provider_concurrency
+        )
 
     def generate(
         self,
@@ -56,7 +181,11 @@ class PPTGenerator:
         page_count: int = 5,
         style: str = "gradient-glass",
         resolution: str = "2K",
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        draft: bool = False,
+        deadline: Optional[float] = None,
+        preview: bool = False,
+        sink: Optional[OutputSink] = None
     ) -> Dict[str, Any]:
         """
         Generate complete PPT
@@ -66,104 +195,686 @@ class PPTGenerator:
             page_count: Number of pages
             style: Style name
             resolution: Resolution (2K/4K)
-            output_dir: Output directory
+            output_dir: Output directory (default: a new, uniquely named
+                        run directory under OutputConfig.ROOT)
+            draft: Render every slide at the cheapest resolution and publish
+                   the viewer right away; finalize_draft() later upgrades
+                   approved slides to resolution in place
+            deadline: Seconds the whole deck may take. Slides go through the
+                      scheduler in parallel, attempts that cannot finish in
+                      time are not started, and when time is up the deck is
+                      assembled from the finished slides with placeholders
+                      for the rest (see slide_status in the result)
+            preview: Serve output_dir on PreviewConfig.PORT with a live viewer
+                     that shows slides as they are saved. The server keeps
+                     running after the deck (until self.preview_server.close()
+                     or the next preview deck), so review can continue.
+            sink: Where artifacts go instead of output_dir, e.g. ZipSink or
+                  MemorySink (no disk writes); closed when the deck is done
 
         Returns:
-            Generation result info
+            Generation result info (output_dir is the sink's location)
         """
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        render_resolution = resolution
+        if draft:
+            render_resolution = ResolutionConfig.cheapest_resolution(GenerationConfig.DEFAULT_ASPECT_RATIO)
+
         print(f"[PPT] Starting generation...")
         print(f"   Pages: {page_count}")
         print(f"   Style: {style}")
-        print(f"   Resolution: {resolution}")
+        print(f"   Resolution: {resolution}" + (f" (draft at {render_resolution})" if draft else ""))
+        if deadline is not None:
+            print(f"   Deadline: {deadline:.0f}s")
+
+        if sink is None:
+            sink = DirectorySink(output_dir) if output_dir else DirectorySink.create()
+        output_dir = sink.location
+
+        if preview:
+            if not isinstance(sink, DirectorySink):
+                raise ValueError("Live preview needs a directory output")
+            if self.preview_server is not None:
+                self.preview_server.close()
+            self.preview_server = PreviewServer(output_dir, title=content[:50]).start()
+
+        result = self._generate_deck(
+            content=content,
+            page_count=page_count,
+            style=style,
+            resolution=render_resolution,
+            output_dir=output_dir,
+            sink=sink,
+            # The chain renders one slide at a time; a deadline needs the
+            # scheduler's per-provider parallelism and deadline checks
+            image_backend=self.generation_chain if deadline_at is None else self.scheduler,
+            draft_of=resolution if draft else None,
+            deadline=deadline_at,
+            events=self.preview_server.publish if preview else None
+        )
+        if preview:
+            result["preview_url"] = self.preview_server.url
+        return result
+
+    def finalize_draft(
+        self,
+        output_dir: str,
+        slides: Optional[List[int]] = None
+    ) -> Future:
+        """
+        Upgrade approved slides of a draft deck to its target resolution
+
+        Runs in the background: prompts are rebuilt at the target resolution,
+        slides go through the shared scheduler, and each image file is
+        replaced in place as it arrives. viewer.html and generation_log.json
+        are rewritten when the pass ends. Once every slide is final the deck
+        is no longer a draft and its transitions are generated.
+
+        Args:
+            output_dir: Output directory of a generate(draft=True) run
+            slides: 1-based slide numbers to upgrade (default: all)
+
+        Returns:
+            Future of the updated generation result info
+        """
+        context = contextvars.copy_context()
+        return self._finalizer.submit(context.run, self._finalize_draft, output_dir, slides)
+
+    def generate_batch(
+        self,
+        jobs: List[Dict[str, Any]],
+        max_parallel_decks: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate multiple PPTs sharing clients, caches and provider limits
+
+        Decks are planned and assembled in parallel, while every slide
+        request goes through the shared GenerationScheduler, so providers
+        stay busy up to their concurrency ceilings across all decks.
+
+        Args:
+            jobs: List of job dicts accepting the same keys as generate()
+                  (content, page_count, style, resolution, output_dir, deadline, sink)
+            max_parallel_decks: Number of decks in flight at once
+
+        Returns:
+            One result dict per job, in job order. Failed decks have
+            success=False and an error message.
+        """
+        batch_id = new_run_id()
+        workers = max_parallel_decks or SchedulerConfig.MAX_PARALLEL_DECKS
+
+        print(f"[BATCH] Starting {len(jobs)} decks ({workers} in parallel)")
+        print(f"[BATCH] Concurrency: {self.scheduler.concurrency}")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deck") as pool:
+            futures = [
+                pool.submit(self._run_batch_job, i, job, os.path.join(OutputConfig.ROOT, f"{batch_id}_{i+1:03d}"))
+                for i, job in enumerate(jobs)
+            ]
+            results = [f.result() for f in futures]
+
+        succeeded = sum(1 for r in results if r["success"])
+        print(f"\n[BATCH] Complete: {succeeded}/{len(jobs)} decks succeeded")
+
+        return results
+
+    def generate_stream(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        max_parallel_decks: Optional[int] = None,
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate decks from a lazily read job stream
+
+        Like generate_batch, but jobs are pulled from the iterable only when
+        a deck slot frees up, and results are yielded as decks finish, so
+        memory stays bounded however long the stream is.
+
+        Args:
+            jobs: Job dicts (same keys as generate_batch jobs, plus an
+                  optional "id" echoed as job_id in the result)
+            max_parallel_decks: Number of decks in flight at once
+            stop: When set, no further jobs are read; decks already running
+                  finish and their results are still yielded
+
+        Yields:
+            One result dict per job, in completion order (job_index is the
+            job's position in the stream)
+
+        Closing the stream early drops decks that have not started. An
+        exception raised while waiting (e.g. KeyboardInterrupt) also
+        cancels queued slides on the scheduler, so running decks wind down
+        with placeholders instead of being waited for.
+        """
+        batch_id = new_run_id()
+        workers = max_parallel_decks or SchedulerConfig.MAX_PARALLEL_DECKS
+        jobs = iter(jobs)
+        running = set()
+        index = 0
+
+        print(f"[BATCH] Streaming decks ({workers} in parallel)")
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deck")
+        try:
+            while True:
+                while len(running) < workers and not (stop is not None and stop.is_set()):
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    output_dir = os.path.join(OutputConfig.ROOT, f"{batch_id}_{index+1:03d}")
+                    running.add(pool.submit(self._run_batch_job, index, job, output_dir))
+                    index += 1
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        except GeneratorExit:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        except BaseException:
+            # Aborted: do not wait for the running decks
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.scheduler.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown(wait=True)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop the generator's worker threads (scheduler, finalizer, image writer)
+
+        Args:
+            wait: Let queued work finish first; with False, queued slides and
+                  finalize passes are dropped and running ones are not waited for
+        """
+        self.scheduler.shutdown(wait=wait, cancel_futures=not wait)
+        self._finalizer.shutdown(wait=wait, cancel_futures=not wait)
+        if wait:
+            self.image_writer.close()
+            if self._owns_http_client:
+                self.http_client.close()
+        if self.preview_server is not None:
+            self.preview_server.close()
+            self.preview_server = None
+
+    def _run_batch_job(
+        self,
+        index: int,
+        job: Dict[str, Any],
+        default_output_dir: str
+    ) -> Dict[str, Any]:
+        """Run one batch job, reporting failures instead of raising"""
+        sink = job.get("sink") or DirectorySink(job.get("output_dir") or default_output_dir)
+        output_dir = sink.location
+        try:
+            if not job.get("content"):
+                raise ValueError("Job is missing 'content'")
+
+            deadline = job.get("deadline")
+            result = self._generate_deck(
+                content=job["content"],
+                page_count=job.get("page_count", 5),
+                style=job.get("style", "gradient-glass"),
+                resolution=job.get("resolution", "2K"),
+                output_dir=output_dir,
+                sink=sink,
+                image_backend=self.scheduler,
+                deadline=time.monotonic() + deadline if deadline is not None else None,
+                mode="batch"
+            )
+        except Exception as e:
+            print(f"[BATCH] Deck {index + 1} failed: {str(e)}")
+            result = {
+                "success": False,
+                "output_dir": output_dir,
+                "error": str(e)
+            }
+
+        result["job_index"] = index
+        if "id" in job:
+            result["job_id"] = job["id"]
+        return result
+
+    def _generate_deck(
+        self,
+        content: str,
+        page_count: int,
+        style: str,
+        resolution: str,
+        output_dir: str,
+        image_backend,
+        sink: Optional[OutputSink] = None,
+        draft_of: Optional[str] = None,
+        deadline: Optional[float] = None,
+        mode: str = "generate",
+        events: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the full pipeline for one deck
+
+        Args:
+            content: Document content or topic
+            page_count: Number of pages
+            style: Style name
+            resolution: Resolution (2K/4K)
+            output_dir: Output directory
+            image_backend: ImageGenerationChain or GenerationScheduler
+            sink: Artifact destination (default: DirectorySink(output_dir)),
+                  closed when the deck is done
+            draft_of: Target resolution when this run renders a draft
+            deadline: Optional time.monotonic() at which the deck is assembled
+                      from whatever slides are finished
+            mode: Metrics label ("generate" or "batch")
+            events: Optional live preview sink, called as events(name, data)
+                    (see core.preview_server for the event names)
+
+        Returns:
+            Generation result info
+        """
+        sink = sink or DirectorySink(output_dir)
+        start = time.perf_counter()
+        outcome = "failure"
+        tracer = Tracer(output_dir)
+        profiler = Profiler(tracer).start() if self.profile else None
+        try:
+            with use_tracer(tracer):
+                with span("deck", page_count=page_count, style=style, resolution=resolution):
+                    available_clients = self.generation_chain.get_available_clients()
+                    print(f"\n[IMAGE] Strategy: {' -> '.join(available_clients)}")
+
+                    # 5. Images start as soon as each slide is planned and are
+                    # written to disk as they arrive; only paths are kept
+                    with self._slide_submitter(image_backend, resolution, style, deadline) as submit:
+                        saved, skipped = [], set()
+
+                        def on_prompt(index: int, slide: Dict[str, Any], prompt: str) -> None:
+                            filepath = sink.path(self.image_name(index, slide.get("page_type", "content")))
+                            image = submit(index, prompt)
+                            # Only the outcome is kept; holding the future would keep its image data
+                            image.add_done_callback(
+                                lambda done: not done.cancelled() and isinstance(done.exception(), DeadlineExceeded) and skipped.add(index)
+                            )
+                            saved.append(self._save_when_done(image, filepath, deadline, sink))
+                            if events is not None:
+                                saved[-1].add_done_callback(
+                                    lambda done: not done.cancelled() and done.result() and events(
+                                        "slide", self.viewer_slide(index + 1, done.result(), slide, sink)
+                                    )
+                                )
+
+                        slides_plan, prompts = self.plan_deck(
+                            content=content,
+                            page_count=page_count,
+                            style=style,
+                            resolution=resolution,
+                            output_dir=output_dir,
+                            on_prompt=on_prompt,
+                            sink=sink
+                        )
+                        if events is not None:
+                            events("plan", {"title": slides_plan["title"], "total_slides": len(slides_plan["slides"])})
+
+                        print(f"\n[IMAGE] Waiting for {len(saved)} images...")
+                        with span("images", slides=len(prompts)):
+                            wait(saved, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+                            # Images already handed to the writer arrived in time: let them
+                            # land before assembly closes the sink. The rest are cancelled,
+                            # so late images are dropped instead of written behind the viewer
+                            wait([f for f in saved if not f.done() and not f.cancel()])
+                            paths = [None if f.cancelled() else f.result() for f in saved]
+                            slide_status = self._slide_status(saved, paths, skipped)
+
+                    image_paths = [path for path in paths if path]
+                    print(f"[IMAGE] {len(image_paths)}/{len(paths)} images succeeded")
+                    if len(image_paths) < len(paths) and deadline is not None:
+                        print(f"[DEADLINE] Delivering partial deck: {len(image_paths)}/{len(paths)} slides")
+
+                    result = self.assemble_deck(
+                        content=content,
+                        page_count=page_count,
+                        style=style,
+                        resolution=resolution,
+                        output_dir=output_dir,
+                        slides_plan=slides_plan,
+                        image_paths=image_paths,
+                        failed_slides=[i + 1 for i, path in enumerate(paths) if not path],
+                        draft_of=draft_of,
+                        slide_status=slide_status,
+                        deadline=deadline,
+                        sink=sink
+                    )
+                    if events is not None:
+                        self._publish_complete(events, result, slides_plan, sink)
+
+            if self.export_trace:
+                result["trace_path"] = sink.write_json("trace.json", tracer.to_chrome_trace(), indent=None)
+                print(f"[TRACE] {result['trace_path']}")
+
+            if profiler is not None:
+                result["profile_paths"] = profiler.write(sink)
+                print(f"[PROFILE] {result['profile_paths']['summary']}")
+
+            outcome = "success"
+            return result
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            sink.close()
+            DECK_DURATION.observe(time.perf_counter() - start, mode=mode)
+            DECKS.inc(mode=mode, outcome=outcome)
+            REGISTRY.flush()
+
+    @contextmanager
+    def _slide_submitter(self, image_backend: Any, resolution: str, style: str, deadline: Optional[float] = None):
+        """
+        Per-slide submission into an image backend
+
+        Backends with submit() (GenerationScheduler) take slides directly,
+        along with the deck deadline. Others (ImageGenerationChain) get a
+        single worker per deck, so slides keep their one-at-a-time order but
+        start while planning continues.
+
+        Yields:
+            submit(index, prompt) -> Future of base64 image data
+        """
+        if hasattr(image_backend, "submit"):
+            yield lambda index, prompt: image_backend.submit(
+                prompt, resolution=resolution, style=style, slide=index + 1, deadline=deadline
+            )
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deck-images")
+        try:
+            yield lambda index, prompt: executor.submit(
+                contextvars.copy_context().run,
+                image_backend.generate_single_image,
+                prompt, resolution=resolution, style=style, slide=index + 1
+            )
+        finally:
+            executor.shutdown(wait=True)
+
+    def _save_when_done(
+        self,
+        image_future: Future,
+        filepath: str,
+        deadline: Optional[float] = None,
+        sink: Optional[OutputSink] = None
+    ) -> Future:
+        """
+        Hand an image to the background writer as soon as it is generated
+
+        Runs in the thread that completes the image, so a full writer queue
+        blocks that provider worker (backpressure) instead of piling up
+        images in memory. Images that arrive after the deadline, or after
+        the caller cancelled the returned future, are dropped, so a
+        delivered partial deck is not changed behind its viewer. Once an
+        image is accepted the future is running and can no longer be
+        cancelled; the caller waits for it instead.
+
+        Returns:
+            Future of the saved path, or None if generation or saving failed
+        """
+        saved = Future()
+        # Callbacks run outside the deck's context; writes still belong to its trace
+        context = contextvars.copy_context()
+
+        def on_written(write: Future) -> None:
+            error = write.exception()
+            if error is not None:
+                print(f"[SAVE] {filepath} failed: {str(error)}")
+            saved.set_result(None if error is not None else write.result())
 
-        # 1. Create output directory
-        if output_dir is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = f"outputs/{timestamp}"
+        def on_image(done: Future) -> None:
+            # Claim the slot; fails once the deck stopped waiting for this slide
+            if not saved.set_running_or_notify_cancel():
+                return
+            try:
+                image_data = None if done.cancelled() else done.result()
+                if not image_data or (deadline is not None and time.monotonic() > deadline):
+                    saved.set_result(None)
+                    return
+                write = self.image_writer.submit(
+                    image_data, filepath, context=context, sink=sink,
+                    inspect=self.transition_analyzer.observe if self.transition_analyzer else None
+                )
+                del image_data
+                write.add_done_callback(on_written)
+            except DeadlineExceeded:
+                saved.set_result(None)
+            except Exception as e:
+                print(f"[SAVE] {filepath} failed: {str(e)}")
+                if not saved.done():
+                    saved.set_result(None)
 
-        os.makedirs(output_dir, exist_ok=True)
-        images_dir = os.path.join(output_dir, "images")
-        os.makedirs(images_dir, exist_ok=True)
+        image_future.add_done_callback(on_image)
+        return saved
 
-        # 2. Generate content plan
+    def _publish_complete(
+        self,
+        events: Callable[[str, Dict[str, Any]], None],
+        result: Dict[str, Any],
+        slides_plan: Dict[str, Any],
+        sink: OutputSink
+    ) -> None:
+        """Send placeholders for missing slides, then the completion event"""
+        for status in result["slide_status"]:
+            if status["status"] != "done":
+                slide = slides_plan["slides"][status["number"] - 1]
+                events("slide", self.viewer_slide(status["number"], None, slide, sink, status["status"]))
+        events("complete", {"viewer": "viewer.html", "partial": result["partial"]})
+
+    def _preview_events(self, output_dir: str) -> Optional[Callable[[str, Dict[str, Any]], None]]:
+        """Live preview sink if the preview server is showing output_dir"""
+        server = self.preview_server
+        if server is not None and server.output_dir == os.path.abspath(output_dir):
+            return server.publish
+        return None
+
+    @staticmethod
+    def _slide_status(
+        saved: List[Future],
+        paths: List[Optional[str]],
+        skipped: set
+    ) -> List[Dict[str, Any]]:
+        """
+        Per-slide outcome of a deck's image stage
+
+        Statuses: "done" (image saved), "failed" (every provider failed),
+        "skipped" (no provider could finish before the deadline, so none was
+        tried), "timeout" (still running when the deadline hit, so its save
+        was cancelled).
+
+        Args:
+            saved: Save futures from _save_when_done, in slide order
+            paths: Saved paths (None where missing)
+            skipped: 0-based indexes of slides that failed with DeadlineExceeded
+        """
+        status = []
+        for i, (save, path) in enumerate(zip(saved, paths)):
+            if path:
+                state = "done"
+            elif save.cancelled():
+                state = "timeout"
+            elif i in skipped:
+                state = "skipped"
+            else:
+                state = "failed"
+            status.append({"number": i + 1, "status": state, "image": path})
+        return status
+
+    def plan_deck(
+        self,
+        content: str,
+        page_count: int,
+        style: str,
+        resolution: str,
+        output_dir: str,
+        on_prompt: Optional[Callable[[int, Dict[str, Any], str], None]] = None,
+        sink: Optional[OutputSink] = None
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Plan a deck and build its image prompts (steps 1-4)
+
+        The plan is streamed: each slide's prompt is built as soon as the
+        slide is planned and handed to on_prompt, so image generation can
+        start before planning finishes. Writes slides_plan.json and
+        prompts.json into the sink (default: output_dir).
+
+        Args:
+            content: Document content or topic
+            page_count: Number of pages
+            style: Style name
+            resolution: Resolution (2K/4K)
+            output_dir: Output directory
+            on_prompt: Optional callback (index, slide, prompt) per planned slide
+            sink: Artifact destination (default: DirectorySink(output_dir))
+
+        Returns:
+            (slides_plan, prompts)
+        """
+        # 1. Output destination (directories are created on first write)
+        sink = sink or DirectorySink(output_dir)
+
+        # 2. Load style (before planning, so prompts can be built per slide)
+        print(f"\n[STYLE] Loading style: {style}")
+        with span("style", style=style):
+            style_config = self.style_manager.load_style(style)
+            templates = self.prompt_generator.compile_templates(style_config)
+
+        # 3. Generate content plan, building each prompt as its slide arrives
         print(f"\n[PLAN] Generating content plan...")
-        slides_plan = self._generate_slides_plan(content, page_count)
+        prompts: List[str] = []
+
+        def on_slide(index: int, slide: Dict[str, Any]) -> None:
+            prompt = self.prompt_generator.render_slide(slide, templates, resolution)
+            prompts.append(prompt)
+            if on_prompt:
+                on_prompt(index, slide, prompt)
+
+        with span("plan"):
+            slides_plan = self._generate_slides_plan(content, page_count, on_slide=on_slide)
+
+        # Planners that do not stream leave the remaining slides to us
+        for index, slide in enumerate(slides_plan["slides"][len(prompts):], len(prompts)):
+            on_slide(index, slide)
 
         # Save plan
-        plan_path = os.path.join(output_dir, "slides_plan.json")
-        with open(plan_path, 'w', encoding='utf-8') as f:
-            json.dump(slides_plan, f, ensure_ascii=False, indent=2)
+        sink.write_json("slides_plan.json", slides_plan)
 
-        # 3. Load style
-        print(f"\n[STYLE] Loading style: {style}")
-        style_config = self.style_manager.load_style(style)
-
-        # 4. Generate image prompts
-        print(f"\n[PROMPT] Generating image prompts...")
-        prompts = self.prompt_generator.generate_prompts(
-            slides_plan=slides_plan,
-            style_config=style_config,
-            resolution=resolution
-        )
+        # 4. Image prompts
+        print(f"\n[PROMPT] Built {len(prompts)} image prompts")
+        with span("prompts") as prompt_stats:
+            # Compaction report for the primary provider
+            available_clients = self.generation_chain.get_available_clients()
+            if available_clients:
+                sizes = ImagePromptBuilder.size_report(
+                    prompts, available_clients[0], resolution=resolution, style=style
+                )
+                prompt_stats.update(provider=available_clients[0], chars_before=sizes["before"], chars_after=sizes["after"])
+                print(f"       Prompt size ({available_clients[0]}): {sizes['before']} -> {sizes['after']} chars")
 
         # Save prompts
-        prompts_path = os.path.join(output_dir, "prompts.json")
-        with open(prompts_path, 'w', encoding='utf-8') as f:
-            json.dump(prompts, f, ensure_ascii=False, indent=2)
-
-        # 5. Generate images with fallback chain
-        print(f"\n[IMAGE] Generating images...")
-        available_clients = self.generation_chain.get_available_clients()
-        print(f"       Strategy: {' -> '.join(available_clients)}")
-
-        images = self.generation_chain.generate_images(
-            prompts=prompts,
-            resolution=resolution,
-            style=style
-        )
+        sink.write_json("prompts.json", prompts)
+
+        return slides_plan, prompts
+
+    def assemble_deck(
+        self,
+        content: str,
+        page_count: int,
+        style: str,
+        resolution: str,
+        output_dir: str,
+        slides_plan: Dict[str, Any],
+        image_paths: List[str],
+        failed_slides: Optional[List[int]] = None,
+        draft_of: Optional[str] = None,
+        slide_status: Optional[List[Dict[str, Any]]] = None,
+        deadline: Optional[float] = None,
+        sink: Optional[OutputSink] = None
+    ) -> Dict[str, Any]:
+        """
+        Finish a deck once its images are saved (steps 6-9)
+
+        Generates transitions, the viewer and generation_log.json. Drafts
+        skip transitions; they are generated when the draft is finalized.
+        Slides without an image get a marked placeholder in the viewer.
 
-        # Save images
-        image_paths = []
-        for i, image_data in enumerate(images):
-            if image_data:
-                filename = f"slide_{i+1:02d}_{slides_plan['slides'][i]['page_type']}.png"
-                filepath = os.path.join(images_dir, filename)
-                save_base64_image(image_data, filepath)
-                image_paths.append(filepath)
+        Args:
+            content: Document content or topic
+            page_count: Number of pages
+            style: Style name
+            resolution: Resolution (2K/4K)
+            output_dir: Output directory
+            slides_plan: Content plan from plan_deck
+            image_paths: Saved slide images in slide order
+            failed_slides: 1-based numbers of slides without an image
+            draft_of: Target resolution when the images are a draft
+            slide_status: Per-slide status from the image stage (default:
+                          "done", or "failed" for failed_slides)
+            deadline: Optional time.monotonic() after which no further
+                      transitions are requested
+            sink: Artifact destination (default: DirectorySink(output_dir))
+
+        Returns:
+            Generation result info
+        """
+        sink = sink or DirectorySink(output_dir)
+        if slide_status is None:
+            failed = set(failed_slides or [])
+            paths = iter(image_paths)
+            slide_status = [
+                {"number": n, "status": "failed", "image": None} if n in failed
+                else {"number": n, "status": "done", "image": next(paths, None)}
+                for n in range(1, len(slides_plan["slides"]) + 1)
+            ]
+        missing = {s["number"]: s["status"] for s in slide_status if s["status"] != "done"}
 
         # 6. Generate transitions (optional)
         transitions = []
-        if self.glm_client.client:
+        if self._transitions_enabled() and not draft_of:
             print(f"\n[TRANSITION] Generating transition descriptions...")
-            transitions = self._generate_transitions(image_paths, style)
+            with span("transitions", count=max(0, len(image_paths) - 1)):
+                transitions = self._generate_transitions(
+                    image_paths, style, deadline,
+                    slides=self._image_slides(image_paths, slide_status, slides_plan),
+                    numbers=self._image_numbers(image_paths, slide_status)
+                )
 
         # 7. Generate viewer
         print(f"\n[VIEWER] Generating viewer...")
-        viewer_html = self._generate_viewer(
-            image_paths=image_paths,
-            slides_plan=slides_plan,
-            output_dir=output_dir
-        )
-
-        viewer_path = os.path.join(output_dir, "viewer.html")
-        with open(viewer_path, 'w', encoding='utf-8') as f:
-            f.write(viewer_html)
+        with span("viewer"):
+            viewer_html = self._generate_viewer(
+                image_paths=image_paths,
+                slides_plan=slides_plan,
+                output_dir=output_dir,
+                placeholders=missing,
+                sink=sink
+            )
+            viewer_path = sink.write_text("viewer.html", viewer_html)
 
         # 8. Generate log
         log = {
             "timestamp": datetime.now().isoformat(),
-            "content": content,
+            **content_reference(content),
             "page_count": page_count,
             "style": style,
             "resolution": resolution,
             "slides": slides_plan,
             "images": image_paths,
+            "slide_status": slide_status,
             "transitions": transitions
         }
+        if draft_of:
+            log["draft"] = {"target_resolution": draft_of, "finalized_slides": []}
+
+        # Stage timings of everything traced so far in this deck
+        tracer = current_tracer()
+        if tracer is not None:
+            log["stages"] = tracer.stage_summary()
 
-        log_path = os.path.join(output_dir, "generation_log.json")
-        with open(log_path, 'w', encoding='utf-8') as f:
-            json.dump(log, f, ensure_ascii=False, indent=2)
+        sink.write_json("generation_log.json", log)
 
         # 9. Return result
         result = {
@@ -173,26 +884,173 @@ class PPTGenerator:
             "style": style,
             "resolution": resolution,
             "images": image_paths,
+            "failed_slides": failed_slides or [],
+            "slide_status": slide_status,
+            "partial": bool(missing),
             "viewer_path": viewer_path,
-            "plan_path": plan_path
+            "plan_path": sink.path("slides_plan.json")
         }
+        if draft_of:
+            result.update(draft=True, target_resolution=draft_of)
 
         print(f"\n[OK] Generation complete!")
         print(f"[DIR] Output: {output_dir}")
-        print(f"[COUNT] Pages: {len(image_paths)}")
+        print(f"[COUNT] Pages: {len(image_paths)}" + (f" ({len(missing)} placeholders)" if missing else ""))
         print(f"[STYLE] {style}")
         print(f"[RES] {resolution}")
         print(f"\n[VIEW] Open in browser: {viewer_path}")
+        if draft_of:
+            print(f"[DRAFT] Finalize at {draft_of} with finalize_draft('{output_dir}')")
 
         return result
 
+    def _finalize_draft(self, output_dir: str, slides: Optional[List[int]]) -> Dict[str, Any]:
+        """Finalize pass body (see finalize_draft)"""
+        sink = DirectorySink(output_dir)
+        log = sink.read_json("generation_log.json")
+        if "draft" not in log:
+            raise ValueError(f"{output_dir} is not a draft deck")
 
+        slides_plan = log["slides"]
+        style = log["style"]
+        target = log["draft"]["target_resolution"]
+        total = len(slides_plan["slides"])
+        numbers = sorted({n for n in (slides or range(1, total + 1)) if 1 <= n <= total})
+        print(f"\n[DRAFT] Finalizing {len(numbers)}/{total} slides at {target}: {output_dir}")
+
+        events = self._preview_events(output_dir)
+        tracer = Tracer(output_dir)
+        with use_tracer(tracer):
+            with span("finalize", slides=len(numbers), resolution=target):
+                style_config = self.style_manager.load_style(style)
+                templates = self.prompt_generator.compile_templates(style_config)
+
+                prompts = sink.read_json("prompts.json")
+
+                # Same file names as the draft, so files are replaced in place
+                saved = {}
+                for number in numbers:
+                    slide = slides_plan["slides"][number - 1]
+                    prompt = self.prompt_generator.render_slide(slide, templates, target)
+                    prompts[number - 1] = prompt
+                    filepath = sink.path(self.image_name(number - 1, slide.get("page_type", "content")))
+                    image = self.scheduler.submit(prompt, resolution=target, style=style, slide=number)
+                    saved[number] = self._save_when_done(image, filepath, sink=sink)
+                    if events is not None:
+                        saved[number].add_done_callback(
+                            lambda done, number=number, slide=slide: done.result() and events(
+                                "slide", self.viewer_slide(number, done.result(), slide, sink)
+                            )
+                        )
+
+                with span("images", slides=len(saved)):
+                    upgraded = [n for n, f in saved.items() if f.result()]
+
+                sink.write_json("prompts.json", prompts)
+
+                finalized = sorted(set(log["draft"]["finalized_slides"]) | set(upgraded))
+                image_paths, failed_slides, slide_status = [], [], []
+                for i, slide in enumerate(slides_plan["slides"]):
+                    name = self.image_name(i, slide.get("page_type", "content"))
+                    path = sink.path(name)
+                    if sink.exists(name):
+                        image_paths.append(path)
+                        slide_status.append({"number": i + 1, "status": "done", "image": path})
+                    else:
+                        failed_slides.append(i + 1)
+                        slide_status.append({"number": i + 1, "status": "failed", "image": None})
+
+                done = len(finalized) == total
+                if done:
+                    log.pop("draft")
+                    log["resolution"] = target
+                    log["finalized_at"] = datetime.now().isoformat()
+                    if self._transitions_enabled():
+                        with span("transitions", count=max(0, len(image_paths) - 1)):
+                            log["transitions"] = self._generate_transitions(
+                                image_paths, style,
+                                slides=self._image_slides(image_paths, slide_status, slides_plan),
+                                numbers=self._image_numbers(image_paths, slide_status)
+                            )
+                else:
+                    log["draft"]["finalized_slides"] = finalized
+                log["images"] = image_paths
+                log["slide_status"] = slide_status
+
+                with span("viewer"):
+                    placeholders = {n: "failed" for n in failed_slides}
+                    viewer_path = sink.write_text(
+                        "viewer.html", self._generate_viewer(image_paths, slides_plan, output_dir, placeholders, sink)
+                    )
+
+                sink.write_json("generation_log.json", log)
+
+        failed = [n for n in numbers if n not in upgraded]
+        print(f"[DRAFT] {len(upgraded)}/{len(numbers)} slides upgraded to {target}"
+              + (f", failed: {failed}" if failed else ""))
+
+        result = {
+            "success": True,
+            "output_dir": output_dir,
+            "page_count": len(image_paths),
+            "style": style,
+            "resolution": log["resolution"],
+            "images": image_paths,
+            "failed_slides": failed_slides,
+            "slide_status": slide_status,
+            "partial": bool(failed_slides),
+            "viewer_path": viewer_path,
+            "plan_path": sink.path("slides_plan.json"),
+            "finalized_slides": finalized,
+            "draft": not done
+        }
+        if not done:
+            result["target_resolution"] = target
+        return result
+
+    @staticmethod
+    def slide_image_path(output_dir: str, index: int, slides_plan: Dict[str, Any]) -> str:
+        """Image file path for the slide at a 0-based index"""
+        return PPTGenerator.image_path(output_dir, index, slides_plan['slides'][index]['page_type'])
+
+    @staticmethod
+    def image_path(output_dir: str, index: int, page_type: str) -> str:
+        """Image file path for a 0-based slide index and page type"""
+        return os.path.join(output_dir, *PPTGenerator.image_name(index, page_type).split("/"))
+
+    @staticmethod
+    def image_name(index: int, page_type: str) -> str:
+        """Image artifact name (relative to the deck root) for a 0-based slide index"""
+        return f"images/slide_{index+1:02d}_{page_type}.png"
+
+    def _generate_slides_plan(
+        self,
+        content: str,
+        page_count: int,
+        on_slide: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Generate content plan, passing each slide to on_slide as it is planned"""
+        # Long documents are planned from section summaries, large decks
+        # from an outline whose sections are expanded in parallel
+        plan = None
+        if len(content) > PlanningConfig.CHUNK_THRESHOLD:
+            plan = DocumentPlanner(self.glm_client).plan(content, page_count, on_slide=on_slide)
+        elif page_count > PlanningConfig.OUTLINE_THRESHOLD and self.glm_client.client:
+            plan = OutlinePlanner(self.glm_client).plan(content, page_count, on_slide=on_slide)
+
+        if plan is not None:
+            slides_plan = {
+                "title": plan.get("title", content[:50]),
+                "total_slides": len(plan.get("slides", [])),
+                "slides": plan.get("slides", [])
+            }
+            if plan.get("sections"):
+                slides_plan["sections"] = plan["sections"]
+            return slides_plan
 
-    def _generate_slides_plan(self, content: str, page_count: int) -> Dict[str, Any]:
-        """Generate content plan"""
         # Use GLM to generate plan, or use default plan
         if self.glm_client.client:
-            plan = self.glm_client.generate_slide_plan(content, page_count)
+            plan = self.glm_client.generate_slide_plan(content, page_count, on_slide=on_slide)
             return {
                 "title": plan.get("title", content[:50]),
                 "total_slides": len(plan.get("slides", [])),
@@ -206,35 +1064,172 @@ class PPTGenerator:
                 slides.append({"page_type": "content", "content": f"Point {i+1} about {content}"})
             slides.append({"page_type": "summary", "content": f"{content} Summary"})
 
+            if on_slide:
+                for i, slide in enumerate(slides):
+                    on_slide(i, slide)
+
             return {
                 "title": content[:50],
                 "total_slides": page_count,
                 "slides": slides
             }
 
+    def _transitions_enabled(self) -> bool:
+        """Whether a transition engine is available (local analyzer or GLM)"""
+        return self.transition_analyzer is not None or bool(self.glm_client.client)
+
     def _generate_transitions(
         self,
         image_paths: List[str],
-        style: str
+        style: str,
+        deadline: Optional[float] = None,
+        slides: Optional[List[Dict[str, Any]]] = None,
+        numbers: Optional[List[int]] = None
     ) -> List[Dict[str, Any]]:
-        """Generate transition descriptions"""
+        """
+        Generate one transition per pair of consecutive images
+
+        The local engine analyzes the images. The LLM engine sends the whole
+        sequence in one request per TransitionConfig.BATCH_SIZE slides
+        (consecutive batches share a slide), with the batches in parallel;
+        batches unfinished at the deadline are dropped with everything after
+        them.
+
+        Args:
+            image_paths: Saved slide images in slide order
+            style: Style name
+            deadline: Optional time.monotonic() after which no further
+                      transitions are requested
+            slides: Plan slide of each image (prompt content for the LLM)
+            numbers: Deck slide number of each image (default: 1, 2, ...;
+                     slides without an image leave gaps)
+
+        Returns:
+            Transitions in order (fewer when the deadline cut them short)
+        """
+        count = len(image_paths) - 1
+        if count <= 0:
+            return []
+        if self.transition_analyzer is not None and (self.transition_engine == "local" or not self.glm_client.client):
+            # Local analysis takes milliseconds per pair; no deadline check needed
+            return self.transition_analyzer.transitions(image_paths)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            print(f"[DEADLINE] Skipping {count} transitions")
+            return []
+        slides = slides or [{} for _ in image_paths]
+        numbers = numbers or list(range(1, len(image_paths) + 1))
+        descriptors = None
+        if self.transition_analyzer is not None:
+            descriptors = [self.transition_analyzer.describe(path) for path in image_paths]
+
+        size = max(2, TransitionConfig.BATCH_SIZE)
+        starts = list(range(0, count, size - 1))
+
+        def request(start: int) -> List[Dict[str, Any]]:
+            end = min(start + size, len(image_paths))
+            with span("transition", cat="provider", provider="GLM", slide=numbers[start], pairs=end - start - 1):
+                return self.glm_client.generate_transitions(
+                    slides[start:end],
+                    style=style,
+                    descriptors=descriptors[start:end] if descriptors else None,
+                    numbers=numbers[start:end]
+                )
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(len(starts), TransitionConfig.MAX_PARALLEL_BATCHES),
+            thread_name_prefix="transitions"
+        )
+        try:
+            batches = [executor.submit(contextvars.copy_context().run, request, start) for start in starts]
+            wait(batches, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
         transitions = []
-        for i in range(len(image_paths) - 1):
-            transition = self.glm_client.generate_transition(
-                from_image=image_paths[i],
-                to_image=image_paths[i + 1],
-                style=style
-            )
-            transitions.append(transition)
+        for batch in batches:
+            if not batch.done() or batch.cancelled():
+                print(f"[DEADLINE] Skipping {count - len(transitions)} transitions")
+                break
+            transitions.extend(batch.result())
         return transitions
 
+    @staticmethod
+    def _image_slides(
+        image_paths: List[str],
+        slide_status: List[Dict[str, Any]],
+        slides_plan: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Plan slide of each saved image (slides without an image are skipped)"""
+        by_image = {
+            s["image"]: slides_plan["slides"][s["number"] - 1]
+            for s in slide_status if s["status"] == "done"
+        }
+        return [by_image.get(path, {}) for path in image_paths]
+
+    @staticmethod
+    def _image_numbers(image_paths: List[str], slide_status: List[Dict[str, Any]]) -> List[int]:
+        """Deck slide number of each saved image"""
+        by_image = {s["image"]: s["number"] for s in slide_status if s["status"] == "done"}
+        return [by_image.get(path, i + 1) for i, path in enumerate(image_paths)]
+
+    @staticmethod
+    def viewer_slide(
+        number: int,
+        path: Optional[str],
+        slide_info: Dict[str, Any],
+        sink: OutputSink,
+        status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Viewer entry for one slide (also the payload of live "slide" events)
+
+        Args:
+            number: 1-based slide number
+            path: Saved image, or None for a placeholder
+            slide_info: Slide from the content plan
+            sink: Deck output (image paths become relative to its root)
+            status: Placeholder status when path is None
+
+        Returns:
+            {number, image, type, content} plus status for placeholders
+        """
+        slide_data = {
+            "number": number,
+            "image": None,
+            "type": slide_info.get('page_type', 'content'),
+            "content": slide_info.get('content', '')
+        }
+        if path:
+            name = sink.name_of(path)
+            version = sink.version(name)
+            # Cache-bust, so a reload picks up images replaced in place
+            slide_data["image"] = f"{name}?v={version}" if version else name
+        else:
+            slide_data["status"] = status or "failed"
+        return slide_data
+
     def _generate_viewer(
         self,
         image_paths: List[str],
         slides_plan: Dict[str, Any],
-        output_dir: str
+        output_dir: str,
+        placeholders: Optional[Dict[int, str]] = None,
+        sink: Optional[OutputSink] = None
     ) -> str:
-        """Generate viewer HTML"""
+        """
+        Generate viewer HTML
+
+        Args:
+            image_paths: Saved slide images in slide order
+            slides_plan: Content plan
+            output_dir: Output directory (image paths become relative to it)
+            placeholders: Slide number -> status for planned slides without an
+                          image; they are shown as marked placeholders
+            sink: Deck output (default: DirectorySink(output_dir))
+        """
+        sink = sink or DirectorySink(output_dir)
+
         # Read template
         template_path = os.path.join(
             os.path.dirname(__file__),
@@ -246,18 +1241,26 @@ class PPTGenerator:
 
         # Build slide data
         slides_data = []
-        for i, path in enumerate(image_paths):
-            rel_path = os.path.relpath(path, output_dir)
-            slide_info = slides_plan['slides'][i] if i < len(slides_plan['slides']) else {}
-            slides_data.append({
-                "number": i + 1,
-                "image": rel_path,
-                "type": slide_info.get('page_type', 'content'),
-                "content": slide_info.get('content', '')
-            })
+        if placeholders:
+            # One entry per planned slide, so images stay with their slide
+            paths = iter(image_paths)
+            entries = [
+                (None if i + 1 in placeholders else next(paths, None), slide)
+                for i, slide in enumerate(slides_plan['slides'])
+            ]
+        else:
+            entries = [
+                (path, slides_plan['slides'][i] if i < len(slides_plan['slides']) else {})
+                for i, path in enumerate(image_paths)
+            ]
+
+        for i, (path, slide_info) in enumerate(entries):
+            status = None if path else placeholders.get(i + 1, "failed")
+            slides_data.append(self.viewer_slide(i + 1, path, slide_info, sink, status))
 
         # Replace template variables
-        html = template.replace("{{SLIDES_DATA}}", json.dumps(slides_data))
+        html = template.replace("{{LIVE}}", "false")
+        html = html.replace("{{SLIDES_DATA}}", json.dumps(slides_data))
         html = html.replace("{{TOTAL_SLIDES}}", str(len(slides_data)))
         html = html.replace("{{TITLE}}", slides_plan.get('title', 'Presentation'))
 
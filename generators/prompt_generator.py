@@ -6,6 +6,8 @@ Prompt Generator - 提示词生成器
 import os
 from typing import List, Dict, Any
 
+from core.style_manager import CompiledTemplate
+
 
 class PromptGenerator:
     """提示词生成器"""
@@ -34,43 +36,66 @@ class PromptGenerator:
         Returns:
             提示词列表
         """
-        prompts = []
+        templates = self.compile_templates(style_config)
 
-        for slide in slides_plan.get('slides', []):
-            page_type = slide.get('page_type', 'content')
-            content = slide.get('content', '')
+        # 单次遍历渲染整份演示文稿
+        return [
+            self.render_slide(slide, templates, resolution)
+            for slide in slides_plan.get('slides', [])
+        ]
 
-            prompt = self._generate_single_prompt(
-                page_type=page_type,
-                content=content,
-                style_config=style_config,
-                resolution=resolution
-            )
+    @staticmethod
+    def compile_templates(style_config: Dict[str, Any]) -> Dict[str, CompiledTemplate]:
+        """
+        取得风格的已编译模板 (字符串模板在此编译)
 
-            prompts.append(prompt)
+        Args:
+            style_config: 风格配置
 
-        return prompts
+        Returns:
+            {页面类型: CompiledTemplate}
+        """
+        return {
+            page_type: template if isinstance(template, CompiledTemplate) else CompiledTemplate(template)
+            for page_type, template in style_config.get('templates', {}).items()
+        }
 
-    def _generate_single_prompt(
+    def render_slide(
         self,
-        page_type: str,
-        content: str,
-        style_config: Dict[str, Any],
-        resolution: str
+        slide: Dict[str, Any],
+        templates: Dict[str, CompiledTemplate],
+        resolution: str = "2K"
     ) -> str:
-        """生成单个页面的提示词"""
-        # 获取风格模板
-        template = style_config.get('templates', {}).get(page_type)
+        """
+        生成单页提示词 (用于流式规划时逐页生成)
 
-        if template:
-            # 使用风格模板
-            prompt = template.replace("{content}", content)
-            prompt = prompt.replace("{resolution}", resolution)
-        else:
-            # 使用默认模板
-            prompt = self._default_prompt(page_type, content, resolution)
+        Args:
+            slide: 单页规划
+            templates: compile_templates 的结果
+            resolution: 分辨率
 
-        return prompt
+        Returns:
+            提示词
+        """
+        page_type = slide.get('page_type', 'content')
+        content = slide.get('content', '')
+        template = templates.get(page_type)
+
+        if template:
+            return template.render(self._template_values(slide, content, resolution))
+        return self._default_prompt(page_type, content, resolution)
+
+    @staticmethod
+    def _template_values(slide: Dict[str, Any], content: str, resolution: str) -> Dict[str, str]:
+        """风格模板占位符取值"""
+        return {
+            "content": content,
+            "title": slide.get('title') or content,
+            "subtitle": slide.get('subtitle', ''),
+            "data_content": content,
+            "summary_content": content,
+            "resolution": resolution
+        }
 
     def _default_prompt(self, page_type: str, content: str, resolution: str) -> str:
         """默认提示词模板"""
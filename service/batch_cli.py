@@ -0,0 +1,233 @@
+"""
+Batch CLI - Streams deck jobs from JSONL through the generator
+Reads jobs lazily, runs decks in parallel, appends one result line per finished deck and resumes after interruption
+
+Input (a file, or - for stdin), one job per line:
+    {"content": "人工智能的未来", "page_count": 8, "style": "gradient-glass", "resolution": "2K"}
+    {"id": "topic-42", "content": "...", "deadline": 300}
+
+Run:
+    python -m service.batch_cli jobs.jsonl --results results.jsonl --parallel 8
+    cat jobs.jsonl | python -m service.batch_cli - --results results.jsonl
+
+Running the same command again resumes: jobs already in the results file
+are skipped. Jobs without an "id" are keyed by line number and line
+content, so the input must not change between runs for them to match.
+Each job writes to <output-root>/<id>. Ctrl-C (or SIGTERM) stops reading
+jobs and waits for running decks; a second Ctrl-C aborts: queued slides are
+cancelled and running decks are not recorded, so they run again on resume.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, Optional, Set, Tuple
+
+from core.config import OutputConfig, SchedulerConfig
+
+# Keys of an input line passed on to the generator
+JOB_KEYS = ("content", "page_count", "style", "resolution", "output_dir", "deadline")
+
+
+def job_id(job: Dict[str, Any], line_no: int, raw: str) -> str:
+    """Explicit job id, else line number plus a hash of the line"""
+    if job.get("id") not in (None, ""):
+        return str(job["id"])
+    return f"L{line_no}-{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12]}"
+
+
+def output_name(key: str) -> str:
+    """Directory name for a job id"""
+    name = re.sub(r"[^\w.-]+", "_", key).strip("._")
+    if name != key:
+        # Keep distinct ids apart after sanitizing
+        name = f"{name[:100]}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]}"
+    return name
+
+
+def read_finished(path: str, retry_failed: bool = False) -> Set[str]:
+    """
+    Ids of jobs recorded in a results file
+
+    A trailing line without a newline was cut off mid-write; it is removed
+    so appended results start on a fresh line.
+
+    Args:
+        path: Results file (missing is fine)
+        retry_failed: Leave failed jobs out, so they run again
+
+    Returns:
+        Set of job ids
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            print(f"[BATCH] Dropped incomplete last line of {path}")
+
+    finished = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "id" in record and (record.get("success") or not retry_failed):
+                finished.add(record["id"])
+    return finished
+
+
+class BatchRun:
+    """One pass over a job stream, appending results as decks finish"""
+
+    def __init__(self, results: IO[str], output_root: str, finished: Set[str]):
+        """
+        Initialize run
+
+        Args:
+            results: Results file opened for appending
+            output_root: Default parent directory of job outputs
+            finished: Ids to skip
+        """
+        self.results = results
+        self.output_root = output_root
+        self.finished = finished
+        # id -> (input line, start time) of jobs handed to the generator
+        self.pending: Dict[str, Tuple[int, float]] = {}
+        self.counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    def jobs(self, lines: IO[str], limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parse input lines lazily into generator jobs
+
+        Blank lines and lines starting with # are ignored. Lines that are not
+        a JSON object are recorded as failed results right away.
+
+        Args:
+            lines: Input stream
+            limit: Stop after handing out this many jobs
+        """
+        handed = 0
+        for line_no, line in enumerate(lines, 1):
+            raw = line.strip()
+            if not raw or raw.startswith("#"):
+                continue
+            if limit is not None and handed >= limit:
+                return
+
+            try:
+                job = json.loads(raw)
+                if not isinstance(job, dict):
+                    raise ValueError("a job must be a JSON object")
+            except ValueError as e:
+                key = job_id({}, line_no, raw)
+                if key not in self.finished:
+                    self.record({"id": key, "line": line_no, "success": False, "error": f"Invalid job: {str(e)}"})
+                continue
+
+            key = job_id(job, line_no, raw)
+            if key in self.finished or key in self.pending:
+                self.counts["skipped"] += 1
+                continue
+
+            self.pending[key] = (line_no, time.monotonic())
+            handed += 1
+            yield {
+                **{k: job[k] for k in JOB_KEYS if k in job},
+                "id": key,
+                "output_dir": job.get("output_dir") or os.path.join(self.output_root, output_name(key)),
+            }
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """Record a deck result from the generator"""
+        key = result.pop("job_id")
+        result.pop("job_index", None)
+        line_no, start = self.pending.pop(key)
+        self.record({"id": key, "line": line_no, "elapsed_s": round(time.monotonic() - start, 2), **result})
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Append one result line and flush it"""
+        record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        self.results.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.results.flush()
+        self.finished.add(record["id"])
+        self.counts["succeeded" if record.get("success") else "failed"] += 1
+        print(f"[BATCH] {record['id']}: {'ok' if record.get('success') else 'failed: ' + str(record.get('error'))}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate decks from a JSONL job stream")
+    parser.add_argument("input", help="JSONL job file, or - for stdin")
+    parser.add_argument("--results", required=True, help="JSONL results file (appended; enables resume)")
+    parser.add_argument("--parallel", type=int, default=SchedulerConfig.MAX_PARALLEL_DECKS, help="Decks in flight at once")
+    parser.add_argument("--output-root", default=OutputConfig.BATCH_ROOT, help="Parent directory of job outputs")
+    parser.add_argument("--retry-failed", action="store_true", help="Run jobs recorded as failed again")
+    parser.add_argument("--limit", type=int, help="Process at most this many jobs")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    from generators.ppt_generator import PPTGenerator
+
+    finished = read_finished(args.results, retry_failed=args.retry_failed)
+    if finished:
+        print(f"[BATCH] Resuming: {len(finished)} jobs already in {args.results}")
+
+    stop = threading.Event()
+
+    def on_signal(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        stop.set()
+        print("\n[BATCH] Stopping: no new jobs, waiting for running decks (Ctrl-C again to abort)")
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    generator = PPTGenerator()
+    lines = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    aborted = False
+    try:
+        with open(args.results, "a", encoding="utf-8") as results:
+            run = BatchRun(results, args.output_root, finished)
+            stream = generator.generate_stream(
+                run.jobs(lines, limit=args.limit),
+                max_parallel_decks=args.parallel,
+                stop=stop
+            )
+            try:
+                for result in stream:
+                    run.finish(result)
+            finally:
+                stream.close()
+    except KeyboardInterrupt:
+        aborted = True
+        print(f"\n[BATCH] Aborted: {len(run.pending)} running jobs not recorded (they run again on resume)")
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        generator.close(wait=not aborted)
+
+    counts = run.counts
+    print(
+        f"\n[BATCH] {'Stopped' if stop.is_set() else 'Done'}: {counts['succeeded']} succeeded, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    if aborted or stop.is_set():
+        return 130
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Job Queue - Persistent SQLite-backed deck job queue
+Survives restarts, deduplicates submissions by idempotency key
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import ServiceConfig
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Persistent FIFO queue of deck generation jobs
+
+    Jobs are stored in a single SQLite table. Claiming a job is a single
+    locked transaction, so several worker threads can pull from the same
+    queue safely. Jobs left in the running state by a crash are returned
+    to the queue on startup, unless they already used up their attempts
+    (a job that keeps crashing the server is failed instead).
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the queue database
+
+        Args:
+            db_path: SQLite database file path
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                idempotency_key TEXT UNIQUE,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)"
+        )
+
+    def submit(
+        self,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Add a job to the queue
+
+        Args:
+            params: generate() keyword arguments
+            idempotency_key: Optional client key; resubmitting the same key
+                             returns the existing job instead of a new one
+
+        Returns:
+            (job dict, created) - created is False for a duplicate key
+        """
+        with self._lock:
+            if idempotency_key:
+                existing = self._conn.execute(
+                    "SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if existing:
+                    return self._to_dict(existing), False
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, idempotency_key, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, idempotency_key, QUEUED, json.dumps(params, ensure_ascii=False), _now())
+            )
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_dict(row), True
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued job and mark it running
+
+        Returns:
+            Job dict, or None if the queue is empty
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at, rowid LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, _now(), row["id"])
+                )
+                claimed = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+                return self._to_dict(claimed)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Mark a job as succeeded and store its result"""
+        self._finish(job_id, SUCCEEDED, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed and store the error message"""
+        self._finish(job_id, FAILED, error=error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job dict, or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recover(self, max_attempts: int = ServiceConfig.MAX_ATTEMPTS) -> Tuple[int, int]:
+        """
+        Requeue jobs interrupted by a crash or shutdown
+
+        Args:
+            max_attempts: Interrupted jobs with this many attempts are
+                          marked failed instead of requeued
+
+        Returns:
+            (requeued, failed) job counts
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND attempts >= ?",
+                    (FAILED, f"Interrupted in each of {max_attempts} attempts", _now(), RUNNING, max_attempts)
+                ).rowcount
+                requeued = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued, failed
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Record the final state of a job"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, _now(), job_id)
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a row to a job dict with decoded JSON fields"""
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def _now() -> str:
+    """Current time as ISO string"""
+    return datetime.now().isoformat()
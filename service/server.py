@@ -0,0 +1,310 @@
+"""
+Job Service - Long-running local PPT generation service
+HTTP API in front of a persistent job queue and a pool of pre-initialized generators
+
+Run:
+    python -m service.server --port 8765 --workers 2
+
+Endpoints:
+    POST /jobs                 Submit a deck job (JSON body, optional Idempotency-Key header)
+    GET  /jobs/<id>            Job status
+    GET  /jobs/<id>/result     Job result (409 until the job has finished)
+    GET  /health               Queue counts and worker status
+    GET  /metrics              Prometheus metrics
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.config import ServiceConfig
+from core.metrics import REGISTRY
+from service.job_queue import JobQueue, QUEUED, RUNNING
+
+
+# Job fields accepted from clients, mapped to generate() arguments
+JOB_FIELDS = {
+    "content": str,
+    "page_count": int,
+    "style": str,
+    "resolution": str,
+    "deadline": float,
+}
+
+
+class JobService:
+    """
+    Worker pool that drains a JobQueue
+
+    Each worker thread owns one generator built at startup, so SDK clients
+    and imports are paid once per process instead of once per job.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        generator_factory: Optional[Callable[[], Any]] = None,
+        workers: int = ServiceConfig.WORKERS,
+        output_root: str = ServiceConfig.OUTPUT_ROOT,
+        poll_interval: float = ServiceConfig.POLL_INTERVAL
+    ):
+        """
+        Initialize service
+
+        Args:
+            queue: Persistent job queue
+            generator_factory: Callable returning a PPTGenerator-compatible
+                               object (defaults to PPTGenerator)
+            workers: Number of worker threads / generators
+            output_root: Root directory for job outputs
+            poll_interval: Idle poll interval in seconds
+        """
+        if generator_factory is None:
+            from generators.ppt_generator import PPTGenerator
+            generator_factory = PPTGenerator
+
+        self.queue = queue
+        self.output_root = output_root
+        self.poll_interval = poll_interval
+        self.generators = [generator_factory() for _ in range(workers)]
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the workers"""
+        recovered, failed = self.queue.recover()
+        if recovered:
+            print(f"[SERVICE] Requeued {recovered} interrupted jobs")
+        if failed:
+            print(f"[SERVICE] Failed {failed} interrupted jobs after {ServiceConfig.MAX_ATTEMPTS} attempts")
+
+        for i, generator in enumerate(self.generators):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(generator,),
+                name=f"job-worker-{i+1}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        print(f"[SERVICE] {len(self._threads)} workers started")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop workers after their current job"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(
+        self,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Validate and enqueue a job
+
+        Args:
+            params: Job fields (content, page_count, style, resolution)
+            idempotency_key: Optional deduplication key
+
+        Returns:
+            (job dict, created)
+
+        Raises:
+            ValueError: If the job fields are invalid
+        """
+        job_params = validate_job(params)
+        job, created = self.queue.submit(job_params, idempotency_key)
+        if created:
+            self._wakeup.set()
+        return job, created
+
+    def _worker_loop(self, generator: Any) -> None:
+        """Claim and run jobs until stopped"""
+        while not self._stopping.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._run_job(generator, job)
+
+    def _run_job(self, generator: Any, job: Dict[str, Any]) -> None:
+        """Run one job and record its outcome"""
+        print(f"[SERVICE] Running job {job['id']}")
+        try:
+            result = generator.generate(
+                output_dir=os.path.join(self.output_root, job["id"]),
+                **job["params"]
+            )
+            self.queue.complete(job["id"], result)
+            print(f"[SERVICE] Job {job['id']} succeeded")
+        except Exception as e:
+            self.queue.fail(job["id"], str(e))
+            print(f"[SERVICE] Job {job['id']} failed: {str(e)}")
+
+
+def validate_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check job fields and drop unknown ones
+
+    Args:
+        params: Raw job dict from the client
+
+    Returns:
+        generate() keyword arguments
+
+    Raises:
+        ValueError: If content is missing or a field has the wrong type
+    """
+    if not isinstance(params, dict):
+        raise ValueError("Job must be a JSON object")
+    if not params.get("content"):
+        raise ValueError("Job is missing 'content'")
+
+    job_params = {}
+    for field, field_type in JOB_FIELDS.items():
+        if field in params:
+            accepted = (int, float) if field_type is float else field_type
+            if not isinstance(params[field], accepted) or isinstance(params[field], bool):
+                raise ValueError(f"'{field}' must be {field_type.__name__}")
+            job_params[field] = params[field]
+
+    return job_params
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job status as returned by the API (without the result payload)"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "params": job["params"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def make_handler(service: JobService):
+    """Build a request handler class bound to the service"""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        """HTTP API for the job service"""
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send(404, {"error": "Not found"})
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                params = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                return self._send(400, {"error": "Invalid JSON body"})
+
+            key = self.headers.get("Idempotency-Key")
+            if isinstance(params, dict):
+                key = key or params.pop("idempotency_key", None)
+
+            try:
+                job, created = service.submit(params, key)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+
+            self._send(202 if created else 200, public_job(job))
+
+        def do_GET(self):
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+
+            if parts == ["health"]:
+                return self._send(200, {
+                    "status": "ok",
+                    "workers": len(service.generators),
+                    "jobs": service.queue.counts()
+                })
+
+            if parts == ["metrics"]:
+                data = REGISTRY.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            if len(parts) in (2, 3) and parts[0] == "jobs":
+                job = service.queue.get(parts[1])
+                if job is None:
+                    return self._send(404, {"error": "Unknown job"})
+
+                if len(parts) == 2:
+                    return self._send(200, public_job(job))
+
+                if parts[2] == "result":
+                    if job["status"] in (QUEUED, RUNNING):
+                        return self._send(409, {"error": "Job not finished", "status": job["status"]})
+                    return self._send(200, {
+                        "job_id": job["id"],
+                        "status": job["status"],
+                        "result": job["result"],
+                        "error": job["error"]
+                    })
+
+            self._send(404, {"error": "Not found"})
+
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            """Write a JSON response"""
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            print(f"[HTTP] {self.address_string()} {format % args}")
+
+    return JobRequestHandler
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local PPT generation job service")
+    parser.add_argument("--host", default=ServiceConfig.HOST)
+    parser.add_argument("--port", type=int, default=ServiceConfig.PORT)
+    parser.add_argument("--db", default=ServiceConfig.DB_PATH, help="SQLite queue path")
+    parser.add_argument("--workers", type=int, default=ServiceConfig.WORKERS)
+    parser.add_argument("--output-root", default=ServiceConfig.OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    queue = JobQueue(args.db)
+    service = JobService(queue, workers=args.workers, output_root=args.output_root)
+    service.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"[SERVICE] Listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVICE] Shutting down...")
+    finally:
+        server.server_close()
+        service.stop()
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Shard Queue - Lease-based work queue on a shared filesystem
+Lets several processes, on one host or several hosts, split deck and slide work
+
+Layout under the shared root:
+
+    decks/<deck_id>/            Deck output directory (viewer, plan, images)
+        job.json                Job parameters
+        leases/<item>.lease     Active claim on a work item
+        leases/<item>.attempts  Number of times the item was claimed
+        done/<item>.json        Completion record of a work item
+
+Work items of a deck are "plan", "slide_001" ... "slide_NNN" and "assemble".
+Leases are plain files created with O_EXCL; their mtime is the heartbeat.
+A lease whose mtime is older than the TTL is considered abandoned and may be
+taken over, so slides claimed by a crashed worker are picked up again.
+Delivery is at-least-once: a slide may be rendered twice in rare races, and
+always to the same file. Every claim is counted, so an item that keeps
+failing (or keeps crashing its worker) can be given up after
+ShardConfig.MAX_ATTEMPTS.
+"""
+
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.config import ShardConfig
+
+
+PLAN_ITEM = "plan"
+ASSEMBLE_ITEM = "assemble"
+
+
+def slide_item(index: int) -> str:
+    """Work item name for the slide at a 0-based index"""
+    return f"slide_{index+1:03d}"
+
+
+class ShardQueue:
+    """Shared-filesystem deck queue with expiring leases"""
+
+    def __init__(
+        self,
+        root: str = ShardConfig.ROOT,
+        worker_id: Optional[str] = None,
+        lease_ttl: float = ShardConfig.LEASE_TTL
+    ):
+        """
+        Initialize queue
+
+        Args:
+            root: Shared root directory
+            worker_id: Unique ID of this worker (defaults to host:pid:random)
+            lease_ttl: Seconds without heartbeat before a lease expires
+        """
+        self.root = root
+        self.decks_dir = os.path.join(root, "decks")
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_ttl = lease_ttl
+        os.makedirs(self.decks_dir, exist_ok=True)
+
+    # ========================================
+    # Decks
+    # ========================================
+
+    def submit_deck(self, params: Dict[str, Any]) -> str:
+        """
+        Add a deck job
+
+        The deck directory is built under a hidden name and renamed into
+        place, so workers never see a half-written job.
+
+        Args:
+            params: generate() keyword arguments (content, page_count, style, resolution)
+
+        Returns:
+            Deck ID
+        """
+        deck_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        staging = os.path.join(self.decks_dir, f".{deck_id}")
+
+        for sub in ("leases", "done", "images"):
+            os.makedirs(os.path.join(staging, sub), exist_ok=True)
+        _write_json(os.path.join(staging, "job.json"), params)
+
+        os.rename(staging, self.deck_dir(deck_id))
+        return deck_id
+
+    def deck_ids(self) -> List[str]:
+        """All visible deck IDs, oldest first"""
+        return sorted(d for d in os.listdir(self.decks_dir) if not d.startswith("."))
+
+    def deck_dir(self, deck_id: str) -> str:
+        """Output directory of a deck"""
+        return os.path.join(self.decks_dir, deck_id)
+
+    def load_job(self, deck_id: str) -> Dict[str, Any]:
+        """Job parameters of a deck"""
+        return _read_json(os.path.join(self.deck_dir(deck_id), "job.json"))
+
+    def slide_count(self, deck_id: str) -> Optional[int]:
+        """Number of slides, or None if the deck is not planned yet"""
+        record = self.read_done(deck_id, PLAN_ITEM)
+        return record["slide_count"] if record else None
+
+    def deck_status(self, deck_id: str) -> Dict[str, Any]:
+        """
+        Progress summary of a deck
+
+        Returns:
+            Dict with state (queued/planning/rendering/assembling/complete/failed)
+            and done/total slide counts
+        """
+        total = self.slide_count(deck_id)
+        assembled = self.read_done(deck_id, ASSEMBLE_ITEM)
+        if assembled is not None:
+            state = "complete" if assembled.get("success", True) else "failed"
+        elif total is None:
+            state = "planning" if self.is_leased(deck_id, PLAN_ITEM) else "queued"
+        elif all(self.is_done(deck_id, slide_item(i)) for i in range(total)):
+            state = "assembling"
+        else:
+            state = "rendering"
+
+        done = 0 if total is None else sum(
+            1 for i in range(total) if self.is_done(deck_id, slide_item(i))
+        )
+        return {"deck_id": deck_id, "state": state, "slides_done": done, "slides_total": total}
+
+    # ========================================
+    # Work Items
+    # ========================================
+
+    def is_done(self, deck_id: str, item: str) -> bool:
+        """Check whether a work item has a completion record"""
+        return os.path.exists(self._done_path(deck_id, item))
+
+    def read_done(self, deck_id: str, item: str) -> Optional[Dict[str, Any]]:
+        """Completion record of a work item, or None"""
+        path = self._done_path(deck_id, item)
+        if not os.path.exists(path):
+            return None
+        return _read_json(path)
+
+    def mark_done(self, deck_id: str, item: str, record: Dict[str, Any]) -> None:
+        """Write the completion record and drop the lease"""
+        _write_json(self._done_path(deck_id, item), record)
+        self.release(deck_id, item)
+
+    def try_claim(self, deck_id: str, item: str) -> bool:
+        """
+        Claim a work item if it is neither done nor leased
+
+        Args:
+            deck_id: Deck ID
+            item: Work item name
+
+        Returns:
+            True if this worker now holds the lease
+        """
+        if self.is_done(deck_id, item):
+            return False
+
+        if not self._acquire(self._lease_path(deck_id, item)):
+            return False
+
+        # The item may have completed between the check and the claim
+        if self.is_done(deck_id, item):
+            self.release(deck_id, item)
+            return False
+
+        return True
+
+    def renew(self, deck_id: str, item: str) -> bool:
+        """
+        Heartbeat a held lease
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        path = self._lease_path(deck_id, item)
+        if self._lease_owner(path) != self.worker_id:
+            return False
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def release(self, deck_id: str, item: str) -> None:
+        """Drop a lease held by this worker"""
+        path = self._lease_path(deck_id, item)
+        if self._lease_owner(path) == self.worker_id:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def is_leased(self, deck_id: str, item: str) -> bool:
+        """Check whether a work item has a live lease"""
+        return self._is_live(self._lease_path(deck_id, item))
+
+    def record_attempt(self, deck_id: str, item: str) -> int:
+        """
+        Count a claim of a work item (call while holding its lease)
+
+        Returns:
+            Number of attempts including this one
+        """
+        path = self._attempts_path(deck_id, item)
+        attempts = _read_json(path)["attempts"] + 1 if os.path.exists(path) else 1
+        _write_json(path, {"attempts": attempts, "worker": self.worker_id})
+        return attempts
+
+    # ========================================
+    # Lease Files
+    # ========================================
+
+    def _acquire(self, path: str) -> bool:
+        """Create the lease file, taking over an expired one if needed"""
+        if self._create(path):
+            return True
+
+        if self._is_live(path):
+            return False
+
+        # Expired: move it aside atomically; only one worker wins the rename
+        tombstone = f"{path}.expired-{uuid.uuid4().hex[:8]}"
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return self._create(path)
+
+        if self._is_live(tombstone):
+            # Renewed or replaced since we looked; put it back
+            try:
+                os.link(tombstone, path)
+            except FileExistsError:
+                pass
+            os.unlink(tombstone)
+            return False
+
+        os.unlink(tombstone)
+        print(f"[SHARD] Took over expired lease {os.path.basename(path)}")
+        return self._create(path)
+
+    def _create(self, path: str) -> bool:
+        """Exclusively create a lease file owned by this worker"""
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.worker_id)
+        return True
+
+    def _is_live(self, path: str) -> bool:
+        """Check whether a lease file exists and has a recent heartbeat"""
+        try:
+            return time.time() - os.stat(path).st_mtime < self.lease_ttl
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _lease_owner(path: str) -> Optional[str]:
+        """Worker ID stored in a lease file"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _lease_path(self, deck_id: str, item: str) -> str:
+        return os.path.join(self.deck_dir(deck_id), "leases", f"{item}.lease")
+
+    def _attempts_path(self, deck_id: str, item: str) -> str:
+        return os.path.join(self.deck_dir(deck_id), "leases", f"{item}.attempts")
+
+    def _done_path(self, deck_id: str, item: str) -> str:
+        return os.path.join(self.deck_dir(deck_id), "done", f"{item}.json")
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON atomically (temp file + rename)"""
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    """Read a JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
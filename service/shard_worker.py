@@ -0,0 +1,295 @@
+"""
+Shard Worker - Claims deck and slide work from a shared-filesystem queue
+Run one or more per host; all workers pointing at the same root cooperate
+
+Run:
+    python -m service.shard_worker submit --content "人工智能的未来" --page-count 8
+    python -m service.shard_worker work --until-drained
+    python -m service.shard_worker work --metrics-port 9108
+    python -m service.shard_worker status
+"""
+
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from core.config import ShardConfig
+from core.image_utils import save_base64_image
+from service.shard_queue import ShardQueue, PLAN_ITEM, ASSEMBLE_ITEM, slide_item
+
+
+class ShardWorker:
+    """
+    Processes work items of every deck under a shared root
+
+    Planning, each slide and final assembly are separate work items, so
+    the slides of one deck spread over all workers. Assembly (transitions,
+    viewer, generation_log.json) runs once, after every slide is done.
+    """
+
+    def __init__(
+        self,
+        queue: ShardQueue,
+        generator: Any,
+        poll_interval: float = ShardConfig.POLL_INTERVAL,
+        heartbeat_interval: float = ShardConfig.HEARTBEAT_INTERVAL
+    ):
+        """
+        Initialize worker
+
+        Args:
+            queue: Shared queue
+            generator: PPTGenerator used for planning, images and assembly
+            poll_interval: Seconds to sleep when no work can be claimed
+            heartbeat_interval: Seconds between lease renewals
+        """
+        self.queue = queue
+        self.generator = generator
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stopping = threading.Event()
+
+    def run(self, until_drained: bool = False) -> None:
+        """
+        Process work until stopped
+
+        Args:
+            until_drained: Exit once every deck is assembled
+        """
+        print(f"[SHARD] Worker {self.queue.worker_id} started")
+        while not self._stopping.is_set():
+            if self.run_once():
+                continue
+            if until_drained and self.is_drained():
+                break
+            self._stopping.wait(self.poll_interval)
+        print(f"[SHARD] Worker {self.queue.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Stop after the current work item"""
+        self._stopping.set()
+
+    def is_drained(self) -> bool:
+        """Check whether every deck has been assembled"""
+        return all(self.queue.is_done(d, ASSEMBLE_ITEM) for d in self.queue.deck_ids())
+
+    def run_once(self) -> bool:
+        """
+        Claim and process a single work item
+
+        Returns:
+            True if an item was processed
+        """
+        for deck_id in self.queue.deck_ids():
+            if self.queue.is_done(deck_id, ASSEMBLE_ITEM):
+                continue
+
+            total = self.queue.slide_count(deck_id)
+            if total is None:
+                if self.queue.try_claim(deck_id, PLAN_ITEM):
+                    self._process(deck_id, PLAN_ITEM, self._plan)
+                    return True
+                continue
+
+            pending = [i for i in range(total) if not self.queue.is_done(deck_id, slide_item(i))]
+            for index in pending:
+                item = slide_item(index)
+                if self.queue.try_claim(deck_id, item):
+                    self._process(deck_id, item, lambda d: self._render_slide(d, index))
+                    return True
+
+            if not pending and self.queue.try_claim(deck_id, ASSEMBLE_ITEM):
+                self._process(deck_id, ASSEMBLE_ITEM, self._assemble)
+                return True
+
+        return False
+
+    def _process(self, deck_id: str, item: str, handler) -> None:
+        """Run a claimed item under heartbeat and record its completion"""
+        attempts = self.queue.record_attempt(deck_id, item)
+        print(f"[SHARD] {deck_id}/{item} claimed (attempt {attempts}/{ShardConfig.MAX_ATTEMPTS})")
+        if attempts > ShardConfig.MAX_ATTEMPTS:
+            # Earlier attempts never finished: their workers died mid-item
+            self._give_up(deck_id, item, "Worker stopped during every attempt", attempts - 1)
+            return
+
+        try:
+            with self._heartbeat(deck_id, item):
+                record = handler(deck_id)
+        except Exception as e:
+            print(f"[SHARD] {deck_id}/{item} error: {str(e)}")
+            if attempts >= ShardConfig.MAX_ATTEMPTS:
+                self._give_up(deck_id, item, str(e), attempts)
+            # Otherwise leave the lease to expire so another worker retries the item
+            return
+
+        self.queue.mark_done(deck_id, item, record)
+        print(f"[SHARD] {deck_id}/{item} done")
+
+    def _give_up(self, deck_id: str, item: str, error: str, attempts: int) -> None:
+        """
+        Record a work item as failed after its last attempt
+
+        A failed slide becomes a placeholder when the deck is assembled. A
+        deck that cannot be planned or assembled is finished as failed.
+        """
+        print(f"[SHARD] {deck_id}/{item} failed after {attempts} attempts")
+        if item.startswith("slide_"):
+            self.queue.mark_done(deck_id, item, {"status": "failed", "error": error, "attempts": attempts})
+            return
+
+        self.queue.mark_done(deck_id, ASSEMBLE_ITEM, {
+            "success": False,
+            "error": f"{item} failed: {error}",
+            "attempts": attempts
+        })
+        self.queue.release(deck_id, item)
+
+    def _plan(self, deck_id: str) -> dict:
+        """Plan the deck and expose its slides as work items"""
+        job = self.queue.load_job(deck_id)
+        _, prompts = self.generator.plan_deck(
+            content=job["content"],
+            page_count=job.get("page_count", 5),
+            style=job.get("style", "gradient-glass"),
+            resolution=job.get("resolution", "2K"),
+            output_dir=self.queue.deck_dir(deck_id)
+        )
+        return {"slide_count": len(prompts)}
+
+    def _render_slide(self, deck_id: str, index: int) -> dict:
+        """Generate and save one slide image"""
+        job = self.queue.load_job(deck_id)
+        deck_dir = self.queue.deck_dir(deck_id)
+        slides_plan = _load(os.path.join(deck_dir, "slides_plan.json"))
+        prompts = _load(os.path.join(deck_dir, "prompts.json"))
+
+        image_data = self.generator.generation_chain.generate_single_image(
+            prompt=prompts[index],
+            resolution=job.get("resolution", "2K"),
+            style=job.get("style", "gradient-glass"),
+            slide=index + 1
+        )
+        if not image_data:
+            return {"status": "failed"}
+
+        filepath = self.generator.slide_image_path(deck_dir, index, slides_plan)
+        save_base64_image(image_data, filepath)
+        return {"status": "succeeded", "image": filepath}
+
+    def _assemble(self, deck_id: str) -> dict:
+        """Build transitions, viewer and log from the finished slides"""
+        job = self.queue.load_job(deck_id)
+        deck_dir = self.queue.deck_dir(deck_id)
+        slides_plan = _load(os.path.join(deck_dir, "slides_plan.json"))
+
+        image_paths = []
+        failed_slides = []
+        for i in range(self.queue.slide_count(deck_id)):
+            record = self.queue.read_done(deck_id, slide_item(i))
+            if record.get("status") == "succeeded":
+                image_paths.append(record["image"])
+            else:
+                failed_slides.append(i + 1)
+
+        return self.generator.assemble_deck(
+            content=job["content"],
+            page_count=job.get("page_count", 5),
+            style=job.get("style", "gradient-glass"),
+            resolution=job.get("resolution", "2K"),
+            output_dir=deck_dir,
+            slides_plan=slides_plan,
+            image_paths=image_paths,
+            failed_slides=failed_slides
+        )
+
+    @contextmanager
+    def _heartbeat(self, deck_id: str, item: str):
+        """Renew the lease in the background while the item is processed"""
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(self.heartbeat_interval):
+                if not self.queue.renew(deck_id, item):
+                    print(f"[SHARD] {deck_id}/{item} lease lost")
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{item}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+
+def _load(path: str) -> Any:
+    """Read a JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[list] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Sharded PPT generation over a shared filesystem")
+    parser.add_argument("--root", default=ShardConfig.ROOT, help="Shared root directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Add a deck job")
+    submit.add_argument("--content", required=True)
+    submit.add_argument("--page-count", type=int, default=5)
+    submit.add_argument("--style", default="gradient-glass")
+    submit.add_argument("--resolution", default="2K")
+
+    work = commands.add_parser("work", help="Process deck and slide work items")
+    work.add_argument("--until-drained", action="store_true", help="Exit once every deck is assembled")
+    work.add_argument("--lease-ttl", type=float, default=ShardConfig.LEASE_TTL)
+    work.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+
+    commands.add_parser("status", help="Show deck progress")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "submit":
+        queue = ShardQueue(args.root)
+        deck_id = queue.submit_deck({
+            "content": args.content,
+            "page_count": args.page_count,
+            "style": args.style,
+            "resolution": args.resolution,
+        })
+        print(deck_id)
+
+    elif args.command == "work":
+        from dotenv import load_dotenv
+        load_dotenv()
+        from generators.ppt_generator import PPTGenerator
+
+        if args.metrics_port is not None:
+            from core.metrics import serve_metrics
+            serve_metrics(args.metrics_port)
+
+        queue = ShardQueue(args.root, lease_ttl=args.lease_ttl)
+        worker = ShardWorker(
+            queue,
+            PPTGenerator(),
+            heartbeat_interval=min(ShardConfig.HEARTBEAT_INTERVAL, args.lease_ttl / 3)
+        )
+        try:
+            worker.run(until_drained=args.until_drained)
+        except KeyboardInterrupt:
+            worker.stop()
+
+    elif args.command == "status":
+        queue = ShardQueue(args.root)
+        for deck_id in queue.deck_ids():
+            status = queue.deck_status(deck_id)
+            total = status["slides_total"] if status["slides_total"] is not None else "?"
+            print(f"{deck_id}  {status['state']:<10}  {status['slides_done']}/{total}")
+
+
+if __name__ == "__main__":
+    main()